@@ -0,0 +1,90 @@
+import hashlib
+import json
+import os
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from statsmodels.tsa.statespace.sarimax import SARIMAX
+
+
+BASE_DIR = Path("/Applications/dollar_price")
+ARIMA_CACHE_DIR = BASE_DIR / "analysis" / "LSTM" / "Hybrid" / "cache" / "arima"
+
+
+def dataset_hash(values: np.ndarray, dates=None) -> str:
+    h = hashlib.sha256()
+    h.update(np.ascontiguousarray(np.asarray(values, dtype=np.float64)).tobytes())
+    if dates is not None:
+        h.update(np.ascontiguousarray(pd.to_datetime(pd.Series(dates)).to_numpy(dtype="datetime64[ns]").astype(np.int64)).tobytes())
+    return h.hexdigest()
+
+
+def arima_cache_key(values: np.ndarray, dates, train_size: int, order, seasonal_order) -> dict:
+    if dates is not None:
+        dates = pd.to_datetime(pd.Series(dates)).reset_index(drop=True)
+        bounds = {
+            "start": str(dates.iloc[0].date()),
+            "train_end": str(dates.iloc[train_size - 1].date()),
+            "end": str(dates.iloc[-1].date()),
+        }
+    else:
+        bounds = {"start": 0, "train_end": int(train_size - 1), "end": int(len(values) - 1)}
+    return {
+        "dataset_hash": dataset_hash(values, dates),
+        "rows": int(len(values)),
+        "train_size": int(train_size),
+        "period": bounds,
+        "order": list(order),
+        "seasonal_order": list(seasonal_order),
+    }
+
+
+def _cache_path(key: dict) -> Path:
+    digest = hashlib.sha256(json.dumps(key, sort_keys=True).encode("utf-8")).hexdigest()[:24]
+    return ARIMA_CACHE_DIR / f"sarimax_{digest}.npz"
+
+
+def fit_sarimax_cached(
+    series: pd.Series,
+    train_size: int,
+    order=(1, 1, 1),
+    seasonal_order=(0, 0, 0, 0),
+    dates=None,
+    use_cache: bool = True,
+    start_params=None,
+):
+    """Fit SARIMAX on series[:train_size] and return (params, fitted values over the full series).
+
+    Results are stored under cache/arima keyed by dataset hash, period bounds, order and
+    seasonal_order, so reruns skip the statistical stage entirely. `start_params` only seeds
+    the optimizer (e.g. warm start from a previous window) and is not part of the key.
+    """
+    values = np.asarray(series, dtype=np.float64)
+    key = arima_cache_key(values, dates, train_size, order, seasonal_order)
+    path = _cache_path(key)
+
+    if use_cache and path.exists():
+        with np.load(path, allow_pickle=False) as cached:
+            if json.loads(str(cached["key"])) == key:
+                return cached["params"], cached["fittedvalues"]
+
+    train_ts = pd.Series(values[:train_size])
+    arima_result = SARIMAX(train_ts, order=order, seasonal_order=seasonal_order).fit(start_params=start_params, disp=False)
+    # One-step predictions for the whole series with the parameters fitted on train (no leakage).
+    res_full = arima_result.apply(pd.Series(values))
+    params = np.asarray(arima_result.params, dtype=np.float64)
+    fitted = np.asarray(res_full.fittedvalues, dtype=np.float64)
+
+    if use_cache:
+        os.makedirs(ARIMA_CACHE_DIR, exist_ok=True)
+        tmp_path = path.with_name(f"{path.stem}.{os.getpid()}.tmp.npz")
+        np.savez(tmp_path, params=params, fittedvalues=fitted, key=json.dumps(key, sort_keys=True))
+        os.replace(tmp_path, path)
+    return params, fitted
+
+
+def sarimax_from_params(train_ts: pd.Series, params: np.ndarray, order=(1, 1, 1), seasonal_order=(0, 0, 0, 0)):
+    """Rebuild a SARIMAX results object from cached params without re-running the optimizer."""
+    model = SARIMAX(pd.Series(np.asarray(train_ts, dtype=np.float64)), order=order, seasonal_order=seasonal_order)
+    return model.filter(params)
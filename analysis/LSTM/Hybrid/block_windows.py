@@ -0,0 +1,99 @@
+import numpy as np
+
+
+def valid_window_starts(block_index: np.ndarray, seq_len: int, horizon: int = 1, lo: int = 0, hi: int | None = None) -> np.ndarray:
+    """Start offsets i whose window rows i..i+seq_len-1 and target rows up to i+seq_len+horizon-1
+    all belong to one block, with targets restricted to [lo, hi).
+
+    Blocks are contiguous in the concatenated frame, so a window is valid iff its first row and
+    its last target row share a block_index.
+    """
+    block_index = np.asarray(block_index)
+    n = len(block_index)
+    hi = n if hi is None else hi
+    span = seq_len + horizon - 1
+    starts = np.arange(0, max(n - span, 0))
+    same_block = block_index[starts] == block_index[starts + span]
+    first_target = starts + seq_len
+    in_range = (first_target >= lo) & (first_target + horizon - 1 < hi)
+    return starts[same_block & in_range]
+
+
+class BlockWindowSampler:
+    """Precomputed per-block window starts over a concatenated (rows, features) array."""
+
+    def __init__(self, block_index: np.ndarray, seq_len: int, horizon: int = 1, lo: int = 0, hi: int | None = None):
+        self.block_index = np.asarray(block_index)
+        self.seq_len = seq_len
+        self.horizon = horizon
+        self.starts = valid_window_starts(self.block_index, seq_len, horizon, lo, hi)
+        blocks = self.block_index[self.starts]
+        self.starts_by_block = {int(b): self.starts[blocks == b] for b in np.unique(blocks)}
+
+    def __len__(self):
+        return len(self.starts)
+
+    @property
+    def target_rows(self) -> np.ndarray:
+        return self.starts + self.seq_len
+
+    def windows(self, X: np.ndarray, y: np.ndarray | None = None, starts: np.ndarray | None = None):
+        """Gather (len(starts), seq_len, features) windows with a single fancy-index."""
+        starts = self.starts if starts is None else np.asarray(starts)
+        offsets = np.arange(self.seq_len)
+        xs = X[starts[:, None] + offsets[None, :]]
+        if y is None:
+            return xs
+        if self.horizon == 1:
+            ys = y[starts + self.seq_len]
+        else:
+            ys = y[starts[:, None] + self.seq_len + np.arange(self.horizon)[None, :], 0]
+        return xs, ys
+
+    def iter_batches(self, X: np.ndarray, y: np.ndarray, batch_size: int = 256, shuffle: bool = False, seed: int = 42):
+        """Yield (X, y) batches drawn from all blocks at once."""
+        starts = self.starts
+        if shuffle:
+            starts = np.random.default_rng(seed).permutation(starts)
+        for i in range(0, len(starts), batch_size):
+            yield self.windows(X, y, starts[i : i + batch_size])
+
+
+def per_block_stats(values: np.ndarray, block_index: np.ndarray, mask: np.ndarray | None = None):
+    """Per-block mean/std for every column in one vectorized pass (bincount over block ids).
+
+    `mask` limits which rows contribute (e.g. training rows only). Returns (block_ids, mean, std, count).
+    """
+    values = np.asarray(values, dtype=np.float64)
+    if values.ndim == 1:
+        values = values[:, None]
+    block_ids, inverse = np.unique(np.asarray(block_index), return_inverse=True)
+    weights = np.ones(len(values)) if mask is None else np.asarray(mask, dtype=np.float64)
+    count = np.bincount(inverse, weights=weights, minlength=len(block_ids))
+    n_blocks, n_cols = len(block_ids), values.shape[1]
+    flat_idx = (inverse[:, None] * n_cols + np.arange(n_cols)[None, :]).ravel()
+    w = np.repeat(weights, n_cols)
+    sums = np.bincount(flat_idx, weights=values.ravel() * w, minlength=n_blocks * n_cols).reshape(n_blocks, n_cols)
+    sq = np.bincount(flat_idx, weights=(values ** 2).ravel() * w, minlength=n_blocks * n_cols).reshape(n_blocks, n_cols)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = sums / count[:, None]
+        std = np.sqrt(np.maximum(sq / count[:, None] - mean ** 2, 0.0))
+    return block_ids, mean, std, count
+
+
+def normalize_per_block(values: np.ndarray, block_index: np.ndarray, mask: np.ndarray | None = None, min_rows: int = 20):
+    """Standardize columns within each block using stats from `mask` rows.
+
+    Blocks with fewer than `min_rows` contributing rows (e.g. blocks entirely in the test split)
+    fall back to the pooled stats of all `mask` rows, so no test rows leak into the statistics.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    block_ids, mean, std, count = per_block_stats(values, block_index, mask)
+    pooled = values if mask is None else values[np.asarray(mask, dtype=bool)]
+    pooled_mean, pooled_std = pooled.mean(axis=0), pooled.std(axis=0)
+    sparse = count < min_rows
+    mean[sparse] = pooled_mean
+    std[sparse] = pooled_std
+    std[std == 0] = 1.0
+    pos = np.searchsorted(block_ids, np.asarray(block_index))
+    return (values - mean[pos]) / std[pos]
@@ -0,0 +1,156 @@
+"""
+Per-epoch training telemetry for the hybrid residual models.
+
+`EpochLog` streams one row per epoch (train / val loss, mean gradient norm, learning rate, wall
+time) to an append-only CSV per trial; the last row of a run carries the early-stop flag. Every
+row carries the run id of the process that wrote it (RUN_ID by default), so a rerun or resumed
+trial appends below the earlier epochs instead of replacing them. The trainers only touch it
+when an `epoch_log` is passed to `fit`, so untracked fits pay nothing.
+
+    python analysis/LSTM/Hybrid/epoch_log.py analysis/LSTM/Hybrid/hybrid_mmf/hpo/epochs
+"""
+import argparse
+import csv
+import os
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import torch.nn as nn
+
+
+# One id per process: every trial logged by one script invocation shares it.
+RUN_ID = f"{time.strftime('%Y%m%dT%H%M%S')}-{os.getpid()}"
+EPOCH_COLUMNS = ["epoch", "train_loss", "val_loss", "grad_norm", "lr", "epoch_sec", "is_best", "early_stop"]
+
+
+def epoch_log_path(hpo_dir: Path, period_name: str, model: str, trial: int) -> Path:
+    return Path(hpo_dir) / "epochs" / f"{period_name}_model_{model.lower()}_trial{trial:03d}.csv"
+
+
+class EpochLog:
+    def __init__(self, path, run_id: str | None = None, **meta):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.meta = {"run_id": run_id or RUN_ID, **meta}
+        self.best_epoch = 0
+        self.epochs_ran = 0
+        self.early_stopped = False
+        header = list(self.meta) + EPOCH_COLUMNS
+        new = not self.path.exists() or self.path.stat().st_size == 0
+        if not new:
+            with open(self.path, newline="", encoding="utf-8") as f:
+                existing = next(csv.reader(f), [])
+            if existing != header:
+                raise ValueError(f"{self.path} has columns {existing}, expected {header}; move it aside to start a new log")
+        self._file = open(self.path, "a", newline="", encoding="utf-8")
+        self._writer = csv.writer(self._file)
+        if new:
+            self._writer.writerow(header)
+        self._last = None
+
+    def start_epoch(self):
+        self._start = time.perf_counter()
+        self._loss_sum, self._grad_sum, self._batches = 0.0, 0.0, 0
+
+    def batch(self, loss, model):
+        """Call after loss.backward(): accumulates the batch loss and total gradient L2 norm."""
+        self._loss_sum += loss.item()
+        self._grad_sum += float(nn.utils.clip_grad_norm_(model.parameters(), float("inf")))
+        self._batches += 1
+
+    def end_epoch(self, epoch: int, val_loss: float, lr: float, is_best: bool):
+        n = max(self._batches, 1)
+        self.epochs_ran = epoch
+        if is_best:
+            self.best_epoch = epoch
+        self._flush_last(early_stop=False)
+        self._last = [epoch, self._loss_sum / n, val_loss, self._grad_sum / n, lr, time.perf_counter() - self._start, is_best]
+
+    def close(self, early_stop: bool):
+        self.early_stopped = early_stop
+        self._flush_last(early_stop)
+        self._file.close()
+
+    def _flush_last(self, early_stop: bool):
+        # Rows are written one epoch late so the final row can carry the early-stop flag.
+        if self._last is not None:
+            self._writer.writerow(list(self.meta.values()) + self._last + [early_stop])
+            self._file.flush()
+            self._last = None
+
+
+def load_epoch_logs(log_dir) -> pd.DataFrame:
+    files = sorted(Path(log_dir).glob("*.csv"))
+    if not files:
+        return pd.DataFrame(columns=["run_id"] + EPOCH_COLUMNS)
+    return pd.concat([pd.read_csv(f).assign(log_file=f.name) for f in files], ignore_index=True)
+
+
+def patience_report(logs: pd.DataFrame, patience_values=(2, 4, 6, 8, 10, 15)) -> pd.DataFrame:
+    """Replay each logged trial run under a shorter patience.
+
+    For every patience p: the share of trials whose best logged val loss would still be reached,
+    the mean val-loss penalty over all trials, and the share of logged epochs that would be skipped.
+    Trials only run as long as their own patience, so p above the logged patience is not evaluated.
+    """
+    rows = []
+    trials = [g.sort_values("epoch") for _, g in logs.groupby(["log_file", "run_id"])]
+    for p in patience_values:
+        kept, penalties, epochs_used, epochs_logged = 0, [], 0, 0
+        for g in trials:
+            val = g["val_loss"].to_numpy()
+            best_so_far, since_best, stop = np.inf, 0, len(val)
+            for i, v in enumerate(val):
+                if v < best_so_far:
+                    best_so_far, since_best = v, 0
+                else:
+                    since_best += 1
+                    if since_best >= p:
+                        stop = i + 1
+                        break
+            best = val.min()
+            found = val[:stop].min()
+            kept += found <= best
+            penalties.append(found - best)
+            epochs_used += stop
+            epochs_logged += len(val)
+        rows.append(
+            {
+                "patience": p,
+                "trials": len(trials),
+                "best_kept_share": kept / max(len(trials), 1),
+                "mean_val_loss_penalty": float(np.mean(penalties)) if penalties else np.nan,
+                "epochs_saved_share": 1 - epochs_used / max(epochs_logged, 1),
+            }
+        )
+    return pd.DataFrame(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Summarize per-epoch HPO logs (best epoch, early stop, patience replay)")
+    parser.add_argument("log_dir", type=Path, help="hpo/epochs directory written by the hybrid trainers")
+    parser.add_argument("--patience", nargs="+", type=int, default=[2, 4, 6, 8, 10, 15])
+    args = parser.parse_args()
+
+    logs = load_epoch_logs(args.log_dir)
+    if logs.empty:
+        print(f"No epoch logs under {args.log_dir}")
+        return
+    per_trial = logs.groupby(["log_file", "run_id"]).agg(
+        epochs_ran=("epoch", "max"),
+        best_epoch=("epoch", lambda e: int(e[logs.loc[e.index, "is_best"]].max())),
+        early_stop=("early_stop", "last"),
+        best_val_loss=("val_loss", "min"),
+        mean_epoch_sec=("epoch_sec", "mean"),
+    )
+    print(per_trial.to_string())
+    print(f"\nBest epoch quantiles (of {len(per_trial)} trials):")
+    print(per_trial["best_epoch"].quantile([0.5, 0.9, 1.0]).to_string())
+    print("\nPatience replay:")
+    print(patience_report(logs, args.patience).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
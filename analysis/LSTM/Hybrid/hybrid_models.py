@@ -1,5 +1,7 @@
 import os
+import sys
 import copy
+from contextlib import contextmanager
 import numpy as np
 import pandas as pd
 import torch
@@ -7,14 +9,16 @@ import torch.nn as nn
 from sklearn.preprocessing import StandardScaler
 from sklearn.metrics import mean_squared_error, mean_absolute_error
 import matplotlib.pyplot as plt
-from statsmodels.tsa.statespace.sarimax import SARIMAX
 from torch.utils.data import DataLoader, TensorDataset
 
+sys.path.append("/Applications/dollar_price")
+from analysis.LSTM.Hybrid.arima_cache import fit_sarimax_cached
+
 torch.manual_seed(42)
 np.random.seed(42)
 
 # --- 1. Data Preprocessing Utility ---
-def prepare_hybrid_data(data_path, seq_length=10, test_size=200, seasonal_order=(0, 0, 0, 0)):
+def prepare_hybrid_data(data_path, seq_length=10, test_size=200, seasonal_order=(0, 0, 0, 0), use_cache=True):
     df = pd.read_csv(data_path)
     df['observation_date'] = pd.to_datetime(df['observation_date'])
     df = df.sort_values('observation_date').reset_index(drop=True)
@@ -23,15 +27,14 @@ def prepare_hybrid_data(data_path, seq_length=10, test_size=200, seasonal_order=
     # Use features including the exogenous liquidity variables
     feature_cols = ['MMF_total', 'RATE_SPREAD_KOR_USA']
     
-    train_ts = df[target_col].iloc[:-test_size]
     # Simple SARIMAX (1, 1, 1) for baseline trend extraction
-    arima_model = SARIMAX(train_ts, order=(1, 1, 1), seasonal_order=seasonal_order)
-    arima_result = arima_model.fit(disp=False)
-    
     # Get 1-step ahead predictions for the whole series to avoid data leakage 
-    # (using the parameters fitted on train)
-    res_full = arima_result.apply(df[target_col])
-    df['ARIMA_pred'] = res_full.fittedvalues
+    # (using the parameters fitted on train, cached across reruns)
+    _, arima_fitted = fit_sarimax_cached(
+        df[target_col], len(df) - test_size, order=(1, 1, 1), seasonal_order=seasonal_order,
+        dates=df['observation_date'], use_cache=use_cache
+    )
+    df['ARIMA_pred'] = arima_fitted
     df['Residuals'] = df[target_col] - df['ARIMA_pred']
     
     # We will predict Residuals using the exogenous features and past Residuals
@@ -72,6 +75,37 @@ def prepare_hybrid_data(data_path, seq_length=10, test_size=200, seasonal_order=
     return (X_train_seq, y_train_seq, X_test_seq, y_test_seq, 
             scaler_y, test_arima_preds, test_actuals, test_dates)
 
+# --- MC-dropout utilities ---
+@contextmanager
+def mc_dropout(model):
+    """Eval mode except for the dropout layers (and inter-layer LSTM dropout), restored to eval on exit."""
+    model.eval()
+    for m in model.modules():
+        if isinstance(m, nn.Dropout) or (isinstance(m, nn.LSTM) and m.dropout > 0):
+            m.train()
+    try:
+        yield model
+    finally:
+        model.eval()
+
+
+def mc_dropout_predict(model, x, n_samples=200):
+    """Draw `n_samples` stochastic passes as one (n_samples * batch) forward pass.
+
+    Returns a tensor of shape (n_samples, batch, outputs). Each replica of a window gets its own
+    dropout mask because masks are drawn per row of the replicated batch.
+    """
+    with mc_dropout(model), torch.no_grad():
+        out = model(x.repeat(n_samples, 1, 1))
+    return out.reshape(n_samples, x.shape[0], -1)
+
+
+def mc_interval(samples, alpha=0.1):
+    """(mean, lower, upper) over the sample axis for a central (1 - alpha) interval."""
+    samples = np.asarray(samples)
+    lower, upper = np.quantile(samples, [alpha / 2, 1 - alpha / 2], axis=0)
+    return samples.mean(axis=0), lower, upper
+
 # --- 2. Model A: ARIMA-LSTM Hybrid ---
 class LSTM_Residual_Predictor(nn.Module):
     def __init__(self, input_dim, hidden_dim=32, num_layers=1, dropout=0.2):
@@ -93,7 +127,7 @@ class ARIMA_LSTM_Model:
         self.criterion = nn.MSELoss()
         self.optimizer = torch.optim.Adam(self.model.parameters(), lr=lr, weight_decay=weight_decay) # L2 Regularization
         
-    def fit(self, X_train, y_train, epochs=100, batch_size=32, patience=10):
+    def fit(self, X_train, y_train, epochs=100, batch_size=32, patience=10, epoch_log=None):
         # We'll just use a small validation split from train for early stopping
         val_size = int(len(X_train) * 0.1)
         X_t, y_t = torch.FloatTensor(X_train[:-val_size]), torch.FloatTensor(y_train[:-val_size])
@@ -107,6 +141,8 @@ class ARIMA_LSTM_Model:
         best_model_wts = copy.deepcopy(self.model.state_dict())
         
         for epoch in range(epochs):
+            if epoch_log is not None:
+                epoch_log.start_epoch()
             self.model.train()
             for bx, by in train_loader:
                 bx, by = bx.to(self.device), by.to(self.device)
@@ -114,6 +150,8 @@ class ARIMA_LSTM_Model:
                 preds = self.model(bx)
                 loss = self.criterion(preds, by)
                 loss.backward()
+                if epoch_log is not None:
+                    epoch_log.batch(loss, self.model)
                 self.optimizer.step()
                 
             self.model.eval()
@@ -125,6 +163,8 @@ class ARIMA_LSTM_Model:
                     val_loss += self.criterion(val_preds, by).item()
             val_loss /= len(val_loader)
             
+            if epoch_log is not None:
+                epoch_log.end_epoch(epoch + 1, val_loss, self.optimizer.param_groups[0]["lr"], val_loss < best_loss)
             if val_loss < best_loss:
                 best_loss = val_loss
                 best_model_wts = copy.deepcopy(self.model.state_dict())
@@ -136,6 +176,8 @@ class ARIMA_LSTM_Model:
                 # Early stopping
                 break
                 
+        if epoch_log is not None:
+            epoch_log.close(early_stop=patience_counter >= patience)
         self.model.load_state_dict(best_model_wts)
         
     def predict(self, X_test):
@@ -145,6 +187,11 @@ class ARIMA_LSTM_Model:
             preds = self.model(X_test_t).cpu().numpy()
         return preds
 
+    def predict_mc(self, X_test, n_samples=200):
+        """MC-dropout samples of shape (n_samples, len(X_test), 1); see mc_dropout_predict."""
+        X_test_t = torch.FloatTensor(X_test).to(self.device)
+        return mc_dropout_predict(self.model, X_test_t, n_samples).cpu().numpy()
+
 # --- 3. Model B: ARIMA-CNN-LSTM Hybrid Architecture ---
 class CNN_LSTM_Residual_Predictor(nn.Module):
     def __init__(self, input_dim, cnn_filters=16, kernel_size=3, hidden_dim=32, num_layers=1, dropout=0.2):
@@ -181,6 +228,40 @@ class ARIMA_CNN_LSTM_Model(ARIMA_LSTM_Model):
         self.model = CNN_LSTM_Residual_Predictor(input_dim, cnn_filters, kernel_size, hidden_dim, num_layers, dropout).to(self.device)
         self.optimizer = torch.optim.Adam(self.model.parameters(), lr=lr, weight_decay=weight_decay)
 
+# --- Direct multi-step variants (used by run_hybrid_log_multistep.py) ---
+class LSTM_Multi_Step(nn.Module):
+    def __init__(self, input_dim, hidden_dim=32, num_layers=1, dropout=0.2, horizon=5):
+        super().__init__()
+        self.lstm = nn.LSTM(input_dim, hidden_dim, num_layers, batch_first=True, dropout=dropout if num_layers > 1 else 0)
+        self.dropout = nn.Dropout(dropout)
+        self.fc = nn.Linear(hidden_dim, horizon)
+    def forward(self, x):
+        lstm_out, _ = self.lstm(x)
+        out = self.dropout(lstm_out[:, -1, :])
+        out = self.fc(out)
+        return out
+
+
+class CNN_LSTM_Multi_Step(nn.Module):
+    def __init__(self, input_dim, cnn_filters=16, kernel_size=3, hidden_dim=32, num_layers=1, dropout=0.2, horizon=5):
+        super().__init__()
+        self.conv1d = nn.Conv1d(in_channels=input_dim, out_channels=cnn_filters, kernel_size=kernel_size, padding=kernel_size//2)
+        self.relu = nn.ReLU()
+        self.lstm = nn.LSTM(input_dim, hidden_dim, num_layers, batch_first=True, dropout=dropout if num_layers > 1 else 0)
+        self.dropout = nn.Dropout(dropout)
+        self.fc = nn.Linear(hidden_dim + cnn_filters, horizon)
+    def forward(self, x):
+        lstm_out, _ = self.lstm(x)
+        lstm_feat = self.dropout(lstm_out[:, -1, :])
+
+        x_cnn = x.transpose(1, 2)
+        c_out = self.relu(self.conv1d(x_cnn))
+        cnn_feat = c_out.mean(dim=-1)
+
+        combined = torch.cat((lstm_feat, cnn_feat), dim=1)
+        out = self.fc(combined)
+        return out
+
 # --- 4. Main Pipeline ---
 def main():
     data_path = 'analysis/LSTM/lstm_mmf/daily_dataset.csv'
@@ -0,0 +1,316 @@
+import argparse
+import sys
+from functools import lru_cache
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import torch
+
+sys.path.append("/Applications/dollar_price")
+from analysis.LSTM.Hybrid.arima_cache import sarimax_from_params
+from analysis.LSTM.Hybrid.hybrid_models import CNN_LSTM_Residual_Predictor, LSTM_Residual_Predictor, mc_dropout, mc_interval
+from analysis.LSTM.lstm_pretrain import scaler_from_state, scaler_state
+from analysis.LSTM.model_export import BACKENDS, compile_with_parity, example_windows
+
+
+BASE_DIR = Path("/Applications/dollar_price")
+MODEL_CACHE_SIZE = 8
+MC_SAMPLES = 200
+MC_ALPHA = 0.1
+# Rows trimmed after the SARIMAX stage before training (prepare_hybrid_data_for_period).
+ARIMA_WARMUP_ROWS = 5
+
+MODEL_BUILDERS = {
+    "ARIMA_LSTM_Model": LSTM_Residual_Predictor,
+    "ARIMA_CNN_LSTM_Model": CNN_LSTM_Residual_Predictor,
+}
+
+
+def save_hybrid_model(
+    out_path: Path,
+    model,
+    model_type: str,
+    model_config: dict,
+    prepared: dict,
+    data_path: Path,
+    period_name: str,
+    arima_order=(1, 1, 1),
+    seasonal_order=(0, 0, 0, 0),
+) -> Path:
+    """Persist a trained ARIMA_LSTM_Model / ARIMA_CNN_LSTM_Model with everything needed for inference."""
+    if model_type not in MODEL_BUILDERS:
+        raise ValueError(f"Unsupported model type: {model_type}")
+    out_path = Path(out_path)
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    df_ready = prepared["df_ready"]
+    period_end = pd.to_datetime(df_ready["observation_date"].iloc[-1])
+    data_end = pd.to_datetime(pd.read_csv(data_path, usecols=["observation_date"])["observation_date"]).max()
+    artifact = {
+        "model_type": model_type,
+        "model_config": {"input_dim": int(prepared["X_train"].shape[2]), **model_config},
+        "state_dict": {k: v.detach().cpu() for k, v in model.model.state_dict().items()},
+        "scaler_X": scaler_state(prepared["scaler_X"]),
+        "scaler_y": scaler_state(prepared["scaler_y"]),
+        "arima": {
+            "order": list(arima_order),
+            "seasonal_order": list(seasonal_order),
+            "params": np.asarray(prepared["arima_params"], dtype=np.float64).tolist(),
+        },
+        "feature_cols": list(prepared["feature_cols"]),
+        "target_col": "USD_KRW",
+        "seq_length": int(prepared["seq_length"]),
+        "data_path": str(data_path),
+        "period": period_name,
+        "period_start": prepared["period_start"],
+        "period_end": str(period_end.date()),
+        # A period that runs to the end of the dataset may serve origins appended after training.
+        "open_ended": bool(period_end >= data_end),
+        "blocks": "block_index" in df_ready.columns,
+        "trained_through": str(pd.to_datetime(df_ready["observation_date"].iloc[prepared["train_rows"] - 1]).date()),
+    }
+    torch.save(artifact, out_path)
+    return out_path
+
+
+class HybridForecaster:
+    def __init__(self, artifact: dict, source: str, backend: str = "eager"):
+        missing = [k for k in ("period_start", "period_end", "open_ended", "blocks") if k not in artifact]
+        if missing:
+            raise ValueError(f"{source}: artifact has no {', '.join(missing)} (saved before period checks); re-run training to re-save it")
+        self.artifact = artifact
+        self.source = source
+        self.backend = backend
+        self.device = torch.device("cpu")
+        builder = MODEL_BUILDERS[artifact["model_type"]]
+        self.model = builder(**artifact["model_config"]).to(self.device)
+        self.model.load_state_dict(artifact["state_dict"])
+        self.model.eval()
+        # MC-dropout needs the fp32 eager weights with live dropout layers, whatever the serving backend.
+        self.mc_model = self.model
+        self.parity = None
+        if backend != "eager":
+            # TorchScript / int8 model, verified against the fp32 weights before serving.
+            x = example_windows(256, artifact["seq_length"], artifact["model_config"]["input_dim"])
+            self.model, self.parity = compile_with_parity(self.model, backend, x)
+        self.scaler_X = scaler_from_state(artifact["scaler_X"])
+        self.scaler_y = scaler_from_state(artifact["scaler_y"])
+        self.arima_params = np.asarray(artifact["arima"]["params"], dtype=np.float64)
+        self.arima_order = tuple(artifact["arima"]["order"])
+        self.seasonal_order = tuple(artifact["arima"]["seasonal_order"])
+        self.feature_cols = artifact["feature_cols"]
+        self.target_col = artifact["target_col"]
+        self.seq_length = artifact["seq_length"]
+
+    def _period_rows(self, df: pd.DataFrame) -> tuple[int, int]:
+        """First and last row of `df` this model may serve, after checking the data matches the artifact.
+
+        The SARIMAX stage is re-filtered from the trained period's first row, so `df` must carry
+        that date and the trained columns. A closed sub-period model serves only origins inside
+        its period; a model trained through the end of its dataset also serves rows added since.
+        """
+        missing = [c for c in [*self.feature_cols, self.target_col] if c not in df.columns]
+        if missing:
+            raise ValueError(f"{self.source}: data has no {', '.join(missing)} (model features: {self.feature_cols})")
+        if self.artifact["blocks"]:
+            raise ValueError(f"{self.source}: trained on stitched anomaly blocks ({self.artifact['period']}); it cannot serve a contiguous daily series")
+        dates = df["observation_date"]
+        period_start = pd.Timestamp(self.artifact["period_start"])
+        start = int(dates.searchsorted(period_start))
+        if start == len(df) or dates.iloc[start] != period_start:
+            raise ValueError(f"{self.source}: data does not contain the period start {period_start.date()} ({self.artifact['period']})")
+        if self.artifact["open_ended"]:
+            end = len(df) - 1
+        else:
+            end = int(dates.searchsorted(pd.Timestamp(self.artifact["period_end"]), side="right")) - 1
+        return start, end
+
+    def _arima_stage(self, target: np.ndarray, origins: np.ndarray, horizon: int):
+        """One SARIMAX filter over `target`: (one-step fitted values, `horizon`-step paths from each origin).
+
+        Fixed (trained) parameters, no refit. One-step fitted values only use earlier rows, so
+        fitted[: origin + 1] is what a filter over the history up to the origin gives; each path
+        iterates the state space from that origin's one-step state prediction.
+        """
+        res = sarimax_from_params(target, self.arima_params, order=self.arima_order, seasonal_order=self.seasonal_order)
+        ssm = res.model.ssm
+        design, obs_intercept = ssm["design"], ssm["obs_intercept"]
+        transition, state_intercept = ssm["transition"], ssm["state_intercept"][:, None]
+        state = res.predicted_state[:, origins + 1]
+        paths = np.empty((len(origins), horizon))
+        for step in range(horizon):
+            paths[:, step] = (design @ state)[0] + obs_intercept[0]
+            state = transition @ state + state_intercept
+        return np.asarray(res.fittedvalues), paths
+
+    def _rollout(self, model, curr_seq: torch.Tensor, horizon: int) -> np.ndarray:
+        """Feed each predicted residual back as the next window row; returns unscaled residuals (batch, horizon)."""
+        resid_mean_x, resid_scale_x = self.scaler_X.mean_[-1], self.scaler_X.scale_[-1]
+        preds_scaled = torch.empty((curr_seq.shape[0], horizon))
+        with torch.no_grad():
+            for step in range(horizon):
+                pred = model(curr_seq)[:, 0]
+                preds_scaled[:, step] = pred
+                if step < horizon - 1:
+                    resid = pred.numpy() * self.scaler_y.scale_[0] + self.scaler_y.mean_[0]
+                    new_step = curr_seq[:, -1, :].clone()
+                    new_step[:, -1] = torch.FloatTensor((resid - resid_mean_x) / resid_scale_x)
+                    curr_seq = torch.cat([curr_seq[:, 1:, :], new_step[:, None, :]], dim=1)
+        return self.scaler_y.inverse_transform(preds_scaled.numpy().reshape(-1, 1)).reshape(-1, horizon)
+
+    def forecast(self, df: pd.DataFrame, horizon: int, origins=None, mc_samples: int = 0, alpha: float = MC_ALPHA) -> pd.DataFrame:
+        """Recursive next-`horizon`-day USD/KRW paths from each origin row of `df` (default: last row).
+
+        All origins are rolled out together as one (origins, seq_len, features) batch. Future
+        covariates are unknown, so they are held at their last observed value.
+
+        With `mc_samples` > 0 the windows are also replicated `mc_samples` times along the batch
+        and rolled out with dropout active (MC-dropout), adding pred_fx_mean / pred_fx_std and a
+        central (1 - alpha) interval pred_fx_lower / pred_fx_upper per step. Each step is one
+        (mc_samples * origins) forward pass, so S=200 costs one large batch, not 200 calls.
+        """
+        df = df.sort_values("observation_date").reset_index(drop=True)
+        start, end = self._period_rows(df)
+        if origins is None:
+            origins = [len(df) - 1]
+        origins = np.asarray(origins, dtype=int)
+        first = start + ARIMA_WARMUP_ROWS + self.seq_length - 1
+        outside = (origins < first) | (origins > end)
+        if outside.any():
+            dates = df["observation_date"]
+            bad = ", ".join(str(dates.iloc[max(o, 0)].date()) for o in origins[outside][:3])
+            raise ValueError(
+                f"{self.source}: origin {bad} outside the servable range "
+                f"{dates.iloc[min(first, len(df) - 1)].date()} .. {dates.iloc[end].date()} ({self.artifact['period']})"
+            )
+
+        # Filter the period once up to the latest origin, then slice per origin.
+        rows = slice(start, int(origins.max()) + 1)
+        target = df[self.target_col].to_numpy(dtype=np.float64)[rows]
+        fitted, arima_paths = self._arima_stage(target, origins - start, horizon)
+        X_hist = self.scaler_X.transform(np.column_stack([df[self.feature_cols].to_numpy(dtype=np.float64)[rows], target - fitted]))
+        windows = [X_hist[o - start - self.seq_length + 1 : o - start + 1] for o in origins]
+
+        curr_seq = torch.FloatTensor(np.stack(windows)).to(self.device)
+        pred_fx = arima_paths + self._rollout(self.model, curr_seq, horizon)
+
+        bands = {}
+        if mc_samples > 0:
+            # Sample-major replication: rows [s * origins:(s + 1) * origins] are sample s.
+            with mc_dropout(self.mc_model):
+                resid = self._rollout(self.mc_model, curr_seq.repeat(mc_samples, 1, 1), horizon)
+            samples = arima_paths[None] + resid.reshape(mc_samples, len(origins), horizon)
+            mean, lower, upper = mc_interval(samples, alpha)
+            bands = {
+                "pred_fx_mean": mean,
+                "pred_fx_std": samples.std(axis=0),
+                "pred_fx_lower": lower,
+                "pred_fx_upper": upper,
+            }
+
+        rows = []
+        for i, origin in enumerate(origins):
+            origin_date = pd.to_datetime(df["observation_date"].iloc[origin])
+            dates = pd.bdate_range(origin_date + pd.offsets.BDay(1), periods=horizon)
+            rows.append(
+                pd.DataFrame(
+                    {
+                        "origin_date": origin_date,
+                        "date": dates,
+                        "step": np.arange(1, horizon + 1),
+                        "pred_arima": arima_paths[i],
+                        "pred_fx": pred_fx[i],
+                        **{col: band[i] for col, band in bands.items()},
+                        "source_model": self.source,
+                    }
+                )
+            )
+        return pd.concat(rows, axis=0, ignore_index=True)
+
+
+@lru_cache(maxsize=MODEL_CACHE_SIZE)
+def _load_forecaster(path: str, mtime_ns: int, backend: str) -> HybridForecaster:
+    artifact = torch.load(path, map_location="cpu", weights_only=True)
+    return HybridForecaster(artifact, source=Path(path).stem, backend=backend)
+
+
+def load_forecaster(artifact_path, backend: str = "eager") -> HybridForecaster:
+    """Return a warm model from the LRU cache; a re-saved artifact (new mtime) is reloaded."""
+    artifact_path = Path(artifact_path).resolve()
+    return _load_forecaster(str(artifact_path), artifact_path.stat().st_mtime_ns, backend)
+
+
+@lru_cache(maxsize=4)
+def _load_daily_dataset(path: str, mtime_ns: int) -> pd.DataFrame:
+    df = pd.read_csv(path)
+    df["observation_date"] = pd.to_datetime(df["observation_date"])
+    return df.sort_values("observation_date").reset_index(drop=True)
+
+
+def load_daily_dataset(data_path) -> pd.DataFrame:
+    data_path = Path(data_path)
+    return _load_daily_dataset(str(data_path), data_path.stat().st_mtime_ns)
+
+
+def request_fx_paths(
+    requests: list[dict], data_path=None, backend: str = "eager", mc_samples: int = 0, alpha: float = MC_ALPHA
+) -> pd.DataFrame:
+    """Serve a batch of {"artifact": path, "horizon": H, "as_of": date | None} requests.
+
+    Requests that share an artifact are answered from one batched rollout using the longest
+    horizon among them. The output (date, pred_fx) can be passed to
+    run_final_fx_impact_pipeline.py via --shock-path; with `mc_samples` > 0 it also carries the
+    MC-dropout interval columns (pred_fx_lower / pred_fx_upper), which the pipeline runs as
+    extra scenario paths.
+    """
+    outputs = []
+    by_artifact = {}
+    for req_id, req in enumerate(requests):
+        by_artifact.setdefault(str(req["artifact"]), []).append((req_id, req))
+
+    for artifact_path, reqs in by_artifact.items():
+        forecaster = load_forecaster(artifact_path, backend)
+        df = load_daily_dataset(data_path or forecaster.artifact["data_path"])
+        dates = df["observation_date"]
+        origins = []
+        for _, req in reqs:
+            as_of = req.get("as_of")
+            origin = len(df) - 1 if as_of is None else int(dates.searchsorted(pd.to_datetime(as_of), side="right")) - 1
+            origins.append(origin)
+        max_horizon = max(int(req["horizon"]) for _, req in reqs)
+        paths = forecaster.forecast(df, max_horizon, origins=origins, mc_samples=mc_samples, alpha=alpha)
+
+        n_steps = max_horizon
+        for i, (req_id, req) in enumerate(reqs):
+            part = paths.iloc[i * n_steps : i * n_steps + int(req["horizon"])].copy()
+            part.insert(0, "request_id", req_id)
+            outputs.append(part)
+
+    if not outputs:
+        return pd.DataFrame(columns=["request_id", "origin_date", "date", "step", "pred_arima", "pred_fx", "source_model"])
+    return pd.concat(outputs, axis=0, ignore_index=True).sort_values(["request_id", "step"]).reset_index(drop=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve next-H-day USD/KRW paths from saved hybrid models")
+    parser.add_argument("artifacts", nargs="+", type=Path, help="saved model .pt files (hybrid_*/models/*.pt)")
+    parser.add_argument("--horizon", type=int, default=20)
+    parser.add_argument("--as-of", default=None, help="origin date (default: latest row of the daily dataset)")
+    parser.add_argument("--data-path", type=Path, default=None, help="override the daily dataset recorded in the artifact")
+    parser.add_argument("--out", type=Path, default=None, help="CSV path (usable as --shock-path for the FX impact pipeline)")
+    parser.add_argument("--backend", choices=BACKENDS, default="eager", help="script/int8 compile the model after a parity check")
+    parser.add_argument("--mc-samples", type=int, default=0, help=f"MC-dropout passes for prediction intervals (e.g. {MC_SAMPLES}; 0 = point only)")
+    parser.add_argument("--alpha", type=float, default=MC_ALPHA, help="interval is the central 1 - alpha quantile range")
+    args = parser.parse_args()
+
+    reqs = [{"artifact": p, "horizon": args.horizon, "as_of": args.as_of} for p in args.artifacts]
+    paths = request_fx_paths(reqs, data_path=args.data_path, backend=args.backend, mc_samples=args.mc_samples, alpha=args.alpha)
+    if args.out is not None:
+        args.out.parent.mkdir(parents=True, exist_ok=True)
+        paths.to_csv(args.out, index=False)
+        print(f"Saved {args.out}")
+    print(paths.to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
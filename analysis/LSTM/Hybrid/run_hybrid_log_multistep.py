@@ -3,6 +3,7 @@ import argparse
 import itertools
 import json
 import os
+import sys
 import time
 from pathlib import Path
 
@@ -15,8 +16,14 @@ import torch
 import torch.nn as nn
 from sklearn.metrics import mean_absolute_error, mean_squared_error
 from sklearn.preprocessing import StandardScaler
-from statsmodels.tsa.statespace.sarimax import SARIMAX
-from torch.utils.data import DataLoader, TensorDataset
+
+sys.path.append("/Applications/dollar_price")
+from analysis.LSTM.Hybrid.arima_cache import fit_sarimax_cached
+from analysis.LSTM.Hybrid.block_windows import BlockWindowSampler
+from analysis.LSTM.Hybrid.epoch_log import EpochLog, epoch_log_path
+from analysis.LSTM.Hybrid.hybrid_models import CNN_LSTM_Multi_Step, LSTM_Multi_Step
+from analysis.LSTM.Hybrid.trial_store import TrialStore, config_hash, run_trials
+from analysis.LSTM.shared_dataset import export_dataset, open_dataset, window_hash, window_loader
 
 torch.manual_seed(42)
 np.random.seed(42)
@@ -48,6 +55,12 @@ parser.add_argument(
     choices=["quick", "standard", "aggressive"],
     help="HPO search budget preset",
 )
+parser.add_argument(
+    "--trial-store",
+    type=Path,
+    default=None,
+    help="SQLite trial checkpoint shared by resumed / parallel runs (default: <output>/hpo/trials.sqlite)",
+)
 args = parser.parse_args()
 target_type = args.target
 
@@ -65,6 +78,8 @@ os.makedirs(OUTPUT_DIR, exist_ok=True)
 os.makedirs(OUTPUT_DIR / "full", exist_ok=True)
 os.makedirs(OUTPUT_DIR / "eval", exist_ok=True)
 os.makedirs(OUTPUT_DIR / "hpo", exist_ok=True)
+if args.trial_store is None:
+    args.trial_store = OUTPUT_DIR / "hpo" / "trials.sqlite"
 
 HORIZON = 5
 
@@ -94,14 +109,6 @@ HPO_PRESETS = {
 HPO_CONFIG = HPO_PRESETS[args.hpo_level]
 
 
-def create_sequences(X: np.ndarray, y: np.ndarray, seq_len: int, horizon: int):
-    xs, ys = [], []
-    for i in range(len(X) - seq_len - horizon + 1):
-        xs.append(X[i : i + seq_len])
-        ys.append(y[i + seq_len : i + seq_len + horizon, 0])
-    return np.array(xs), np.array(ys)
-
-
 def load_period_definition() -> dict:
     with open(PERIOD_DEF_PATH, "r", encoding="utf-8") as f:
         return json.load(f)
@@ -253,7 +260,7 @@ def plot_multistep_forecast(
     plt.close(fig)
 
 
-def prepare_log_data_for_period(df_period: pd.DataFrame, seq_length: int = 10, horizon: int = 5, test_ratio: float = 0.2, seasonal_order=(0, 0, 0, 0)):
+def prepare_log_data_for_period(df_period: pd.DataFrame, seq_length: int = 10, horizon: int = 5, test_ratio: float = 0.2, seasonal_order=(0, 0, 0, 0), use_cache: bool = True):
     target_col = "USD_KRW"
     feature_cols = ["M2_수시입출식저축성예금", "RATE_SPREAD_KOR_USA"] if target_type == "m2" else ["MMF_total", "RATE_SPREAD_KOR_USA"]
 
@@ -269,12 +276,15 @@ def prepare_log_data_for_period(df_period: pd.DataFrame, seq_length: int = 10, h
     train_size = n_total - test_size
 
     # Fit SARIMAX(1,0,1) on Log_Return (since it's already stationary)
-    train_ts = df_period["Log_Return"].iloc[:train_size]
-    arima_model = SARIMAX(train_ts, order=(1, 0, 1), seasonal_order=seasonal_order)
-    arima_result = arima_model.fit(disp=False)
-
-    res_full = arima_result.apply(df_period["Log_Return"])
-    df_period["ARIMA_Log_pred"] = res_full.fittedvalues
+    _, arima_fitted = fit_sarimax_cached(
+        df_period["Log_Return"],
+        train_size,
+        order=(1, 0, 1),
+        seasonal_order=seasonal_order,
+        dates=df_period["observation_date"],
+        use_cache=use_cache,
+    )
+    df_period["ARIMA_Log_pred"] = arima_fitted
     df_period["Residuals"] = df_period["Log_Return"] - df_period["ARIMA_Log_pred"]
 
     train_df = df_period.iloc[:train_size].copy()
@@ -284,20 +294,43 @@ def prepare_log_data_for_period(df_period: pd.DataFrame, seq_length: int = 10, h
     scaler_X = StandardScaler()
     scaler_y = StandardScaler()
 
-    train_X = scaler_X.fit_transform(train_df[X_cols].values)
-    train_y = scaler_y.fit_transform(train_df[["Residuals"]].values)
+    scaler_X.fit(train_df[X_cols].values)
+    scaler_y.fit(train_df[["Residuals"]].values)
 
-    test_overlap = pd.concat([train_df.iloc[-seq_length:], test_df], axis=0)
-    test_X = scaler_X.transform(test_overlap[X_cols].values)
-    test_y = scaler_y.transform(test_overlap[["Residuals"]].values)
-    
     full_X = scaler_X.transform(df_period[X_cols].values)
     full_y = scaler_y.transform(df_period[["Residuals"]].values)
 
-    X_train_seq, y_train_seq = create_sequences(train_X, train_y, seq_length, horizon)
-    # Note: test test_overlap doesn't generate targets properly for the end bounds unless handled
-    X_test_seq, y_test_seq = create_sequences(test_X, test_y, seq_length, horizon)
-    X_full_seq, y_full_seq = create_sequences(full_X, full_y, seq_length, horizon)
+    last_start = n_total - seq_length - horizon + 1
+    if "block_index" in df_period.columns:
+        # Train only on windows (and horizon targets) inside a single anomaly block. Test/full
+        # windows stay contiguous because build_multistep_forecast_frame indexes them by offset
+        # and already drops forecasts that cross a block boundary.
+        train_starts = BlockWindowSampler(df_period["block_index"].values, seq_length, horizon, hi=train_size).starts
+    else:
+        train_starts = np.arange(train_size - seq_length - horizon + 1)
+    # Test windows start seq_length rows before the split (train tail as context).
+    # HPO workers sharing a trial store map one export of the scaled data instead of each
+    # building and holding its own windows.
+    dates = df_period["observation_date"]
+    shared = open_dataset(
+        export_dataset(
+            f"hybrid_log_{target_type}/{pd.Timestamp(dates.iloc[0]).date()}_{pd.Timestamp(dates.iloc[-1]).date()}",
+            full_X,
+            full_y,
+            {
+                "train": train_starts,
+                "test": np.arange(max(train_size - seq_length, 0), max(last_start, 0)),
+                "all": np.arange(max(last_start, 0)),
+            },
+            seq_length=seq_length,
+            target_offset=seq_length,
+            horizon=horizon,
+            meta={"features": X_cols, "train_rows": int(train_size)},
+        )
+    )
+    X_train_seq, y_train_seq = shared.windows("train")
+    X_test_seq, y_test_seq = shared.windows("test")
+    X_full_seq, y_full_seq = shared.windows("all")
 
     return {
         "X_train": X_train_seq, "y_train": y_train_seq,
@@ -310,40 +343,6 @@ def prepare_log_data_for_period(df_period: pd.DataFrame, seq_length: int = 10, h
     }
 
 
-class LSTM_Multi_Step(nn.Module):
-    def __init__(self, input_dim, hidden_dim=32, num_layers=1, dropout=0.2, horizon=5):
-        super().__init__()
-        self.lstm = nn.LSTM(input_dim, hidden_dim, num_layers, batch_first=True, dropout=dropout if num_layers > 1 else 0)
-        self.dropout = nn.Dropout(dropout)
-        self.fc = nn.Linear(hidden_dim, horizon)
-    def forward(self, x):
-        lstm_out, _ = self.lstm(x)
-        out = self.dropout(lstm_out[:, -1, :])
-        out = self.fc(out)
-        return out
-
-
-class CNN_LSTM_Multi_Step(nn.Module):
-    def __init__(self, input_dim, cnn_filters=16, kernel_size=3, hidden_dim=32, num_layers=1, dropout=0.2, horizon=5):
-        super().__init__()
-        self.conv1d = nn.Conv1d(in_channels=input_dim, out_channels=cnn_filters, kernel_size=kernel_size, padding=kernel_size//2)
-        self.relu = nn.ReLU()
-        self.lstm = nn.LSTM(input_dim, hidden_dim, num_layers, batch_first=True, dropout=dropout if num_layers > 1 else 0)
-        self.dropout = nn.Dropout(dropout)
-        self.fc = nn.Linear(hidden_dim + cnn_filters, horizon)
-    def forward(self, x):
-        lstm_out, _ = self.lstm(x)
-        lstm_feat = self.dropout(lstm_out[:, -1, :])
-
-        x_cnn = x.transpose(1, 2)
-        c_out = self.relu(self.conv1d(x_cnn))
-        cnn_feat = c_out.mean(dim=-1)
-
-        combined = torch.cat((lstm_feat, cnn_feat), dim=1)
-        out = self.fc(combined)
-        return out
-
-
 class Hybrid_Model_Trainer:
     def __init__(self, model, lr=0.001, weight_decay=1e-5):
         self.device = torch.device('cuda' if torch.cuda.is_available() else 'mps' if torch.backends.mps.is_available() else 'cpu')
@@ -351,19 +350,18 @@ class Hybrid_Model_Trainer:
         self.criterion = nn.MSELoss()
         self.optimizer = torch.optim.Adam(self.model.parameters(), lr=lr, weight_decay=weight_decay)
 
-    def fit(self, X_train, y_train, epochs=100, batch_size=32, patience=5):
+    def fit(self, X_train, y_train, epochs=100, batch_size=32, patience=5, epoch_log=None):
         val_size = max(int(len(X_train) * 0.1), 1)
-        X_t, y_t = torch.FloatTensor(X_train[:-val_size]), torch.FloatTensor(y_train[:-val_size])
-        X_v, y_v = torch.FloatTensor(X_train[-val_size:]), torch.FloatTensor(y_train[-val_size:])
-        
-        train_loader = DataLoader(TensorDataset(X_t, y_t), batch_size=batch_size, shuffle=False)
-        val_loader = DataLoader(TensorDataset(X_v, y_v), batch_size=batch_size, shuffle=False)
+        train_loader = window_loader(X_train[:-val_size], y_train[:-val_size], batch_size)
+        val_loader = window_loader(X_train[-val_size:], y_train[-val_size:], batch_size)
         
         best_loss = float('inf')
         patience_counter = 0
         best_model_wts = copy.deepcopy(self.model.state_dict())
         
         for epoch in range(epochs):
+            if epoch_log is not None:
+                epoch_log.start_epoch()
             self.model.train()
             for bx, by in train_loader:
                 bx, by = bx.to(self.device), by.to(self.device)
@@ -371,6 +369,8 @@ class Hybrid_Model_Trainer:
                 preds = self.model(bx)
                 loss = self.criterion(preds, by)
                 loss.backward()
+                if epoch_log is not None:
+                    epoch_log.batch(loss, self.model)
                 self.optimizer.step()
                 
             self.model.eval()
@@ -382,6 +382,8 @@ class Hybrid_Model_Trainer:
                     val_loss += self.criterion(val_preds, by).item()
             val_loss /= len(val_loader)
             
+            if epoch_log is not None:
+                epoch_log.end_epoch(epoch + 1, val_loss, self.optimizer.param_groups[0]["lr"], val_loss < best_loss)
             if val_loss < best_loss:
                 best_loss = val_loss
                 best_model_wts = copy.deepcopy(self.model.state_dict())
@@ -390,6 +392,8 @@ class Hybrid_Model_Trainer:
                 patience_counter += 1
                 if patience_counter >= patience:
                     break
+        if epoch_log is not None:
+            epoch_log.close(early_stop=patience_counter >= patience)
         self.model.load_state_dict(best_model_wts)
         return float(best_loss)
 
@@ -465,81 +469,87 @@ def run_period(period_name: str, period_df: pd.DataFrame):
     df_ready = prepared["df_ready"]
     input_dim = X_train.shape[2]
 
-    # Expanded HPO with saved trial logs.
+    # Expanded HPO with saved trial logs. Finished trials are checkpointed in the trial store,
+    # keyed by the training data so a changed dataset never reuses stale scores.
     gridA, gridB = build_grids()
-    best_a_cfg, best_val_a = gridA[0], float('inf')
-    best_b_cfg, best_val_b = gridB[0], float('inf')
-    trials_a, trials_b = [], []
-
-    print(f"Tuning Model A... ({len(gridA)} trials)")
-    for i, cfg in enumerate(gridA, start=1):
-        trial_start = time.time()
-        torch.manual_seed(1000 + i)
-        np.random.seed(1000 + i)
-
-        net = LSTM_Multi_Step(
-            input_dim,
-            hidden_dim=cfg["hidden_dim"],
-            dropout=cfg["dropout"],
-            horizon=horizon,
-        )
-        trainer = Hybrid_Model_Trainer(net, lr=cfg["lr"])
-        val_rmse = np.sqrt(
-            trainer.fit(
-                X_train,
-                y_train,
-                epochs=cfg["epochs"],
-                batch_size=cfg["batch_size"],
-                patience=cfg["patience"],
+    data_key = window_hash(X_train, y_train)[:12]
+    store = TrialStore(args.trial_store)
+
+    def run_trial(model_key, build_net):
+        def run(i, cfg, seed):
+            trial_start = time.time()
+            torch.manual_seed(seed)
+            np.random.seed(seed)
+
+            trainer = Hybrid_Model_Trainer(build_net(cfg), lr=cfg["lr"])
+            epoch_log = EpochLog(
+                epoch_log_path(OUTPUT_DIR / "hpo", period_name, model_key, i),
+                period=period_name,
+                model=model_key.upper(),
+                trial=i,
             )
-        )
-        trials_a.append(
-            {
+            val_rmse = np.sqrt(
+                trainer.fit(
+                    X_train,
+                    y_train,
+                    epochs=cfg["epochs"],
+                    batch_size=cfg["batch_size"],
+                    patience=cfg["patience"],
+                    epoch_log=epoch_log,
+                )
+            )
+            return {
                 "trial": i,
                 **cfg,
+                "seed": seed,
+                "config_hash": config_hash(cfg),
                 "val_rmse_scaled": float(val_rmse),
+                "epochs_ran": epoch_log.epochs_ran,
+                "best_epoch": epoch_log.best_epoch,
+                "early_stopped": epoch_log.early_stopped,
                 "duration_sec": float(time.time() - trial_start),
+                "epoch_log": epoch_log.path.name,
             }
-        )
-        if val_rmse < best_val_a:
-            best_val_a = val_rmse
-            best_a_cfg = cfg
+
+        return run
+
+    print(f"Tuning Model A... ({len(gridA)} trials)")
+    trials_a = run_trials(
+        store,
+        f"{target_type}/{period_name}/model_a/{data_key}",
+        gridA,
+        1000,
+        run_trial(
+            "a",
+            lambda cfg: LSTM_Multi_Step(input_dim, hidden_dim=cfg["hidden_dim"], dropout=cfg["dropout"], horizon=horizon),
+        ),
+    )
 
     print(f"Tuning Model B... ({len(gridB)} trials)")
-    for i, cfg in enumerate(gridB, start=1):
-        trial_start = time.time()
-        torch.manual_seed(2000 + i)
-        np.random.seed(2000 + i)
-
-        net = CNN_LSTM_Multi_Step(
-            input_dim,
-            cnn_filters=cfg["cnn_filters"],
-            kernel_size=cfg["kernel_size"],
-            hidden_dim=cfg["hidden_dim"],
-            dropout=cfg["dropout"],
-            horizon=horizon,
-        )
-        trainer = Hybrid_Model_Trainer(net, lr=cfg["lr"])
-        val_rmse = np.sqrt(
-            trainer.fit(
-                X_train,
-                y_train,
-                epochs=cfg["epochs"],
-                batch_size=cfg["batch_size"],
-                patience=cfg["patience"],
-            )
-        )
-        trials_b.append(
-            {
-                "trial": i,
-                **cfg,
-                "val_rmse_scaled": float(val_rmse),
-                "duration_sec": float(time.time() - trial_start),
-            }
-        )
-        if val_rmse < best_val_b:
-            best_val_b = val_rmse
-            best_b_cfg = cfg
+    trials_b = run_trials(
+        store,
+        f"{target_type}/{period_name}/model_b/{data_key}",
+        gridB,
+        2000,
+        run_trial(
+            "b",
+            lambda cfg: CNN_LSTM_Multi_Step(
+                input_dim,
+                cnn_filters=cfg["cnn_filters"],
+                kernel_size=cfg["kernel_size"],
+                hidden_dim=cfg["hidden_dim"],
+                dropout=cfg["dropout"],
+                horizon=horizon,
+            ),
+        ),
+    )
+    store.close()
+
+    # First strictly-best trial in grid order, as in the original sequential search.
+    best_a = min(trials_a, key=lambda t: t["val_rmse_scaled"])
+    best_b = min(trials_b, key=lambda t: t["val_rmse_scaled"])
+    best_a_cfg, best_val_a = gridA[best_a["trial"] - 1], best_a["val_rmse_scaled"]
+    best_b_cfg, best_val_b = gridB[best_b["trial"] - 1], best_b["val_rmse_scaled"]
 
     pd.DataFrame(trials_a).sort_values("val_rmse_scaled").to_csv(
         OUTPUT_DIR / "hpo" / f"{period_name}_model_a_trials.csv", index=False
@@ -562,6 +572,10 @@ def run_period(period_name: str, period_df: pd.DataFrame):
         )
 
     print("Training Final Models...")
+    # Seed the final fits explicitly: with resumed / parallel HPO the global RNG state at this
+    # point depends on which trials this process actually ran.
+    torch.manual_seed(3000)
+    np.random.seed(3000)
     net_A = LSTM_Multi_Step(
         input_dim,
         hidden_dim=best_a_cfg["hidden_dim"],
@@ -577,6 +591,8 @@ def run_period(period_name: str, period_df: pd.DataFrame):
         patience=max(best_a_cfg["patience"], 8),
     )
 
+    torch.manual_seed(4000)
+    np.random.seed(4000)
     net_B = CNN_LSTM_Multi_Step(
         input_dim,
         cnn_filters=best_b_cfg["cnn_filters"],
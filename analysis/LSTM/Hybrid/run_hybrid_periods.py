@@ -2,6 +2,7 @@ import copy
 import itertools
 import json
 import os
+import sys
 import time
 from pathlib import Path
 
@@ -12,9 +13,14 @@ import torch
 import torch.nn as nn
 from sklearn.metrics import mean_absolute_error, mean_squared_error
 from sklearn.preprocessing import StandardScaler
-from statsmodels.tsa.statespace.sarimax import SARIMAX
 from torch.utils.data import DataLoader, TensorDataset
 
+sys.path.append("/Applications/dollar_price")
+from analysis.LSTM.Hybrid.arima_cache import fit_sarimax_cached
+from analysis.LSTM.Hybrid.block_windows import BlockWindowSampler, normalize_per_block
+from analysis.LSTM.Hybrid.epoch_log import EpochLog, epoch_log_path
+from analysis.LSTM.Hybrid.hybrid_service import save_hybrid_model
+
 
 torch.manual_seed(42)
 np.random.seed(42)
@@ -29,11 +35,14 @@ os.makedirs(OUTPUT_DIR, exist_ok=True)
 os.makedirs(OUTPUT_DIR / "full", exist_ok=True)
 os.makedirs(OUTPUT_DIR / "eval", exist_ok=True)
 os.makedirs(OUTPUT_DIR / "hpo", exist_ok=True)
+os.makedirs(OUTPUT_DIR / "models", exist_ok=True)
 
 TOTAL_HPO_TRIALS = 100
 TRIALS_PER_MODEL = TOTAL_HPO_TRIALS // 2
 MAX_TUNE_TRAIN = 1200
 MAX_TUNE_VAL = 300
+# Build windows per anomaly block instead of sliding across block boundaries.
+BLOCK_AWARE_WINDOWS = True
 
 
 def create_sequences(X: np.ndarray, y: np.ndarray, seq_len: int):
@@ -70,7 +79,7 @@ def build_anomaly_concatenated(df: pd.DataFrame, period_def: dict) -> pd.DataFra
     return out.sort_values(["block_index", "observation_date"]).reset_index(drop=True)
 
 
-def prepare_hybrid_data_for_period(df_period: pd.DataFrame, seq_length: int = 10, test_ratio: float = 0.2, seasonal_order=(0, 0, 0, 0)):
+def prepare_hybrid_data_for_period(df_period: pd.DataFrame, seq_length: int = 10, test_ratio: float = 0.2, seasonal_order=(0, 0, 0, 0), use_cache: bool = True, block_aware: bool = BLOCK_AWARE_WINDOWS, block_norm: bool = False):
     target_col = "USD_KRW"
     feature_cols = ["MMF_total", "RATE_SPREAD_KOR_USA"]
 
@@ -80,15 +89,20 @@ def prepare_hybrid_data_for_period(df_period: pd.DataFrame, seq_length: int = 10
     if train_size <= seq_length + 10:
         raise ValueError(f"Not enough train rows: {train_size}")
 
-    train_ts = df_period[target_col].iloc[:train_size]
-    arima_model = SARIMAX(train_ts, order=(1, 1, 1), seasonal_order=seasonal_order)
-    arima_result = arima_model.fit(disp=False)
-
     df_period = df_period.copy()
-    res_full = arima_result.apply(df_period[target_col])
-    df_period["ARIMA_pred"] = res_full.fittedvalues
+    arima_params, arima_fitted = fit_sarimax_cached(
+        df_period[target_col],
+        train_size,
+        order=(1, 1, 1),
+        seasonal_order=seasonal_order,
+        dates=df_period["observation_date"],
+        use_cache=use_cache,
+    )
+    df_period["ARIMA_pred"] = arima_fitted
     df_period["Residuals"] = df_period[target_col] - df_period["ARIMA_pred"]
 
+    # SARIMAX is filtered from the first period row; the service re-filters from the same row.
+    period_start = str(pd.to_datetime(df_period["observation_date"].iloc[0]).date())
     # Stabilize ARIMA warm-up rows.
     df_period = df_period.iloc[5:].reset_index(drop=True)
 
@@ -96,6 +110,12 @@ def prepare_hybrid_data_for_period(df_period: pd.DataFrame, seq_length: int = 10
     if train_size_adj <= seq_length + 10:
         raise ValueError(f"Not enough adjusted train rows: {train_size_adj}")
 
+    has_blocks = block_aware and "block_index" in df_period.columns
+    if has_blocks and block_norm:
+        # Per-block standardization of the exogenous levels, stats from training rows only.
+        train_mask = np.arange(len(df_period)) < train_size_adj
+        df_period[feature_cols] = normalize_per_block(df_period[feature_cols].values, df_period["block_index"].values, mask=train_mask)
+
     train_df = df_period.iloc[:train_size_adj].copy()
     test_df = df_period.iloc[train_size_adj:].copy()
 
@@ -109,13 +129,27 @@ def prepare_hybrid_data_for_period(df_period: pd.DataFrame, seq_length: int = 10
     full_X = scaler_X.transform(df_period[X_cols].values)
     full_y = scaler_y.transform(df_period[["Residuals"]].values)
 
-    test_overlap = pd.concat([train_df.iloc[-seq_length:], test_df], axis=0)
-    test_X = scaler_X.transform(test_overlap[X_cols].values)
-    test_y = scaler_y.transform(test_overlap[["Residuals"]].values)
+    if has_blocks:
+        # Only windows that stay inside one anomaly block (no cross-boundary regime mixing).
+        blocks = df_period["block_index"].values
+        X_train_seq, y_train_seq = BlockWindowSampler(blocks, seq_length, hi=train_size_adj).windows(full_X, full_y)
+        test_sampler = BlockWindowSampler(blocks, seq_length, lo=train_size_adj)
+        X_test_seq, y_test_seq = test_sampler.windows(full_X, full_y)
+        full_sampler = BlockWindowSampler(blocks, seq_length)
+        X_full_seq, y_full_seq = full_sampler.windows(full_X, full_y)
+        test_target_rows = test_sampler.target_rows
+        full_target_rows = full_sampler.target_rows
+        test_df = df_period.iloc[test_target_rows].copy()
+    else:
+        test_overlap = pd.concat([train_df.iloc[-seq_length:], test_df], axis=0)
+        test_X = scaler_X.transform(test_overlap[X_cols].values)
+        test_y = scaler_y.transform(test_overlap[["Residuals"]].values)
 
-    X_train_seq, y_train_seq = create_sequences(train_X, train_y, seq_length)
-    X_test_seq, y_test_seq = create_sequences(test_X, test_y, seq_length)
-    X_full_seq, y_full_seq = create_sequences(full_X, full_y, seq_length)
+        X_train_seq, y_train_seq = create_sequences(train_X, train_y, seq_length)
+        X_test_seq, y_test_seq = create_sequences(test_X, test_y, seq_length)
+        X_full_seq, y_full_seq = create_sequences(full_X, full_y, seq_length)
+        test_target_rows = np.arange(train_size_adj, len(df_period))
+        full_target_rows = np.arange(seq_length, len(df_period))
 
     return {
         "X_train": X_train_seq,
@@ -127,10 +161,16 @@ def prepare_hybrid_data_for_period(df_period: pd.DataFrame, seq_length: int = 10
         "df_ready": df_period,
         "seq_length": seq_length,
         "test_df": test_df.reset_index(drop=True),
+        "test_target_rows": test_target_rows,
+        "full_target_rows": full_target_rows,
+        "scaler_X": scaler_X,
         "scaler_y": scaler_y,
+        "arima_params": arima_params,
+        "feature_cols": feature_cols,
         "train_rows": len(train_df),
         "test_rows": len(test_df),
         "all_rows": len(df_period),
+        "period_start": period_start,
     }
 
 # --- 2. Model A: ARIMA-LSTM Hybrid ---
@@ -154,7 +194,7 @@ class ARIMA_LSTM_Model:
         self.criterion = nn.MSELoss()
         self.optimizer = torch.optim.Adam(self.model.parameters(), lr=lr, weight_decay=weight_decay)
         
-    def fit(self, X_train, y_train, epochs=100, batch_size=32, patience=10):
+    def fit(self, X_train, y_train, epochs=100, batch_size=32, patience=10, epoch_log=None):
         val_size = max(int(len(X_train) * 0.1), 1) # At least 1 element
         X_t, y_t = torch.FloatTensor(X_train[:-val_size]), torch.FloatTensor(y_train[:-val_size])
         X_v, y_v = torch.FloatTensor(X_train[-val_size:]), torch.FloatTensor(y_train[-val_size:])
@@ -167,6 +207,8 @@ class ARIMA_LSTM_Model:
         best_model_wts = copy.deepcopy(self.model.state_dict())
         
         for epoch in range(epochs):
+            if epoch_log is not None:
+                epoch_log.start_epoch()
             self.model.train()
             for bx, by in train_loader:
                 bx, by = bx.to(self.device), by.to(self.device)
@@ -174,6 +216,8 @@ class ARIMA_LSTM_Model:
                 preds = self.model(bx)
                 loss = self.criterion(preds, by)
                 loss.backward()
+                if epoch_log is not None:
+                    epoch_log.batch(loss, self.model)
                 self.optimizer.step()
                 
             self.model.eval()
@@ -185,6 +229,8 @@ class ARIMA_LSTM_Model:
                     val_loss += self.criterion(val_preds, by).item()
             val_loss /= max(len(val_loader), 1)
             
+            if epoch_log is not None:
+                epoch_log.end_epoch(epoch + 1, val_loss, self.optimizer.param_groups[0]["lr"], val_loss < best_loss)
             if val_loss < best_loss:
                 best_loss = val_loss
                 best_model_wts = copy.deepcopy(self.model.state_dict())
@@ -193,10 +239,13 @@ class ARIMA_LSTM_Model:
                 patience_counter += 1
                 if patience_counter >= patience:
                     break
+        if epoch_log is not None:
+            epoch_log.close(early_stop=patience_counter >= patience)
         self.model.load_state_dict(best_model_wts)
         return {
             "best_val_loss": float(best_loss),
             "epochs_ran": int(epoch + 1),
+            "early_stopped": bool(patience_counter >= patience),
         }
         
     def predict(self, X_test):
@@ -325,7 +374,10 @@ def tune_model_a(period_name: str, X_train: np.ndarray, y_train: np.ndarray, inp
             lr=cfg["lr"],
             weight_decay=cfg["weight_decay"],
         )
-        fit_info = model.fit(X_t, y_t, epochs=cfg["epochs"], batch_size=cfg["batch_size"], patience=cfg["patience"])
+        epoch_log = EpochLog(epoch_log_path(OUTPUT_DIR / "hpo", period_name, "a", idx), period=period_name, model="A", trial=idx)
+        fit_info = model.fit(
+            X_t, y_t, epochs=cfg["epochs"], batch_size=cfg["batch_size"], patience=cfg["patience"], epoch_log=epoch_log
+        )
         pred_t = model.predict(X_t)
         pred_v = model.predict(X_v)
         train_rmse, train_mae = evaluate_scaled_rmse_mae(y_t, pred_t)
@@ -342,7 +394,10 @@ def tune_model_a(period_name: str, X_train: np.ndarray, y_train: np.ndarray, inp
             "val_mae_scaled": val_mae,
             "generalization_gap_rmse": val_rmse - train_rmse,
             "epochs_ran": fit_info["epochs_ran"],
+            "best_epoch": epoch_log.best_epoch,
+            "early_stopped": fit_info["early_stopped"],
             "duration_sec": duration,
+            "epoch_log": epoch_log.path.name,
         }
         trials.append(record)
         if val_rmse < best_rmse:
@@ -377,7 +432,10 @@ def tune_model_b(period_name: str, X_train: np.ndarray, y_train: np.ndarray, inp
             lr=cfg["lr"],
             weight_decay=cfg["weight_decay"],
         )
-        fit_info = model.fit(X_t, y_t, epochs=cfg["epochs"], batch_size=cfg["batch_size"], patience=cfg["patience"])
+        epoch_log = EpochLog(epoch_log_path(OUTPUT_DIR / "hpo", period_name, "b", idx), period=period_name, model="B", trial=idx)
+        fit_info = model.fit(
+            X_t, y_t, epochs=cfg["epochs"], batch_size=cfg["batch_size"], patience=cfg["patience"], epoch_log=epoch_log
+        )
         pred_t = model.predict(X_t)
         pred_v = model.predict(X_v)
         train_rmse, train_mae = evaluate_scaled_rmse_mae(y_t, pred_t)
@@ -394,7 +452,10 @@ def tune_model_b(period_name: str, X_train: np.ndarray, y_train: np.ndarray, inp
             "val_mae_scaled": val_mae,
             "generalization_gap_rmse": val_rmse - train_rmse,
             "epochs_ran": fit_info["epochs_ran"],
+            "best_epoch": epoch_log.best_epoch,
+            "early_stopped": fit_info["early_stopped"],
             "duration_sec": duration,
+            "epoch_log": epoch_log.path.name,
         }
         trials.append(record)
         if val_rmse < best_rmse:
@@ -580,6 +641,25 @@ def run_period(period_name: str, period_df: pd.DataFrame, is_anomaly_blocks: boo
     pred_b_scaled = model_B.predict(X_test)
     pred_b_resid = scaler_y.inverse_transform(pred_b_scaled).flatten()
 
+    model_a_path = save_hybrid_model(
+        OUTPUT_DIR / "models" / f"{period_name}_model_a.pt",
+        model_A,
+        "ARIMA_LSTM_Model",
+        {k: best_a_cfg[k] for k in ["hidden_dim", "num_layers", "dropout"]},
+        prepared,
+        DATA_PATH,
+        period_name,
+    )
+    model_b_path = save_hybrid_model(
+        OUTPUT_DIR / "models" / f"{period_name}_model_b.pt",
+        model_B,
+        "ARIMA_CNN_LSTM_Model",
+        {k: best_b_cfg[k] for k in ["cnn_filters", "kernel_size", "hidden_dim", "num_layers", "dropout"]},
+        prepared,
+        DATA_PATH,
+        period_name,
+    )
+
     pred_a_full_scaled = model_A.predict(X_full)
     pred_b_full_scaled = model_B.predict(X_full)
     pred_a_full_resid = scaler_y.inverse_transform(pred_a_full_scaled).flatten()
@@ -590,7 +670,7 @@ def run_period(period_name: str, period_df: pd.DataFrame, is_anomaly_blocks: boo
     final_a = test_arima + pred_a_resid
     final_b = test_arima + pred_b_resid
 
-    df_full_aligned = df_ready.iloc[seq_length:].reset_index(drop=True)
+    df_full_aligned = df_ready.iloc[prepared["full_target_rows"]].reset_index(drop=True)
     full_arima = df_full_aligned["ARIMA_pred"].values
     full_final_a = full_arima + pred_a_full_resid
     full_final_b = full_arima + pred_b_full_resid
@@ -667,6 +747,8 @@ def run_period(period_name: str, period_df: pd.DataFrame, is_anomaly_blocks: boo
         "best_params_a": best_a_cfg,
         "best_params_b": best_b_cfg,
         "hpo_summary": str(hpo_summary_path.relative_to(BASE_DIR)),
+        "model_a_artifact": str(model_a_path.relative_to(BASE_DIR)),
+        "model_b_artifact": str(model_b_path.relative_to(BASE_DIR)),
         "plot_full": str(plot_full_path.relative_to(BASE_DIR)),
         "plot_eval": str(plot_eval_path.relative_to(BASE_DIR)),
     }
@@ -0,0 +1,183 @@
+"""
+Persistent HPO trial store for the hybrid trainers.
+
+Every trial is keyed by (study, config hash, seed) in a SQLite file next to the hpo/ CSVs. A
+worker claims a trial inside an IMMEDIATE transaction before training it and records the result
+when it finishes, so a rerun skips completed trials and several processes pointed at the same
+file split the grid between them. Claims left behind by a dead process (same host, pid gone) or
+older than `stale_after` seconds are taken over.
+
+    python analysis/LSTM/Hybrid/trial_store.py analysis/LSTM/Hybrid/log_multistep_mmf/hpo/trials.sqlite
+"""
+import argparse
+import hashlib
+import json
+import os
+import socket
+import sqlite3
+import time
+from pathlib import Path
+
+import pandas as pd
+
+
+STALE_AFTER_SEC = 6 * 3600
+POLL_SEC = 10.0
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS trials (
+    study TEXT NOT NULL,
+    config_hash TEXT NOT NULL,
+    seed INTEGER NOT NULL,
+    trial INTEGER NOT NULL,
+    config TEXT NOT NULL,
+    status TEXT NOT NULL,
+    worker TEXT NOT NULL,
+    claimed_at REAL NOT NULL,
+    finished_at REAL,
+    result TEXT,
+    PRIMARY KEY (study, config_hash, seed)
+)
+"""
+
+
+def config_hash(config: dict) -> str:
+    return hashlib.sha256(json.dumps(config, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+
+
+def _worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def _worker_alive(worker: str) -> bool:
+    host, _, pid = worker.rpartition(":")
+    if host != socket.gethostname():
+        return True
+    try:
+        os.kill(int(pid), 0)
+    except ProcessLookupError:
+        return False
+    except (PermissionError, ValueError):
+        return True
+    return True
+
+
+class TrialStore:
+    def __init__(self, path, stale_after: float = STALE_AFTER_SEC):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.stale_after = stale_after
+        self.worker = _worker_id()
+        self._conn = sqlite3.connect(self.path, timeout=60, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(_SCHEMA)
+
+    def claim(self, study: str, trial: int, config: dict, seed: int) -> bool:
+        """Reserve a trial for this worker; False if it is finished or held by a live worker."""
+        key = (study, config_hash(config), seed)
+        now = time.time()
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = self._conn.execute(
+                "SELECT status, worker, claimed_at FROM trials WHERE study=? AND config_hash=? AND seed=?", key
+            ).fetchone()
+            if row is not None:
+                status, worker, claimed_at = row
+                if status == "done":
+                    self._conn.execute("COMMIT")
+                    return False
+                if worker != self.worker and _worker_alive(worker) and now - claimed_at < self.stale_after:
+                    self._conn.execute("COMMIT")
+                    return False
+            self._conn.execute(
+                "INSERT OR REPLACE INTO trials (study, config_hash, seed, trial, config, status, worker, claimed_at) "
+                "VALUES (?, ?, ?, ?, ?, 'running', ?, ?)",
+                (*key, trial, json.dumps(config, sort_keys=True), self.worker, now),
+            )
+            self._conn.execute("COMMIT")
+        except BaseException:
+            self._conn.execute("ROLLBACK")
+            raise
+        return True
+
+    def complete(self, study: str, config: dict, seed: int, result: dict):
+        self._conn.execute(
+            "UPDATE trials SET status='done', worker=?, finished_at=?, result=? WHERE study=? AND config_hash=? AND seed=?",
+            (self.worker, time.time(), json.dumps(result), study, config_hash(config), seed),
+        )
+
+    def release(self, study: str, config: dict, seed: int):
+        """Drop this worker's claim on an unfinished trial (e.g. after the trial raised)."""
+        self._conn.execute(
+            "DELETE FROM trials WHERE study=? AND config_hash=? AND seed=? AND status='running' AND worker=?",
+            (study, config_hash(config), seed, self.worker),
+        )
+
+    def completed(self, study: str) -> dict:
+        """(config_hash, seed) -> stored result for the finished trials of `study`."""
+        rows = self._conn.execute(
+            "SELECT config_hash, seed, result FROM trials WHERE study=? AND status='done'", (study,)
+        ).fetchall()
+        return {(h, seed): json.loads(result) for h, seed, result in rows}
+
+    def summary(self) -> pd.DataFrame:
+        return pd.read_sql_query(
+            "SELECT study, status, COUNT(*) AS trials, MAX(finished_at) AS last_finished FROM trials "
+            "GROUP BY study, status ORDER BY study, status",
+            self._conn,
+        )
+
+    def close(self):
+        self._conn.close()
+
+
+def run_trials(store: TrialStore, study: str, grid: list[dict], seed_base: int, run_trial, poll_sec: float = POLL_SEC) -> list[dict]:
+    """Run the unfinished trials of `grid` and return every trial's result in grid order.
+
+    Trial i (1-based) is seeded with `seed_base + i`; `run_trial(i, cfg, seed)` trains it and
+    returns a JSON-serializable dict. Trials claimed by other live workers are waited for.
+    """
+    keys = [(config_hash(cfg), seed_base + i) for i, cfg in enumerate(grid, start=1)]
+    resumed = len(set(keys) & set(store.completed(study)))
+    if resumed:
+        print(f"  {study}: {resumed}/{len(grid)} trials already in {store.path.name}, skipping them")
+    while True:
+        for i, cfg in enumerate(grid, start=1):
+            seed = seed_base + i
+            if not store.claim(study, i, cfg, seed):
+                continue
+            try:
+                result = run_trial(i, cfg, seed)
+            except BaseException:
+                store.release(study, cfg, seed)
+                raise
+            store.complete(study, cfg, seed, result)
+
+        done = store.completed(study)
+        pending = [k for k in keys if k not in done]
+        if not pending:
+            return [done[k] for k in keys]
+        print(f"  {study}: waiting for {len(pending)} trial(s) claimed by other workers")
+        time.sleep(poll_sec)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Show trial counts per study in an HPO trial store")
+    parser.add_argument("path", type=Path, help="trials.sqlite written by the hybrid trainers")
+    args = parser.parse_args()
+
+    if not args.path.exists():
+        print(f"No trial store at {args.path}")
+        return
+    store = TrialStore(args.path)
+    summary = store.summary()
+    store.close()
+    if summary.empty:
+        print(f"No trials in {args.path}")
+        return
+    summary["last_finished"] = pd.to_datetime(summary["last_finished"], unit="s").dt.strftime("%Y-%m-%d %H:%M:%S")
+    print(summary.to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -9,10 +9,11 @@ from pathlib import Path
 from sklearn.metrics import mean_squared_error, mean_absolute_error
 from statsmodels.stats.diagnostic import acorr_ljungbox
 from statsmodels.graphics.tsaplots import plot_acf, plot_pacf
-from statsmodels.tsa.statespace.sarimax import SARIMAX
 
 sys.path.append("/Applications/dollar_price")
 
+from analysis.LSTM.Hybrid.arima_cache import fit_sarimax_cached, sarimax_from_params
+
 target_type = sys.argv[1] if len(sys.argv) > 1 else 'mmf'
 
 if target_type == 'm2':
@@ -58,42 +59,88 @@ def plot_zoomed(date_series, actual, pred_a, pred_b, naive, title, out_path, num
     fig.savefig(out_path, dpi=140)
     plt.close(fig)
 
+def batched_multi_step_forecast(model, X_test_seq, scaler_y, steps=30, origins=None):
+    # X_test_seq shape: (N, seq_length, num_features), residual is the last feature.
+    # Launch one autoregressive rollout from every origin at once and advance them in lock-step:
+    # the batch is (origins, seq_length, features), so each step is a single forward pass.
+    n_seq, _, n_feat = X_test_seq.shape
+    if origins is None:
+        origins = np.arange(0, n_seq - steps + 1)
+    origins = np.asarray(origins, dtype=int)
+
+    # X_test_seq[o+i+1] is the sequence ending at step `o+i`; its last row holds the TRUE covariates
+    # (MMF/M2, RATE) for the new step. Only the residual channel is replaced by the prediction.
+    cov_idx = origins[:, None] + np.arange(1, steps)[None, :]
+    covariates = torch.FloatTensor(X_test_seq[cov_idx, -1, : n_feat - 1]).to(model.device)
+
+    curr_seq = torch.FloatTensor(X_test_seq[origins]).to(model.device)
+    preds_scaled = torch.empty((len(origins), steps), device=model.device)
+
+    model.model.eval()
+    with torch.no_grad():
+        for i in range(steps):
+            pred_res_scaled = model.model(curr_seq)[:, 0]
+            preds_scaled[:, i] = pred_res_scaled
+            if i < steps - 1:
+                new_step = torch.cat([covariates[:, i, :], pred_res_scaled[:, None]], dim=1)
+                curr_seq = torch.cat([curr_seq[:, 1:, :], new_step[:, None, :]], dim=1)
+
+    preds_scaled = preds_scaled.cpu().numpy()
+    preds_resid = scaler_y.inverse_transform(preds_scaled.reshape(-1, 1)).reshape(len(origins), steps)
+    return preds_resid, origins
+
+
 def multi_step_forecast(model, X_test_seq, scaler_y, steps=30):
-    # X_test_seq shape: (N, seq_length, num_features)
-    # The true observations are in X_test_seq
-    # We will simulate 30 days of autoregressive forecasting starting from the beginning of X_test_seq
-    
-    # Start with the first sequence of the test set
-    curr_seq = X_test_seq[0:1].copy() # shape (1, seq_length, num_features)
-    
-    preds_scaled = []
-    
-    for i in range(steps):
-        # Predict the next residual
-        with torch.no_grad():
-            tensor_in = torch.FloatTensor(curr_seq).to(model.device)
-            pred_res_scaled = model.model(tensor_in).cpu().numpy()[0, 0]
-        preds_scaled.append(pred_res_scaled)
-        
-        if i < steps - 1:
-            # Shift sequence to the left
-            next_seq = curr_seq[:, 1:, :].copy() 
-            # We need standard features (MMF, RATE) for the new step. 
-            # We can take them from the TRUE next step in X_test_seq.
-            # X_test_seq[i+1] is the sequence ending at step `i` (to predict `i+1`).
-            # The last element of X_test_seq[i+1] is the data at time `i`.
-            # features are at index 0 and 1.
-            true_covariates = X_test_seq[i+1, -1, 0:2] 
-            
-            new_step = np.zeros((1, 1, curr_seq.shape[2]))
-            new_step[0, 0, 0:2] = true_covariates
-            new_step[0, 0, 2] = pred_res_scaled  # The ONLY difference is using predicted residual instead of true!
-            
-            curr_seq = np.concatenate([next_seq, new_step], axis=1)
-
-    preds_scaled = np.array(preds_scaled).reshape(-1, 1)
-    preds_resid = scaler_y.inverse_transform(preds_scaled).flatten()
-    return preds_resid
+    # Simulate `steps` days of autoregressive forecasting starting from the beginning of X_test_seq
+    preds_resid, _ = batched_multi_step_forecast(model, X_test_seq, scaler_y, steps=steps, origins=[0])
+    return preds_resid[0]
+
+
+def multi_step_error_curves(model_A, model_B, X_test, y_test, scaler_y, steps=30, target_rows=None):
+    # Per-origin recursive error curves in residual (KRW) space: the ARIMA component is shared,
+    # so the residual error at horizon h is the hybrid error on top of the one-step ARIMA baseline.
+    origins = np.arange(0, len(X_test) - steps + 1)
+    if target_rows is not None:
+        # Block-aware windows skip rows at block boundaries; keep origins whose next `steps`
+        # windows are consecutive rows of one block.
+        target_rows = np.asarray(target_rows)
+        origins = origins[target_rows[origins + steps - 1] - target_rows[origins] == steps - 1]
+    if len(origins) == 0:
+        return None
+    resid_a, origins = batched_multi_step_forecast(model_A, X_test, scaler_y, steps=steps, origins=origins)
+    resid_b, _ = batched_multi_step_forecast(model_B, X_test, scaler_y, steps=steps, origins=origins)
+    target_idx = origins[:, None] + np.arange(steps)[None, :]
+    true_resid = scaler_y.inverse_transform(y_test[target_idx].reshape(-1, 1)).reshape(len(origins), steps)
+
+    err_a = resid_a - true_resid
+    err_b = resid_b - true_resid
+    curves = pd.DataFrame(
+        {
+            "horizon": np.arange(1, steps + 1),
+            "origins": len(origins),
+            "rmse_model_a": np.sqrt((err_a ** 2).mean(axis=0)),
+            "rmse_model_b": np.sqrt((err_b ** 2).mean(axis=0)),
+            "mae_model_a": np.abs(err_a).mean(axis=0),
+            "mae_model_b": np.abs(err_b).mean(axis=0),
+            "rmse_zero_resid": np.sqrt((true_resid ** 2).mean(axis=0)),
+        }
+    )
+    return curves
+
+
+def plot_error_curves(curves, title, out_path):
+    fig, ax = plt.subplots(figsize=(10, 5))
+    ax.plot(curves["horizon"], curves["rmse_model_a"], color="#1f77b4", marker="o", markersize=3, label="Model A AR")
+    ax.plot(curves["horizon"], curves["rmse_model_b"], color="#d62728", marker="x", markersize=3, label="Model B AR")
+    ax.plot(curves["horizon"], curves["rmse_zero_resid"], color="grey", linestyle="--", label="ARIMA only (zero residual)")
+    ax.set_title(title)
+    ax.set_xlabel("Horizon (days ahead)")
+    ax.set_ylabel("Residual RMSE (KRW)")
+    ax.grid(alpha=0.3)
+    ax.legend()
+    fig.tight_layout()
+    fig.savefig(out_path, dpi=120)
+    plt.close(fig)
 
 def plot_residuals(res_a, res_b, out_path):
     fig, axes = plt.subplots(2, 2, figsize=(16, 10))
@@ -215,8 +262,10 @@ def verify_period(period_name, period_df):
     
     # Needs a 30-day TRUE ARIMA forecast starting from train data end
     train_ts = prepared["df_ready"]["USD_KRW"].iloc[:prepared["train_rows"]]
-    arima_fit = SARIMAX(train_ts, order=(1,1,1), seasonal_order=(0,0,0,0)).fit(disp=False)
-    arima_30 = arima_fit.forecast(steps=steps_to_forecast).values
+    train_dates = prepared["df_ready"]["observation_date"].iloc[:prepared["train_rows"]]
+    arima_params, _ = fit_sarimax_cached(train_ts, len(train_ts), order=(1,1,1), seasonal_order=(0,0,0,0), dates=train_dates)
+    arima_fit = sarimax_from_params(train_ts, arima_params, order=(1,1,1), seasonal_order=(0,0,0,0))
+    arima_30 = np.asarray(arima_fit.forecast(steps=steps_to_forecast))
     actual_30 = actual[:steps_to_forecast]
 
     multi_a_resid = multi_step_forecast(model_A, X_test, scaler_y, steps=steps_to_forecast)
@@ -245,6 +294,25 @@ def verify_period(period_name, period_df):
     plt.close(fig)
     print(f"Saved {ms_path}")
 
+    # All test origins rolled out at once -> per-horizon recursive error curves
+    curves = multi_step_error_curves(
+        model_A, model_B, X_test, y_test, scaler_y, steps=steps_to_forecast, target_rows=prepared.get("test_target_rows")
+    )
+    if curves is None:
+        print(f"No test origin has {steps_to_forecast} consecutive in-block windows; skipping error curves.")
+    else:
+        curves_path = OUTPUT_DIR / "eval" / f"{period_name}_multistep_error_curves.csv"
+        curves.to_csv(curves_path, index=False)
+        curve_plot_path = OUTPUT_DIR / "eval" / f"{period_name}_multistep_error_curves.png"
+        plot_error_curves(
+            curves,
+            title=f"{period_name}: Recursive Residual RMSE by Horizon ({int(curves['origins'].iloc[0])} origins)",
+            out_path=curve_plot_path,
+        )
+        print(f"Residual RMSE @h=1: A={curves['rmse_model_a'].iloc[0]:.4f}, B={curves['rmse_model_b'].iloc[0]:.4f} | "
+              f"@h={steps_to_forecast}: A={curves['rmse_model_a'].iloc[-1]:.4f}, B={curves['rmse_model_b'].iloc[-1]:.4f}")
+        print(f"Saved {curves_path}")
+
     # >>> 4. Residual Diagnostics
     print("\n--- [Test 4] Residual Diagnostics (White Noise) ---")
     res_a = actual - final_a
@@ -0,0 +1,309 @@
+import argparse
+import importlib
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+import torch
+from sklearn.metrics import mean_absolute_error, mean_squared_error
+from sklearn.preprocessing import StandardScaler
+
+sys.path.append("/Applications/dollar_price")
+from analysis.LSTM.Hybrid.arima_cache import fit_sarimax_cached
+from analysis.LSTM.Hybrid.block_windows import BlockWindowSampler
+
+
+TARGET_MODULES = {
+    "mmf": "analysis.LSTM.Hybrid.run_hybrid_periods",
+    "m2": "analysis.LSTM.Hybrid.run_hybrid_m2_demand_deposit",
+}
+FEATURE_COLS = {
+    "mmf": ["MMF_total", "RATE_SPREAD_KOR_USA"],
+    "m2": ["M2_수시입출식저축성예금", "RATE_SPREAD_KOR_USA"],
+}
+TARGET_COL = "USD_KRW"
+ARIMA_ORDER = (1, 1, 1)
+ARIMA_WARMUP = 5
+
+DEFAULT_CFG_A = {"hidden_dim": 32, "num_layers": 1, "dropout": 0.2, "lr": 0.001, "weight_decay": 1e-5, "batch_size": 32, "epochs": 50, "patience": 6}
+DEFAULT_CFG_B = {**DEFAULT_CFG_A, "cnn_filters": 16, "kernel_size": 3}
+
+
+def target_module(target: str):
+    return importlib.import_module(TARGET_MODULES[target])
+
+
+def load_best_configs(target: str, period_name: str):
+    hpo_file = target_module(target).OUTPUT_DIR / "hpo" / f"{period_name}_hpo_summary.json"
+    if not hpo_file.exists():
+        return DEFAULT_CFG_A, DEFAULT_CFG_B
+    with open(hpo_file, "r", encoding="utf-8") as f:
+        hpo = json.load(f)
+    return {**DEFAULT_CFG_A, **hpo["best_params_a"]}, {**DEFAULT_CFG_B, **hpo["best_params_b"]}
+
+
+def build_origins(n_rows: int, train_size: int, refit_every: int):
+    return [(t, min(t + refit_every, n_rows)) for t in range(train_size, n_rows, refit_every)]
+
+
+def arima_stage_for_origin(target_values: np.ndarray, dates: np.ndarray, origin: int, end: int, start_params):
+    # Refit on rows[:origin], warm-started from the base window's parameters, and produce
+    # one-step fitted values up to the end of this origin's forecast block.
+    params, fitted = fit_sarimax_cached(
+        pd.Series(target_values[:end]),
+        origin,
+        order=ARIMA_ORDER,
+        dates=dates[:end],
+        start_params=start_params,
+    )
+    return params, fitted
+
+
+def window_design(
+    df_period: pd.DataFrame, fitted: np.ndarray, feature_cols, origin: int, end: int, seq_length: int, scaler_X, scaler_y, block_aware: bool = False
+):
+    df_w = df_period.iloc[:end].copy()
+    df_w["ARIMA_pred"] = fitted
+    df_w["Residuals"] = df_w[TARGET_COL] - df_w["ARIMA_pred"]
+    df_w = df_w.iloc[ARIMA_WARMUP:].reset_index(drop=True)
+    origin_local = origin - ARIMA_WARMUP
+
+    X_cols = feature_cols + ["Residuals"]
+    X_all = scaler_X.transform(df_w[X_cols].values)
+    y_all = scaler_y.transform(df_w[["Residuals"]].values)
+
+    if block_aware and "block_index" in df_w.columns:
+        # As in prepare_hybrid_data_for_period: only windows that stay inside one anomaly block.
+        blocks = df_w["block_index"].values
+        X_train, y_train = BlockWindowSampler(blocks, seq_length, hi=origin_local).windows(X_all, y_all)
+        next_sampler = BlockWindowSampler(blocks, seq_length, lo=origin_local)
+        X_next = next_sampler.windows(X_all)
+        return X_train, y_train, X_next, df_w.iloc[next_sampler.target_rows].reset_index(drop=True)
+
+    windows = np.lib.stride_tricks.sliding_window_view(X_all, seq_length, axis=0).transpose(0, 2, 1)
+    # windows[i] covers rows i..i+seq_length-1 and predicts row i+seq_length.
+    X_train = windows[: origin_local - seq_length]
+    y_train = y_all[seq_length:origin_local]
+    X_next = windows[origin_local - seq_length : end - ARIMA_WARMUP - seq_length]
+    return np.ascontiguousarray(X_train), y_train, np.ascontiguousarray(X_next), df_w.iloc[origin_local:].reset_index(drop=True)
+
+
+def run_model_chain(
+    target: str,
+    model_key: str,
+    cfg: dict,
+    df_period: pd.DataFrame,
+    arima_fits: list,
+    origins: list,
+    seq_length: int,
+    scalers,
+    finetune_epochs: int,
+    finetune_window: int,
+):
+    """Sequential warm-started chain for one model: cold fit at the first origin, then fine-tune."""
+    mod = target_module(target)
+    feature_cols = FEATURE_COLS[target]
+    scaler_X, scaler_y = scalers
+    torch.manual_seed(42 if model_key == "A" else 4200)
+    np.random.seed(42 if model_key == "A" else 4200)
+
+    input_dim = len(feature_cols) + 1
+    if model_key == "A":
+        model = mod.ARIMA_LSTM_Model(
+            input_dim=input_dim, hidden_dim=cfg["hidden_dim"], num_layers=cfg["num_layers"],
+            dropout=cfg["dropout"], lr=cfg["lr"], weight_decay=cfg["weight_decay"],
+        )
+    else:
+        model = mod.ARIMA_CNN_LSTM_Model(
+            input_dim=input_dim, cnn_filters=cfg["cnn_filters"], kernel_size=cfg["kernel_size"],
+            hidden_dim=cfg["hidden_dim"], num_layers=cfg["num_layers"], dropout=cfg["dropout"],
+            lr=cfg["lr"], weight_decay=cfg["weight_decay"],
+        )
+
+    preds = []
+    timings = []
+    for step, ((origin, end), (_, fitted)) in enumerate(zip(origins, arima_fits)):
+        X_train, y_train, X_next, next_df = window_design(
+            df_period, fitted, feature_cols, origin, end, seq_length, scaler_X, scaler_y, mod.BLOCK_AWARE_WINDOWS
+        )
+        start = time.time()
+        if step == 0:
+            fit_info = model.fit(X_train, y_train, epochs=cfg["epochs"], batch_size=cfg["batch_size"], patience=cfg["patience"])
+        else:
+            # Warm start: weights and Adam state carry over; only the most recent windows are revisited.
+            fit_info = model.fit(
+                X_train[-finetune_window:], y_train[-finetune_window:],
+                epochs=finetune_epochs, batch_size=cfg["batch_size"], patience=max(2, finetune_epochs // 2),
+            )
+        fit_sec = time.time() - start
+
+        timings.append({"origin": int(origin), "mode": "cold" if step == 0 else "warm", "fit_sec": fit_sec, "epochs_ran": fit_info["epochs_ran"]})
+        if len(X_next) == 0:
+            # Every target row of this block sits within seq_length of a block start.
+            continue
+        resid = scaler_y.inverse_transform(model.predict(X_next)).flatten()
+        block = pd.DataFrame(
+            {
+                "date": pd.to_datetime(next_df["observation_date"]).values,
+                "origin_date": pd.to_datetime(df_period["observation_date"].iloc[origin - 1]),
+                "actual_fx": next_df[TARGET_COL].values,
+                "pred_arima": next_df["ARIMA_pred"].values,
+                f"pred_model_{model_key.lower()}": next_df["ARIMA_pred"].values + resid,
+            }
+        )
+        if "block_index" in next_df.columns:
+            block["block_index"] = next_df["block_index"].values
+        preds.append(block)
+
+    return model_key, pd.concat(preds, axis=0, ignore_index=True), timings
+
+
+def walk_forward_period(
+    target: str,
+    period_name: str,
+    df_period: pd.DataFrame,
+    refit_every: int = 20,
+    finetune_epochs: int = 5,
+    finetune_window: int = 500,
+    seq_length: int = 10,
+    test_ratio: float = 0.2,
+    workers: int = 2,
+):
+    df_period = df_period.reset_index(drop=True)
+    feature_cols = FEATURE_COLS[target]
+    n_rows = len(df_period)
+    train_size = n_rows - max(int(n_rows * test_ratio), 40)
+    origins = build_origins(n_rows, train_size, refit_every)
+    target_values = df_period[TARGET_COL].to_numpy(dtype=np.float64)
+    dates = df_period["observation_date"].to_numpy()
+
+    print(f"[{period_name}] walk-forward: {len(origins)} origins, refit every {refit_every} rows, workers={workers}")
+    t0 = time.time()
+    base_params, base_fitted = arima_stage_for_origin(target_values, dates, train_size, origins[0][1], None)
+
+    # Every origin's ARIMA refit starts from the base window's parameters, so they are independent.
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [
+            pool.submit(arima_stage_for_origin, target_values, dates, origin, end, base_params)
+            for origin, end in origins[1:]
+        ]
+        arima_fits = [(base_params, base_fitted)] + [f.result() for f in futures]
+    arima_sec = time.time() - t0
+
+    # Scalers are frozen at the first window so warm-started weights keep seeing the same input scale.
+    df_base = df_period.iloc[:train_size].copy()
+    df_base["Residuals"] = df_base[TARGET_COL] - base_fitted[:train_size]
+    df_base = df_base.iloc[ARIMA_WARMUP:]
+    scaler_X = StandardScaler().fit(df_base[feature_cols + ["Residuals"]].values)
+    scaler_y = StandardScaler().fit(df_base[["Residuals"]].values)
+
+    cfg_a, cfg_b = load_best_configs(target, period_name)
+    common = (df_period, arima_fits, origins, seq_length, (scaler_X, scaler_y), finetune_epochs, finetune_window)
+    with ProcessPoolExecutor(max_workers=min(workers, 2)) as pool:
+        futures = [
+            pool.submit(run_model_chain, target, "A", cfg_a, *common),
+            pool.submit(run_model_chain, target, "B", cfg_b, *common),
+        ]
+        chains = dict((key, (pred, timing)) for key, pred, timing in (f.result() for f in futures))
+
+    pred_df = chains["A"][0].merge(
+        chains["B"][0][["date", "pred_model_b"]], on="date", how="inner"
+    )
+    actual = pred_df["actual_fx"].values
+    summary = {
+        "period": period_name,
+        "target": target,
+        "origins": len(origins),
+        "refit_every": refit_every,
+        "finetune_epochs": finetune_epochs,
+        "finetune_window": finetune_window,
+        "test_rows": int(len(pred_df)),
+        "rmse_base_arima": float(np.sqrt(mean_squared_error(actual, pred_df["pred_arima"]))),
+        "rmse_model_a": float(np.sqrt(mean_squared_error(actual, pred_df["pred_model_a"]))),
+        "rmse_model_b": float(np.sqrt(mean_squared_error(actual, pred_df["pred_model_b"]))),
+        "mae_model_a": float(mean_absolute_error(actual, pred_df["pred_model_a"])),
+        "mae_model_b": float(mean_absolute_error(actual, pred_df["pred_model_b"])),
+        "arima_stage_sec": arima_sec,
+    }
+    for key in ["A", "B"]:
+        timing = chains[key][1]
+        cold = timing[0]["fit_sec"]
+        warm = [t["fit_sec"] for t in timing[1:]]
+        summary[f"model_{key.lower()}_cold_fit_sec"] = cold
+        summary[f"model_{key.lower()}_warm_fit_sec_total"] = float(np.sum(warm))
+        # Cost relative to cold-retraining at every origin (estimated from the first cold fit).
+        summary[f"model_{key.lower()}_cost_vs_cold_retrain"] = float((cold + np.sum(warm)) / max(cold * len(timing), 1e-9))
+
+    if "block_index" in pred_df.columns:
+        by_block = []
+        for bid, blk in pred_df.groupby("block_index", sort=True):
+            by_block.append(
+                {
+                    "block_index": int(bid),
+                    "rows": int(len(blk)),
+                    "rmse_model_a": float(np.sqrt(mean_squared_error(blk["actual_fx"], blk["pred_model_a"]))),
+                    "rmse_model_b": float(np.sqrt(mean_squared_error(blk["actual_fx"], blk["pred_model_b"]))),
+                }
+            )
+        summary["by_block"] = by_block
+
+    return pred_df, summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Walk-forward hybrid evaluation with warm-started refits")
+    parser.add_argument("target", nargs="?", default="mmf", choices=["mmf", "m2"], help="target dataset type")
+    parser.add_argument("--refit-every", type=int, default=20, help="trading days between refits")
+    parser.add_argument("--finetune-epochs", type=int, default=5)
+    parser.add_argument("--finetune-window", type=int, default=500, help="most recent train windows used for fine-tuning")
+    parser.add_argument("--workers", type=int, default=max(1, (os.cpu_count() or 2) - 1))
+    parser.add_argument("--periods", nargs="+", default=["full_1995_2026", "anomaly_concatenated_blocks"])
+    args = parser.parse_args()
+
+    mod = target_module(args.target)
+    df = pd.read_csv(mod.DATA_PATH)
+    df["observation_date"] = pd.to_datetime(df["observation_date"])
+    df = df.sort_values("observation_date").reset_index(drop=True)
+
+    period_def = mod.load_period_definition()
+    range_start = pd.to_datetime(period_def["data_range"]["start"])
+    range_end = pd.to_datetime(period_def["data_range"]["end"])
+    df_full = df[(df["observation_date"] >= range_start) & (df["observation_date"] <= range_end)].copy()
+    period_frames = {
+        "full_1995_2026": df_full,
+        "anomaly_concatenated_blocks": mod.build_anomaly_concatenated(df_full, period_def),
+    }
+
+    out_dir = mod.OUTPUT_DIR / "walk_forward"
+    os.makedirs(out_dir, exist_ok=True)
+    summaries = []
+    for period_name in args.periods:
+        pred_df, summary = walk_forward_period(
+            args.target,
+            period_name,
+            period_frames[period_name],
+            refit_every=args.refit_every,
+            finetune_epochs=args.finetune_epochs,
+            finetune_window=args.finetune_window,
+            workers=args.workers,
+        )
+        pred_path = out_dir / f"{period_name}_predictions.csv"
+        pred_df.to_csv(pred_path, index=False)
+        summary["predictions"] = str(pred_path.relative_to(mod.BASE_DIR))
+        summaries.append(summary)
+        print(
+            f"[{period_name}] walk-forward RMSE base={summary['rmse_base_arima']:.4f} "
+            f"A={summary['rmse_model_a']:.4f} B={summary['rmse_model_b']:.4f} "
+            f"(cost vs cold retrain: A={summary['model_a_cost_vs_cold_retrain']:.2f}, B={summary['model_b_cost_vs_cold_retrain']:.2f})"
+        )
+
+    with open(out_dir / "results.json", "w", encoding="utf-8") as f:
+        json.dump(summaries, f, indent=2, ensure_ascii=False)
+
+
+if __name__ == "__main__":
+    main()
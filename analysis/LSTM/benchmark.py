@@ -0,0 +1,247 @@
+"""
+Train / inference throughput benchmark for the LSTM and hybrid residual models.
+
+Every grid point (model x hidden size x batch size x sequence length x threads) runs in a fresh
+process, so peak RSS and the torch thread setting belong to that configuration alone. Results are
+written as JSON; pass --baseline to flag throughput drops / memory growth against a saved run.
+
+    python analysis/LSTM/benchmark.py --data synthetic --save-baseline analysis/LSTM/benchmarks/baseline.json
+    python analysis/LSTM/benchmark.py --data synthetic --baseline analysis/LSTM/benchmarks/baseline.json
+"""
+import argparse
+import itertools
+import json
+import multiprocessing as mp
+import platform
+import resource
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import torch
+import torch.nn as nn
+from sklearn.preprocessing import StandardScaler
+from torch.utils.data import DataLoader, TensorDataset
+
+sys.path.append("/Applications/dollar_price")
+from analysis.LSTM.Hybrid.hybrid_models import (
+    CNN_LSTM_Multi_Step,
+    CNN_LSTM_Residual_Predictor,
+    LSTM_Multi_Step,
+    LSTM_Residual_Predictor,
+)
+from analysis.LSTM.job_runner import available_cpus
+from analysis.LSTM.lstm_mmf.train_eval_periods import ExRateLSTM
+
+
+BASE_DIR = Path("/Applications/dollar_price")
+OUT_DIR = BASE_DIR / "analysis" / "LSTM" / "benchmarks"
+REAL_DATA_PATH = BASE_DIR / "analysis" / "LSTM" / "lstm_mmf" / "daily_dataset.csv"
+REAL_COLUMNS = ["USD_KRW", "MMF_total", "RATE_SPREAD_KOR_USA"]
+
+HORIZON = 5
+MODELS = {
+    "ExRateLSTM": lambda input_dim, hidden_dim: ExRateLSTM(input_dim, hidden_dim, num_layers=2),
+    "LSTM_Residual_Predictor": lambda input_dim, hidden_dim: LSTM_Residual_Predictor(input_dim, hidden_dim),
+    "CNN_LSTM_Residual_Predictor": lambda input_dim, hidden_dim: CNN_LSTM_Residual_Predictor(input_dim, hidden_dim=hidden_dim),
+    "LSTM_Multi_Step": lambda input_dim, hidden_dim: LSTM_Multi_Step(input_dim, hidden_dim, horizon=HORIZON),
+    "CNN_LSTM_Multi_Step": lambda input_dim, hidden_dim: CNN_LSTM_Multi_Step(input_dim, hidden_dim=hidden_dim, horizon=HORIZON),
+}
+OUTPUT_DIMS = {"LSTM_Multi_Step": HORIZON, "CNN_LSTM_Multi_Step": HORIZON}
+
+KEY_FIELDS = ("model", "data", "hidden_dim", "batch_size", "seq_length", "threads")
+# Metric -> +1 if higher is better, -1 if lower is better (used by the baseline comparison).
+TRACKED_METRICS = {"train_samples_per_sec": 1, "infer_samples_per_sec": 1, "peak_rss_mb": -1}
+REGRESSION_TOL = 0.15
+
+
+def synthetic_windows(n: int, seq_length: int, input_dim: int, output_dim: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    x = rng.standard_normal((n, seq_length, input_dim)).astype(np.float32)
+    y = rng.standard_normal((n, output_dim)).astype(np.float32)
+    return x, y
+
+
+def real_windows(seq_length: int, output_dim: int, path: Path = REAL_DATA_PATH):
+    """Scaled daily_dataset.csv windows; targets are the next `output_dim` scaled USD_KRW values."""
+    df = pd.read_csv(path)
+    data = StandardScaler().fit_transform(df[REAL_COLUMNS].ffill().bfill().values).astype(np.float32)
+    n = len(data) - seq_length - output_dim + 1
+    x = np.lib.stride_tricks.sliding_window_view(data, seq_length, axis=0)[:n].transpose(0, 2, 1)
+    y = np.lib.stride_tricks.sliding_window_view(data[:, 0], output_dim)[seq_length : seq_length + n]
+    return x.copy(), y.copy()
+
+
+def _peak_rss_mb() -> float:
+    # ru_maxrss is KiB on Linux, bytes on macOS.
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def run_config(
+    model: str, data: str, hidden_dim: int, batch_size: int, seq_length: int, threads: int, epochs: int, n_samples: int
+) -> dict:
+    """Train `epochs` epochs and run one inference sweep for a single grid point (call in a fresh process)."""
+    torch.set_num_threads(threads)
+    torch.manual_seed(42)
+    output_dim = OUTPUT_DIMS.get(model, 1)
+    if data == "real":
+        x, y = real_windows(seq_length, output_dim)
+    else:
+        x, y = synthetic_windows(n_samples, seq_length, len(REAL_COLUMNS), output_dim)
+
+    net = MODELS[model](x.shape[2], hidden_dim)
+    optimizer = torch.optim.Adam(net.parameters(), lr=0.001)
+    criterion = nn.MSELoss()
+    x_t, y_t = torch.from_numpy(x), torch.from_numpy(y)
+    loader = DataLoader(TensorDataset(x_t, y_t), batch_size=batch_size, shuffle=False)
+
+    epoch_seconds = []
+    net.train()
+    for _ in range(epochs):
+        start = time.perf_counter()
+        for bx, by in loader:
+            optimizer.zero_grad()
+            loss = criterion(net(bx), by)
+            loss.backward()
+            optimizer.step()
+        epoch_seconds.append(time.perf_counter() - start)
+
+    net.eval()
+    with torch.no_grad():
+        net(x_t[:batch_size])
+        start = time.perf_counter()
+        for i in range(0, len(x_t), batch_size):
+            net(x_t[i : i + batch_size])
+        infer_seconds = time.perf_counter() - start
+
+    # The first epoch includes allocator / kernel warm-up, so throughput uses the remaining ones.
+    steady = epoch_seconds[1:] or epoch_seconds
+    return {
+        "model": model,
+        "data": data,
+        "hidden_dim": hidden_dim,
+        "batch_size": batch_size,
+        "seq_length": seq_length,
+        "threads": threads,
+        "samples": len(x),
+        "epochs": epochs,
+        "params": sum(p.numel() for p in net.parameters()),
+        "epoch_seconds": epoch_seconds,
+        "epoch_seconds_mean": float(np.mean(steady)),
+        "train_samples_per_sec": len(x) / float(np.mean(steady)),
+        "infer_samples_per_sec": len(x) / infer_seconds,
+        "peak_rss_mb": _peak_rss_mb(),
+    }
+
+
+def config_grid(models, data, hidden_dims, batch_sizes, seq_lengths, threads, epochs, n_samples) -> list[dict]:
+    return [
+        {
+            "model": m,
+            "data": data,
+            "hidden_dim": h,
+            "batch_size": b,
+            "seq_length": s,
+            "threads": t,
+            "epochs": epochs,
+            "n_samples": n_samples,
+        }
+        for m, h, b, s, t in itertools.product(models, hidden_dims, batch_sizes, seq_lengths, threads)
+    ]
+
+
+def run_benchmark(configs: list[dict]) -> list[dict]:
+    """Run the configs one at a time, each in a new spawned process (no pool reuse, no overlap)."""
+    results = []
+    ctx = mp.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=1, mp_context=ctx, max_tasks_per_child=1) as pool:
+        for i, cfg in enumerate(configs, 1):
+            res = pool.submit(run_config, **cfg).result()
+            results.append(res)
+            print(
+                f"[{i}/{len(configs)}] {res['model']} h={res['hidden_dim']} b={res['batch_size']} "
+                f"seq={res['seq_length']} t={res['threads']}: train {res['train_samples_per_sec']:.0f}/s, "
+                f"infer {res['infer_samples_per_sec']:.0f}/s, epoch {res['epoch_seconds_mean'] * 1000:.0f} ms, "
+                f"peak {res['peak_rss_mb']:.0f} MB"
+            )
+    return results
+
+
+def compare_to_baseline(results: list[dict], baseline: list[dict], tol: float = REGRESSION_TOL) -> pd.DataFrame:
+    """Relative change per tracked metric for configs present in both runs; `regression` marks drops beyond `tol`."""
+    base = {tuple(r[k] for k in KEY_FIELDS): r for r in baseline}
+    rows = []
+    for res in results:
+        key = tuple(res[k] for k in KEY_FIELDS)
+        if key not in base:
+            continue
+        for metric, direction in TRACKED_METRICS.items():
+            old, new = base[key][metric], res[metric]
+            change = (new - old) / old if old else 0.0
+            rows.append(
+                {
+                    **dict(zip(KEY_FIELDS, key)),
+                    "metric": metric,
+                    "baseline": old,
+                    "current": new,
+                    "change": change,
+                    "regression": bool(direction * change < -tol),
+                }
+            )
+    return pd.DataFrame(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Throughput benchmark for the LSTM / hybrid models")
+    parser.add_argument("--models", nargs="+", choices=list(MODELS), default=list(MODELS))
+    parser.add_argument("--data", choices=["synthetic", "real"], default="synthetic")
+    parser.add_argument("--hidden", nargs="+", type=int, default=[32, 64])
+    parser.add_argument("--batch", nargs="+", type=int, default=[32, 128])
+    parser.add_argument("--seq", nargs="+", type=int, default=[10, 30])
+    parser.add_argument("--threads", nargs="+", type=int, default=sorted({1, available_cpus()}))
+    parser.add_argument("--epochs", type=int, default=3)
+    parser.add_argument("--samples", type=int, default=4096, help="synthetic windows per config")
+    parser.add_argument("--out", type=Path, default=OUT_DIR / "latest.json")
+    parser.add_argument("--baseline", type=Path, default=None, help="compare against a saved benchmark JSON")
+    parser.add_argument("--save-baseline", type=Path, default=None, help="also write this run as the new baseline")
+    parser.add_argument("--tol", type=float, default=REGRESSION_TOL, help="relative change counted as a regression")
+    args = parser.parse_args()
+
+    configs = config_grid(args.models, args.data, args.hidden, args.batch, args.seq, args.threads, args.epochs, args.samples)
+    print(f"Benchmark: {len(configs)} configs ({args.data} data)")
+    results = run_benchmark(configs)
+    report = {
+        "meta": {
+            "created": pd.Timestamp.now().isoformat(timespec="seconds"),
+            "torch": torch.__version__,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": available_cpus(),
+        },
+        "results": results,
+    }
+    for path in filter(None, [args.out, args.save_baseline]):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(report, indent=2), encoding="utf-8")
+        print(f"Saved {path}")
+
+    if args.baseline is not None:
+        baseline = json.loads(args.baseline.read_text(encoding="utf-8"))["results"]
+        comparison = compare_to_baseline(results, baseline, args.tol)
+        if comparison.empty:
+            print("No configs in common with the baseline.")
+            return
+        regressions = comparison[comparison["regression"]]
+        print(comparison.to_string(index=False, float_format=lambda v: f"{v:.4g}"))
+        if not regressions.empty:
+            print(f"{len(regressions)} regression(s) beyond {args.tol:.0%} vs {args.baseline}")
+            sys.exit(1)
+        print(f"No regressions beyond {args.tol:.0%} vs {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+import os
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import torch
+
+
+def available_cpus() -> int:
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+DEFAULT_WORKERS = max(1, available_cpus() - 1)
+
+
+def seed_job(*key) -> int:
+    """Seed torch/numpy from the job key so a job's result does not depend on which process runs it."""
+    seed = 42 + zlib.crc32("/".join(str(k) for k in key).encode("utf-8")) % 10_000
+    torch.manual_seed(seed)
+    np.random.seed(seed)
+    return seed
+
+
+def _run_job(fn, kwargs: dict):
+    torch.set_num_threads(1)
+    return fn(**kwargs)
+
+
+def run_jobs(fn, jobs: dict, workers: int = DEFAULT_WORKERS, initializer=None, initargs=()) -> dict:
+    """Run fn(**kwargs) for every {key: kwargs} job and return {key: result} in job order.
+
+    Jobs are submitted in the given order (put the expensive ones first). workers <= 1 runs
+    everything in-process. `initializer(*initargs)` runs once per worker, e.g. to hand large
+    shared arrays to the workers once instead of pickling them into every job.
+    """
+    if workers <= 1 or len(jobs) <= 1:
+        if initializer is not None:
+            initializer(*initargs)
+        return {key: fn(**kwargs) for key, kwargs in jobs.items()}
+    with ProcessPoolExecutor(max_workers=min(workers, len(jobs)), initializer=initializer, initargs=initargs) as pool:
+        futures = {key: pool.submit(_run_job, fn, kwargs) for key, kwargs in jobs.items()}
+        return {key: future.result() for key, future in futures.items()}
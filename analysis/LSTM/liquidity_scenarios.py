@@ -0,0 +1,144 @@
+import glob
+import os
+
+import numpy as np
+import pandas as pd
+import torch
+
+
+SHOCK_SIGMAS = (-3.0, -2.0, -1.0, 1.0, 2.0, 3.0)
+MAX_REPLAY_BLOCKS = 6
+MIN_REPLAY_DAYS = 20
+
+
+def default_scenario_specs(split_date, anomaly_periods=None, csv_dir=None) -> list[dict]:
+    """Standard what-if set: freeze, +/-k sigma shocks, replays of past anomaly blocks and user CSV paths.
+
+    Replays use only blocks that end before `split_date`, longest first.
+    """
+    specs = [{"name": "freeze", "kind": "freeze"}]
+    specs += [{"name": f"shock_{k:+g}sigma", "kind": "shock", "k": k} for k in SHOCK_SIGMAS]
+
+    split_date = pd.to_datetime(split_date)
+    blocks = [
+        b
+        for b in (anomaly_periods or [])
+        if b.get("days", 0) >= MIN_REPLAY_DAYS and pd.to_datetime(b["end"]) < split_date
+    ]
+    blocks = sorted(blocks, key=lambda b: b["days"], reverse=True)[:MAX_REPLAY_BLOCKS]
+    for b in blocks:
+        specs.append({"name": f"replay_{b['start']}", "kind": "replay", "start": b["start"], "end": b["end"]})
+
+    if csv_dir is not None:
+        for path in sorted(glob.glob(os.path.join(csv_dir, "*.csv"))):
+            specs.append({"name": os.path.splitext(os.path.basename(path))[0], "kind": "path", "path": path})
+    return specs
+
+
+def _replay_path(history_df: pd.DataFrame, col: str, spec: dict, anchor: float, n: int) -> np.ndarray:
+    # Replay the block's relative changes from the anchor, so MMF/M2 level drift over the years does not matter.
+    dates = history_df["observation_date"]
+    block = history_df.loc[(dates >= pd.to_datetime(spec["start"])) & (dates <= pd.to_datetime(spec["end"])), col].dropna()
+    if block.empty or block.iloc[0] == 0:
+        reason = "has no observed values" if block.empty else "starts at 0"
+        raise ValueError(f"Replay scenario '{spec['name']}': {col} {reason} in {spec['start']} .. {spec['end']}")
+    rel = block.to_numpy(dtype=np.float64) / block.iloc[0]
+    rel = np.concatenate([rel[1:], np.full(max(n - len(rel) + 1, 0), rel[-1])])[:n]
+    return anchor * rel
+
+
+def _csv_path(df_period: pd.DataFrame, col: str, spec: dict, split_idx: int) -> np.ndarray:
+    user = pd.read_csv(spec["path"])
+    date_col = "observation_date" if "observation_date" in user.columns else "date"
+    value_col = col if col in user.columns else "value"
+    user = user[[date_col, value_col]].dropna()
+    user[date_col] = pd.to_datetime(user[date_col])
+    s = user.set_index(date_col)[value_col].sort_index()
+    test_dates = pd.to_datetime(df_period["observation_date"].iloc[split_idx:])
+    aligned = s.reindex(s.index.union(test_dates)).ffill().reindex(test_dates)
+    # Dates before the first user value keep the observed path.
+    actual = df_period[col].iloc[split_idx:].to_numpy(dtype=np.float64)
+    return np.where(aligned.isna(), actual, aligned.to_numpy(dtype=np.float64))
+
+
+def build_scenario_paths(
+    df_period: pd.DataFrame,
+    col: str,
+    split_idx: int,
+    specs: list[dict],
+    history_df: pd.DataFrame | None = None,
+):
+    """Raw-unit liquidity paths for every scenario, shape (scenarios, rows).
+
+    Rows before `split_idx` (train) keep the observed values; only the test range is replaced.
+    """
+    history_df = df_period if history_df is None else history_df
+    observed = df_period[col].to_numpy(dtype=np.float64)
+    train_vals = observed[:split_idx]
+    anchor = train_vals[-1]
+    n_test = len(observed) - split_idx
+    sigma_daily = float(np.std(np.diff(train_vals)))
+    horizon_scale = np.sqrt(np.arange(1, n_test + 1))
+
+    names, paths = [], []
+    for spec in specs:
+        kind = spec["kind"]
+        if kind == "freeze":
+            test_path = np.full(n_test, anchor)
+        elif kind == "shock":
+            # k-sigma envelope of a random walk with the train daily-change volatility.
+            test_path = observed[split_idx:] + spec["k"] * sigma_daily * horizon_scale
+        elif kind == "replay":
+            test_path = _replay_path(history_df, col, spec, anchor, n_test)
+        elif kind == "path":
+            test_path = _csv_path(df_period, col, spec, split_idx)
+        else:
+            raise ValueError(f"Unknown scenario kind: {kind}")
+        path = observed.copy()
+        path[split_idx:] = test_path
+        names.append(spec["name"])
+        paths.append(path)
+    return names, np.vstack(paths)
+
+
+def patch_windows(x_base: np.ndarray, scaled_paths: np.ndarray, channel: int, starts: np.ndarray) -> np.ndarray:
+    """(scenarios, windows, seq_len, features) tensor: x_base[starts] with only `channel` replaced."""
+    seq_len = x_base.shape[1]
+    rows = starts[:, None] + np.arange(seq_len)[None, :]
+    x = np.broadcast_to(x_base[starts], (len(scaled_paths),) + x_base[starts].shape).copy()
+    x[..., channel] = scaled_paths[:, rows]
+    return x
+
+
+def run_scenarios(
+    model,
+    scaler,
+    x_base: np.ndarray,
+    base_pred_scaled: np.ndarray,
+    df_period: pd.DataFrame,
+    col: str,
+    channel: int,
+    split_idx: int,
+    specs: list[dict],
+    history_df: pd.DataFrame | None = None,
+):
+    """Score every liquidity scenario with one batched forward pass.
+
+    Only windows that touch the test range are re-scored; earlier windows reuse `base_pred_scaled`.
+    Returns (names, predictions in scaled target units, shape (scenarios, windows)).
+    """
+    names, paths = build_scenario_paths(df_period, col, split_idx, specs, history_df)
+    scaled_paths = (paths - scaler.mean_[channel]) / scaler.scale_[channel]
+
+    seq_len = x_base.shape[1]
+    first = max(split_idx - seq_len + 1, 0)
+    starts = np.arange(first, len(x_base))
+    x = patch_windows(x_base, scaled_paths, channel, starts)
+
+    model.eval()
+    with torch.no_grad():
+        flat = model(torch.FloatTensor(x.reshape(-1, seq_len, x.shape[-1]))).numpy()
+
+    preds = np.repeat(base_pred_scaled[:, 0][None, :], len(names), axis=0)
+    preds[:, first:] = flat.reshape(len(names), len(starts))
+    return names, preds
@@ -1,8 +1,15 @@
+import argparse
 import os
+import sys
+
 import pandas as pd
 
+sys.path.append("/Applications/dollar_price")
+from data.process_scripts.daily_align import AlignSpec, align
+from data.process_scripts.vintage_store import load_vintage_store
+
 
-def prep_m2_demand_deposit_data() -> None:
+def prep_m2_demand_deposit_data(point_in_time: bool = False) -> None:
     out_dir = "analysis/LSTM/lstm_m2_demand_deposit"
     os.makedirs(out_dir, exist_ok=True)
 
@@ -15,13 +22,6 @@ def prep_m2_demand_deposit_data() -> None:
     spread_df["observation_date"] = pd.to_datetime(spread_df["observation_date"])
     spread_df = spread_df[["observation_date", "RATE_SPREAD_KOR_USA"]]
 
-    daily_base = pd.merge(usd, spread_df, on="observation_date", how="left")
-    daily_base["RATE_SPREAD_KOR_USA"] = (
-        daily_base["RATE_SPREAD_KOR_USA"].interpolate(method="linear").ffill().bfill()
-    )
-
-    daily_base = daily_base.sort_values("observation_date").reset_index(drop=True)
-
     # Monthly M2 details
     m2_details = pd.read_csv("data/m2/KOR/M2_details_processed.csv")
     m2_details["observation_date"] = pd.to_datetime(m2_details["observation_date"])
@@ -31,18 +31,19 @@ def prep_m2_demand_deposit_data() -> None:
     if target_col not in m2_details.columns:
         raise ValueError(f"Column not found: {target_col}")
 
-    m2_subset = m2_details[["observation_date", target_col]].copy()
-    m2_subset = m2_subset.sort_values("observation_date").reset_index(drop=True)
-
-    # Interpolate monthly value onto the base daily dates.
-    m2_daily = m2_subset.set_index("observation_date").reindex(daily_base["observation_date"])
-    m2_daily = m2_daily.interpolate(method="linear", limit_direction="both")
-    m2_daily = m2_daily.reset_index().rename(columns={"index": "observation_date"})
-
-    # Merge and keep required columns
-    df = pd.merge(daily_base, m2_daily, on="observation_date", how="left")
-    df = df.sort_values("observation_date").reset_index(drop=True)
-    df = df.dropna().reset_index(drop=True)
+    # Spread and the monthly M2 component are interpolated in time onto the FX dates.
+    specs = [
+        AlignSpec.from_frame(usd, "USD_KRW", fill="exact"),
+        AlignSpec.from_frame(spread_df, "RATE_SPREAD_KOR_USA", fill="linear", extend=True),
+    ]
+    if point_in_time:
+        # The latest M2 figure published by each date instead of an interpolation towards unreleased months.
+        df = align(specs, usd["observation_date"])
+        df[target_col] = load_vintage_store().known_at(f"m2_details.{target_col}", df["observation_date"])
+        df = df.dropna().reset_index(drop=True)
+    else:
+        specs.append(AlignSpec.from_frame(m2_details, target_col, freq="M", fill="linear", extend=True))
+        df = align(specs, usd["observation_date"], dropna=True)
 
     keep_cols = ["observation_date", "USD_KRW", "RATE_SPREAD_KOR_USA", target_col]
     df = df[keep_cols]
@@ -53,4 +54,7 @@ def prep_m2_demand_deposit_data() -> None:
 
 
 if __name__ == "__main__":
-    prep_m2_demand_deposit_data()
+    parser = argparse.ArgumentParser(description="Build the daily M2 demand-deposit LSTM dataset.")
+    parser.add_argument("--point-in-time", action="store_true", help="Use M2 as released by each date (vintage store).")
+    args = parser.parse_args()
+    prep_m2_demand_deposit_data(point_in_time=args.point_in_time)
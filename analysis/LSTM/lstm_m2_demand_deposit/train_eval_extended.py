@@ -1,4 +1,6 @@
+import argparse
 import json
+import sys
 from itertools import product
 from pathlib import Path
 
@@ -10,9 +12,13 @@ from sklearn.metrics import mean_absolute_error, mean_squared_error
 from sklearn.preprocessing import StandardScaler
 from torch.utils.data import DataLoader, TensorDataset
 
+sys.path.append("/Applications/dollar_price")
+from analysis.LSTM.job_runner import run_jobs, seed_job
 
-torch.manual_seed(42)
-np.random.seed(42)
+
+SEED = 42
+torch.manual_seed(SEED)
+np.random.seed(SEED)
 torch.set_num_threads(1)
 
 BASE_DIR = Path("/Applications/dollar_price")
@@ -113,6 +119,18 @@ def tune_hyperparams(x_train, y_train, input_dim: int):
     return best
 
 
+def train_feature_set(x_train, y_train, input_dim: int, model_name: str, seed_per_job: bool = False):
+    """Tune and train one feature set; `seed_per_job` reseeds from the model name so results do not depend on the worker count."""
+    if seed_per_job:
+        seed_job("extended", model_name)
+    best = tune_hyperparams(x_train, y_train, input_dim)
+    loader = DataLoader(TensorDataset(torch.FloatTensor(x_train), torch.FloatTensor(y_train)), batch_size=best["batch_size"], shuffle=True)
+    model = ExRateLSTM(input_dim, best["hidden_dim"], best["num_layers"])
+    opt = torch.optim.Adam(model.parameters(), lr=best["lr"])
+    train_model(model, loader, nn.MSELoss(), opt, best["num_epochs"])
+    return model, best
+
+
 def build_anomaly_mask(df: pd.DataFrame, period: dict) -> pd.Series:
     blocks = period.get("anomaly_blocks_for_analysis", period.get("all_contiguous_blocks", []))
     mask = pd.Series(False, index=df.index)
@@ -201,7 +219,9 @@ def weighted_metric(block_metrics: list[dict], key: str) -> float:
     return float(np.sum(weights * values) / np.sum(weights))
 
 
-def main() -> None:
+def main(workers: int = 1, seed_per_job: bool = False) -> None:
+    if workers > 1 and not seed_per_job:
+        raise ValueError("Parallel runs need seed_per_job: jobs sharing one seed stream depend on which process runs them")
     seq_length = 30
     pred_step = 5
 
@@ -224,21 +244,16 @@ def main() -> None:
     x_a_train, y_a_train = create_sequences(scaler_a.transform(train_df[feat_a]), seq_length, pred_step)
     x_b_train, y_b_train = create_sequences(scaler_b.transform(train_df[feat_b]), seq_length, pred_step)
 
-    best_a = tune_hyperparams(x_a_train, y_a_train, len(feat_a))
-    best_b = tune_hyperparams(x_b_train, y_b_train, len(feat_b))
-
-    loader_a = DataLoader(TensorDataset(torch.FloatTensor(x_a_train), torch.FloatTensor(y_a_train)), batch_size=best_a["batch_size"], shuffle=True)
-    loader_b = DataLoader(TensorDataset(torch.FloatTensor(x_b_train), torch.FloatTensor(y_b_train)), batch_size=best_b["batch_size"], shuffle=True)
-
-    model_a = ExRateLSTM(len(feat_a), best_a["hidden_dim"], best_a["num_layers"])
-    model_b = ExRateLSTM(len(feat_b), best_b["hidden_dim"], best_b["num_layers"])
-
-    criterion = nn.MSELoss()
-    opt_a = torch.optim.Adam(model_a.parameters(), lr=best_a["lr"])
-    opt_b = torch.optim.Adam(model_b.parameters(), lr=best_b["lr"])
-
-    train_model(model_a, loader_a, criterion, opt_a, best_a["num_epochs"])
-    train_model(model_b, loader_b, criterion, opt_b, best_b["num_epochs"])
+    # Model A and Model B are independent jobs and can train in separate processes.
+    jobs = {
+        "a": {"x_train": x_a_train, "y_train": y_a_train, "input_dim": len(feat_a), "model_name": "Model A", "seed_per_job": seed_per_job},
+        "b": {"x_train": x_b_train, "y_train": y_b_train, "input_dim": len(feat_b), "model_name": "Model B", "seed_per_job": seed_per_job},
+    }
+    torch.manual_seed(SEED)
+    np.random.seed(SEED)
+    trained = run_jobs(train_feature_set, jobs, workers)
+    model_a, best_a = trained["a"]
+    model_b, best_b = trained["b"]
 
     blocks = period.get("anomaly_blocks_for_analysis", period.get("all_contiguous_blocks", []))
     block_metrics = []
@@ -304,4 +319,12 @@ def main() -> None:
 
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Extended daily LSTM evaluation over anomaly blocks")
+    parser.add_argument("--workers", type=int, default=1, help="parallel feature-set jobs; more than 1 needs --seed-per-job")
+    parser.add_argument(
+        "--seed-per-job", action="store_true", help="reseed every job from its model name, so results do not depend on --workers"
+    )
+    args = parser.parse_args()
+    if args.workers > 1 and not args.seed_per_job:
+        parser.error("--workers > 1 needs --seed-per-job")
+    main(workers=args.workers, seed_per_job=args.seed_per_job)
@@ -1,5 +1,9 @@
 import os
-import pandas as pd
+import sys
+
+sys.path.append("/Applications/dollar_price")
+from data.process_scripts.daily_align import AlignSpec, align
+from data.process_scripts.series_lake import load_series
 
 
 def prep_daily_data() -> None:
@@ -7,16 +11,19 @@ def prep_daily_data() -> None:
     os.makedirs(out_dir, exist_ok=True)
 
     # Core daily liquidity dataset (already aligned to business days)
-    daily_liq = pd.read_csv("data/m2/KOR/merged_daily_liquid.csv")
-    daily_liq["observation_date"] = pd.to_datetime(daily_liq["observation_date"])
-
-    # Monthly spread is linearly interpolated to daily frequency
-    spread_df = pd.read_csv("data/policy_rate/spread_KOR_USA_processed.csv")
-    spread_df["observation_date"] = pd.to_datetime(spread_df["observation_date"])
-
-    df = pd.merge(daily_liq, spread_df, on="observation_date", how="left")
-    df = df.sort_values("observation_date").reset_index(drop=True)
-    df["RATE_SPREAD_KOR_USA"] = df["RATE_SPREAD_KOR_USA"].interpolate(method="linear").ffill().bfill()
+    daily_liq = load_series("merged_daily_liquid").reset_index()
+
+    # Spread is linearly interpolated (in time) onto the liquidity dates
+    spread_df = load_series("spread_kor_usa").reset_index()
+
+    df = align(
+        [
+            AlignSpec.from_frame(daily_liq, "USD_KRW", fill="exact"),
+            AlignSpec.from_frame(daily_liq, "MMF_total", fill="exact"),
+            AlignSpec.from_frame(spread_df, "RATE_SPREAD_KOR_USA", fill="linear", extend=True),
+        ],
+        daily_liq["observation_date"],
+    )
 
     keep_cols = ["observation_date", "USD_KRW", "MMF_total", "RATE_SPREAD_KOR_USA"]
     df = df[keep_cols].dropna().reset_index(drop=True)
@@ -1,20 +1,35 @@
 import os
+import sys
 import json
+import time
+import argparse
+from functools import partial
 from itertools import product
 import numpy as np
 import pandas as pd
 import torch
 import torch.nn as nn
-from torch.utils.data import DataLoader, TensorDataset
 from sklearn.preprocessing import StandardScaler
 from sklearn.metrics import mean_squared_error, mean_absolute_error
 import matplotlib.pyplot as plt
 
+sys.path.append("/Applications/dollar_price")
+from analysis.LSTM.liquidity_scenarios import default_scenario_specs, run_scenarios
+from analysis.LSTM.job_runner import run_jobs, seed_job
+from analysis.LSTM.lstm_pretrain import BASE_CONFIG, FINETUNE_CONFIG, FINETUNE_SCOPES, finetune_copy, load_or_pretrain
+from analysis.LSTM.lr_schedule import fast_params, make_scheduler, train_scheduled
+from analysis.LSTM.shared_dataset import export_dataset, train_on_shared, window_loader
 
-torch.manual_seed(42)
-np.random.seed(42)
+
+SEED = 42
+torch.manual_seed(SEED)
+np.random.seed(SEED)
 torch.set_num_threads(1)
 
+# Baseline vs Proposed feature sets
+FEATURES_A = ["USD_KRW", "RATE_SPREAD_KOR_USA"]
+FEATURES_B = ["USD_KRW", "RATE_SPREAD_KOR_USA", "MMF_total"]
+
 
 class ExRateLSTM(nn.Module):
     def __init__(self, input_dim: int, hidden_dim: int = 32, num_layers: int = 2):
@@ -52,6 +67,57 @@ def inverse_target(scaler: StandardScaler, y_scaled: np.ndarray, n_features: int
     return scaler.inverse_transform(dummy)[:, 0]
 
 
+def fit_model(x_train: np.ndarray, y_train: np.ndarray, input_dim: int, params: dict) -> ExRateLSTM:
+    loader = window_loader(x_train, y_train, params["batch_size"], shuffle=True)
+    model = ExRateLSTM(input_dim=input_dim, hidden_dim=params["hidden_dim"], num_layers=params["num_layers"])
+    optimizer = torch.optim.Adam(model.parameters(), lr=params["lr"])
+    if "schedule" in params:
+        # Large-batch mode (see lr_schedule.fast_params): per-step LR schedule + gradient clipping.
+        scheduler = make_scheduler(optimizer, params["schedule"], params["lr"], params["num_epochs"] * len(loader))
+        train_scheduled(model, loader, nn.MSELoss(), optimizer, params["num_epochs"], scheduler, params.get("clip_norm"))
+    else:
+        train_model(model, loader, nn.MSELoss(), optimizer, num_epochs=params["num_epochs"])
+    return model
+
+
+def split_index(n_rows: int, seq_length: int = 30, pred_step: int = 5) -> int:
+    # Inside each period, use chronological split (80% train / 20% test)
+    return max(int(n_rows * 0.8), seq_length + pred_step + 1)
+
+
+def scale_feature_set(
+    df_period: pd.DataFrame,
+    period_name: str,
+    features: list,
+    seq_length: int,
+    pred_step: int,
+    scaler: StandardScaler | None = None,
+):
+    """Scale one feature set (fit on the train split unless `scaler` is given); returns (scaler, scaled, train_seq_len)."""
+    split_idx = split_index(len(df_period), seq_length, pred_step)
+    if scaler is None:
+        scaler = StandardScaler().fit(df_period.iloc[:split_idx][features])
+
+    train_seq_len = split_idx - seq_length - pred_step + 1
+    if train_seq_len < 10:
+        raise ValueError(f"{period_name}: not enough train sequences")
+    return scaler, scaler.transform(df_period[features]), train_seq_len
+
+
+def window_feature_set(
+    df_period: pd.DataFrame,
+    period_name: str,
+    features: list,
+    seq_length: int,
+    pred_step: int,
+    scaler: StandardScaler | None = None,
+):
+    """Scale one feature set and window it."""
+    scaler, scaled, train_seq_len = scale_feature_set(df_period, period_name, features, seq_length, pred_step, scaler)
+    x, y = create_sequences(scaled, seq_length, pred_step)
+    return scaler, x, y, train_seq_len
+
+
 def split_train_val(x_train: np.ndarray, y_train: np.ndarray, val_ratio: float = 0.2):
     n = len(x_train)
     val_n = max(20, int(n * val_ratio))
@@ -66,6 +132,7 @@ def tune_hyperparams(
     input_dim: int,
     period_name: str,
     model_name: str,
+    fast: bool = False,
 ):
     x_fit, y_fit, x_val, y_val = split_train_val(x_train, y_train)
 
@@ -96,6 +163,10 @@ def tune_hyperparams(
             "batch_size": [32],
         }
 
+    if fast:
+        # fast_params replaces the epoch budget, so a single budget per hidden size is enough.
+        grid["num_epochs"] = grid["num_epochs"][:1]
+
     best = None
     best_rmse = float("inf")
 
@@ -106,16 +177,16 @@ def tune_hyperparams(
         grid["num_epochs"],
         grid["batch_size"],
     ):
-        loader = DataLoader(
-            TensorDataset(torch.FloatTensor(x_fit), torch.FloatTensor(y_fit)),
-            batch_size=batch_size,
-            shuffle=True,
-        )
-
-        model = ExRateLSTM(input_dim=input_dim, hidden_dim=hidden_dim, num_layers=num_layers)
-        criterion = nn.MSELoss()
-        optimizer = torch.optim.Adam(model.parameters(), lr=lr)
-        train_model(model, loader, criterion, optimizer, num_epochs=num_epochs)
+        params = {
+            "hidden_dim": hidden_dim,
+            "num_layers": num_layers,
+            "lr": lr,
+            "num_epochs": num_epochs,
+            "batch_size": batch_size,
+        }
+        if fast:
+            params = fast_params(params)
+        model = fit_model(x_fit, y_fit, input_dim, params)
 
         model.eval()
         with torch.no_grad():
@@ -124,49 +195,94 @@ def tune_hyperparams(
         rmse_val = float(np.sqrt(mean_squared_error(y_val, pred_val)))
         if rmse_val < best_rmse:
             best_rmse = rmse_val
-            best = {
-                "hidden_dim": hidden_dim,
-                "num_layers": num_layers,
-                "lr": lr,
-                "num_epochs": num_epochs,
-                "batch_size": batch_size,
-                "val_rmse_scaled": rmse_val,
-            }
+            best = {**params, "val_rmse_scaled": rmse_val}
 
     print(f"[{period_name}] Best {model_name} params: {best}")
     return best
 
 
-def run_one_period(df_period: pd.DataFrame, period_name: str, out_dir: str, enable_tuning: bool = True):
-    # Baseline vs Proposed feature sets
-    features_a = ["USD_KRW", "RATE_SPREAD_KOR_USA"]
-    features_b = ["USD_KRW", "RATE_SPREAD_KOR_USA", "MMF_total"]
+def select_params(
+    x_train: np.ndarray,
+    y_train: np.ndarray,
+    input_dim: int,
+    period_name: str,
+    model_name: str,
+    enable_tuning: bool = True,
+    fast: bool = False,
+) -> dict:
+    """Tuned (or default) training params for one feature set; `fast` selects large-batch scheduled mode (lr_schedule)."""
+    if enable_tuning:
+        return tune_hyperparams(x_train, y_train, input_dim, period_name, model_name, fast=fast)
+    best = {
+        "hidden_dim": 32,
+        "num_layers": 1,
+        "lr": 0.001,
+        "num_epochs": 80,
+        "batch_size": 32,
+        "val_rmse_scaled": None,
+    }
+    return fast_params(best) if fast else best
 
-    seq_length = 30
-    pred_step = 5
 
-    # Inside each period, use chronological split (80% train / 20% test)
-    split_idx = int(len(df_period) * 0.8)
-    split_idx = max(split_idx, seq_length + pred_step + 1)
+def train_feature_set(
+    x_train: np.ndarray,
+    y_train: np.ndarray,
+    input_dim: int,
+    period_name: str,
+    model_name: str,
+    enable_tuning: bool = True,
+    base_model: ExRateLSTM | None = None,
+    finetune_scope: str = "head",
+    fast: bool = False,
+    seed_per_job: bool = False,
+):
+    """Tune and train (or fine-tune) one (period, feature set) job; returns (model, params, seconds).
 
-    train_df = df_period.iloc[:split_idx].copy()
-    test_df = df_period.iloc[split_idx:].copy()
+    With `seed_per_job` the job reseeds from (period, model), so its result is the same whichever
+    worker process runs it. Otherwise it continues the seed stream of the process running it.
+    """
+    if seed_per_job:
+        seed_job(period_name, model_name)
+    start = time.perf_counter()
+    if base_model is not None:
+        model = finetune_copy(base_model, train_model, x_train, y_train, scope=finetune_scope)
+        return model, {"finetune_scope": finetune_scope, **FINETUNE_CONFIG}, time.perf_counter() - start
 
-    scaler_a = StandardScaler()
-    scaler_b = StandardScaler()
+    best = select_params(x_train, y_train, input_dim, period_name, model_name, enable_tuning, fast)
+    model = fit_model(x_train, y_train, input_dim, best)
+    return model, best, time.perf_counter() - start
 
-    scaler_a.fit(train_df[features_a])
-    scaler_b.fit(train_df[features_b])
 
-    data_a = scaler_a.transform(df_period[features_a])
-    data_b = scaler_b.transform(df_period[features_b])
+def run_one_period(
+    df_period: pd.DataFrame,
+    period_name: str,
+    out_dir: str,
+    enable_tuning: bool = True,
+    history_df: pd.DataFrame | None = None,
+    anomaly_periods: list | None = None,
+    base_models: dict | None = None,
+    finetune_scope: str = "head",
+    trained: dict | None = None,
+    fast: bool = False,
+):
+    features_a = FEATURES_A
+    features_b = FEATURES_B
 
-    x_a, y_a = create_sequences(data_a, seq_length, pred_step)
-    x_b, y_b = create_sequences(data_b, seq_length, pred_step)
+    seq_length = 30
+    pred_step = 5
 
-    train_seq_len = split_idx - seq_length - pred_step + 1
-    if train_seq_len < 10:
-        raise ValueError(f"{period_name}: not enough train sequences")
+    split_idx = split_index(len(df_period), seq_length, pred_step)
+
+    train_df = df_period.iloc[:split_idx].copy()
+    test_df = df_period.iloc[split_idx:].copy()
+
+    # Fine-tuning keeps the pretrained model's input space.
+    scaler_a, x_a, y_a, train_seq_len = window_feature_set(
+        df_period, period_name, features_a, seq_length, pred_step, base_models["a"]["scaler"] if base_models else None
+    )
+    scaler_b, x_b, y_b, _ = window_feature_set(
+        df_period, period_name, features_b, seq_length, pred_step, base_models["b"]["scaler"] if base_models else None
+    )
 
     x_a_train, y_a_train = x_a[:train_seq_len], y_a[:train_seq_len]
     x_a_test, y_a_test = x_a[train_seq_len:], y_a[train_seq_len:]
@@ -174,47 +290,34 @@ def run_one_period(df_period: pd.DataFrame, period_name: str, out_dir: str, enab
     x_b_train, y_b_train = x_b[:train_seq_len], y_b[:train_seq_len]
     x_b_test, y_b_test = x_b[train_seq_len:], y_b[train_seq_len:]
 
-    if enable_tuning:
-        best_a = tune_hyperparams(x_a_train, y_a_train, len(features_a), period_name, "Model A")
-        best_b = tune_hyperparams(x_b_train, y_b_train, len(features_b), period_name, "Model B")
-    else:
-        best_a = {
-            "hidden_dim": 32,
-            "num_layers": 1,
-            "lr": 0.001,
-            "num_epochs": 80,
-            "batch_size": 32,
-            "val_rmse_scaled": None,
-        }
-        best_b = {
-            "hidden_dim": 32,
-            "num_layers": 1,
-            "lr": 0.001,
-            "num_epochs": 80,
-            "batch_size": 32,
-            "val_rmse_scaled": None,
+    if trained is None:
+        trained = {
+            "a": train_feature_set(
+                x_a_train,
+                y_a_train,
+                len(features_a),
+                period_name,
+                "Model A",
+                enable_tuning,
+                base_models["a"]["model"] if base_models else None,
+                finetune_scope,
+                fast,
+            ),
+            "b": train_feature_set(
+                x_b_train,
+                y_b_train,
+                len(features_b),
+                period_name,
+                "Model B",
+                enable_tuning,
+                base_models["b"]["model"] if base_models else None,
+                finetune_scope,
+                fast,
+            ),
         }
-
-    loader_a = DataLoader(
-        TensorDataset(torch.FloatTensor(x_a_train), torch.FloatTensor(y_a_train)),
-        batch_size=best_a["batch_size"],
-        shuffle=True,
-    )
-    loader_b = DataLoader(
-        TensorDataset(torch.FloatTensor(x_b_train), torch.FloatTensor(y_b_train)),
-        batch_size=best_b["batch_size"],
-        shuffle=True,
-    )
-
-    model_a = ExRateLSTM(input_dim=len(features_a), hidden_dim=best_a["hidden_dim"], num_layers=best_a["num_layers"])
-    model_b = ExRateLSTM(input_dim=len(features_b), hidden_dim=best_b["hidden_dim"], num_layers=best_b["num_layers"])
-
-    criterion = nn.MSELoss()
-    opt_a = torch.optim.Adam(model_a.parameters(), lr=best_a["lr"])
-    opt_b = torch.optim.Adam(model_b.parameters(), lr=best_b["lr"])
-
-    train_model(model_a, loader_a, criterion, opt_a, num_epochs=best_a["num_epochs"])
-    train_model(model_b, loader_b, criterion, opt_b, num_epochs=best_b["num_epochs"])
+    model_a, best_a, seconds_a = trained["a"]
+    model_b, best_b, seconds_b = trained["b"]
+    train_seconds = seconds_a + seconds_b
 
     model_a.eval()
     model_b.eval()
@@ -239,16 +342,29 @@ def run_one_period(df_period: pd.DataFrame, period_name: str, out_dir: str, enab
     mae_a = float(mean_absolute_error(actual, pred_a_true))
     mae_b = float(mean_absolute_error(actual, pred_b_true))
 
-    # Counterfactual only for proposed model
-    df_cf = df_period.copy()
-    last_train_mmf = train_df["MMF_total"].iloc[-1]
-    df_cf.loc[test_df.index, "MMF_total"] = last_train_mmf
-    data_cf = scaler_b.transform(df_cf[features_b])
-    x_cf, _ = create_sequences(data_cf, seq_length, pred_step)
-
-    with torch.no_grad():
-        pred_cf_full_scaled = model_b(torch.FloatTensor(x_cf)).numpy()
-    pred_cf_full_true = inverse_target(scaler_b, pred_cf_full_scaled, len(features_b))
+    # Counterfactual liquidity scenarios for Model B, scored in one batched pass.
+    # "freeze" holds the liquidity level at the last train value (the original counterfactual).
+    specs = default_scenario_specs(
+        df_period["observation_date"].iloc[split_idx],
+        anomaly_periods,
+        csv_dir=f"{out_dir}/scenario_paths",
+    )
+    scenario_names, scenario_preds_scaled = run_scenarios(
+        model_b,
+        scaler_b,
+        x_b,
+        pred_b_full_scaled,
+        df_period,
+        "MMF_total",
+        features_b.index("MMF_total"),
+        split_idx,
+        specs,
+        history_df=history_df,
+    )
+    scenario_preds_true = inverse_target(scaler_b, scenario_preds_scaled.reshape(-1, 1), len(features_b)).reshape(
+        len(scenario_names), -1
+    )
+    pred_cf_full_true = scenario_preds_true[scenario_names.index("freeze")]
 
     full_plot_dir = f"{out_dir}/full"
     eval_plot_dir = f"{out_dir}/eval"
@@ -263,6 +379,27 @@ def run_one_period(df_period: pd.DataFrame, period_name: str, out_dir: str, enab
     actual_eval = actual
     pred_cf_eval_true = pred_cf_full_true[train_seq_len:]
 
+    scenario_dir = f"{out_dir}/scenarios"
+    os.makedirs(scenario_dir, exist_ok=True)
+    scenario_eval = scenario_preds_true[:, train_seq_len:]
+    scenario_df = pd.DataFrame(
+        {
+            "scenario": np.repeat(scenario_names, scenario_eval.shape[1]),
+            "date": np.tile(dates_pred_eval, len(scenario_names)),
+            "pred_fx": scenario_eval.ravel(),
+            "pred_model_b": np.tile(pred_b_true, len(scenario_names)),
+        }
+    )
+    scenario_csv_path = f"{scenario_dir}/{period_name}_scenarios.csv"
+    scenario_df.to_csv(scenario_csv_path, index=False)
+    scenario_summary = {
+        name: {
+            "mean_diff_vs_model_b": float(np.mean(scenario_eval[i] - pred_b_true)),
+            "end_diff_vs_model_b": float(scenario_eval[i, -1] - pred_b_true[-1]),
+        }
+        for i, name in enumerate(scenario_names)
+    }
+
     # Full-range figure: whole period actual + whole available-range predictions
     plt.figure(figsize=(12, 6))
     plt.plot(dates_full, actual_full, label="Actual USD/KRW", color="black", linewidth=2)
@@ -303,14 +440,45 @@ def run_one_period(df_period: pd.DataFrame, period_name: str, out_dir: str, enab
         "mae_model_a": mae_a,
         "mae_model_b": mae_b,
         "better_model": "B" if rmse_b < rmse_a else "A",
+        "train_mode": "finetune" if base_models is not None else "fast" if fast else "scratch",
+        "train_seconds": train_seconds,
         "best_params_a": best_a,
         "best_params_b": best_b,
         "plot_full": plot_full_path,
         "plot_eval": plot_eval_path,
+        "scenarios_csv": scenario_csv_path,
+        "scenario_summary": scenario_summary,
     }
 
 
-def run_experiment():
+def pretrain_base_models(df: pd.DataFrame, period_dfs: dict, out_dir: str, seq_length: int = 30, pred_step: int = 5):
+    """Train (or reload) Model A/B base models once on the history before the earliest period test split."""
+    pretrain_end = min(p["observation_date"].iloc[split_index(len(p), seq_length, pred_step)] for p in period_dfs.values())
+    base_df = df[df["observation_date"] < pretrain_end]
+
+    base_models = {}
+    base_seconds = 0.0
+    for key, features in [("a", FEATURES_A), ("b", FEATURES_B)]:
+        scaler = StandardScaler().fit(base_df[features])
+        x, y = create_sequences(scaler.transform(base_df[features]), seq_length, pred_step)
+        meta = {
+            "features": features,
+            "start": base_df["observation_date"].min().strftime("%Y-%m-%d"),
+            "pretrain_end": pretrain_end.strftime("%Y-%m-%d"),
+            "rows": int(len(base_df)),
+            "config": BASE_CONFIG,
+        }
+        model, scaler, seconds = load_or_pretrain(
+            ExRateLSTM, train_model, x, y, scaler, meta, f"{out_dir}/models/base_model_{key}.pt"
+        )
+        base_models[key] = {"model": model, "scaler": scaler}
+        base_seconds += seconds
+    return base_models, base_seconds, pretrain_end
+
+
+def run_experiment(mode: str = "scratch", finetune_scope: str = "head", workers: int = 1, seed_per_job: bool = False):
+    if workers > 1 and not seed_per_job:
+        raise ValueError("Parallel runs need seed_per_job: jobs sharing one seed stream depend on which process runs them")
     out_dir = "analysis/LSTM/lstm_mmf"
     os.makedirs(out_dir, exist_ok=True)
 
@@ -335,16 +503,95 @@ def run_experiment():
         ),
     }
 
-    results = []
+    period_dfs = {}
     for name, (start, end) in periods.items():
         period_df = df[(df["observation_date"] >= pd.to_datetime(start)) & (df["observation_date"] <= pd.to_datetime(end))].copy()
         period_df = period_df.reset_index(drop=True)
         if len(period_df) < 120:
             raise ValueError(f"{name}: not enough rows ({len(period_df)}) for daily LSTM with seq_length=30")
+        period_dfs[name] = period_df
+
+    base_models = None
+    suffix = ""
+    if mode == "finetune":
+        base_models, base_seconds, pretrain_end = pretrain_base_models(df, period_dfs, out_dir)
+        suffix = "_finetune"
+        print(f"Base models pretrained through {pretrain_end.date()} ({base_seconds:.1f}s, 0 = reused from disk)")
+    elif mode == "fast":
+        suffix = "_fast"
+
+    # Independent (period, feature set) training jobs run in parallel; evaluation stays sequential.
+    jobs = {}
+    for name, period_df in period_dfs.items():
+        use_tuning = name != "full_period"
+        for key, features, model_name in [("a", FEATURES_A, "Model A"), ("b", FEATURES_B, "Model B")]:
+            _, scaled, train_seq_len = scale_feature_set(
+                period_df, name, features, 30, 5, base_models[key]["scaler"] if base_models else None
+            )
+            # Workers memory-map the scaled matrix and window starts instead of unpickling windows.
+            dataset = export_dataset(
+                f"{os.path.basename(out_dir)}/{name}{suffix}/{key}",
+                scaled,
+                scaled[:, 0],
+                {"train": np.arange(train_seq_len)},
+                seq_length=30,
+                target_offset=30 + 5 - 1,
+                meta={"features": features, "period": name},
+            )
+            jobs[(name, key)] = {
+                "dataset": str(dataset),
+                "input_dim": len(features),
+                "period_name": f"{name}{suffix}",
+                "model_name": model_name,
+                "enable_tuning": use_tuning,
+                "base_model": base_models[key]["model"] if base_models else None,
+                "finetune_scope": finetune_scope,
+                "fast": mode == "fast",
+                "seed_per_job": seed_per_job,
+            }
+    # Without seed_per_job the jobs continue this seed stream in job order (serial runs only).
+    torch.manual_seed(SEED)
+    np.random.seed(SEED)
+    trained = run_jobs(partial(train_on_shared, train_feature_set), jobs, workers)
+
+    results = []
+    for name, period_df in period_dfs.items():
         use_tuning = name != "full_period"
-        results.append(run_one_period(period_df, name, out_dir, enable_tuning=use_tuning))
+        results.append(
+            run_one_period(
+                period_df,
+                f"{name}{suffix}",
+                out_dir,
+                enable_tuning=use_tuning,
+                history_df=df,
+                anomaly_periods=period_info.get("all_anomaly_periods", []),
+                base_models=base_models,
+                finetune_scope=finetune_scope,
+                trained={"a": trained[(name, "a")], "b": trained[(name, "b")]},
+                fast=mode == "fast",
+            )
+        )
 
-    with open(f"{out_dir}/results.json", "w", encoding="utf-8") as f:
+    if mode in ("finetune", "fast"):
+        # Time saved next to accuracy deltas against the last scratch run (results.json).
+        scratch = {}
+        if os.path.exists(f"{out_dir}/results.json"):
+            with open(f"{out_dir}/results.json", "r", encoding="utf-8") as f:
+                scratch = {r["period"]: r for r in json.load(f)}
+        for r, name in zip(results, period_dfs):
+            if mode == "finetune":
+                r["base_pretrain_end"] = pretrain_end.strftime("%Y-%m-%d")
+                r["base_train_seconds"] = base_seconds
+            ref = scratch.get(name)
+            if ref is None:
+                continue
+            r["delta_rmse_model_a_vs_scratch"] = r["rmse_model_a"] - ref["rmse_model_a"]
+            r["delta_rmse_model_b_vs_scratch"] = r["rmse_model_b"] - ref["rmse_model_b"]
+            if ref.get("train_seconds") is not None:
+                r["scratch_train_seconds"] = ref["train_seconds"]
+                r["time_saved_seconds"] = ref["train_seconds"] - r["train_seconds"]
+
+    with open(f"{out_dir}/results{suffix}.json", "w", encoding="utf-8") as f:
         json.dump(results, f, ensure_ascii=False, indent=2)
 
     lines = [
@@ -360,17 +607,45 @@ def run_experiment():
         lines.append(f"MAE A: {r['mae_model_a']:.2f}")
         lines.append(f"MAE B: {r['mae_model_b']:.2f}")
         lines.append(f"Better: Model {r['better_model']}")
+        lines.append(f"Training: {r['train_mode']} ({r['train_seconds']:.1f}s)")
+        if "delta_rmse_model_b_vs_scratch" in r:
+            lines.append(
+                f"vs scratch: dRMSE A {r['delta_rmse_model_a_vs_scratch']:+.2f}, "
+                f"dRMSE B {r['delta_rmse_model_b_vs_scratch']:+.2f}, "
+                f"time saved {r.get('time_saved_seconds', float('nan')):.1f}s"
+            )
         lines.append(f"Best Params A: {r['best_params_a']}")
         lines.append(f"Best Params B: {r['best_params_b']}")
         lines.append(f"Plot Full: {r['plot_full']}")
         lines.append(f"Plot Eval: {r['plot_eval']}")
+        lines.append(f"Scenarios: {r['scenarios_csv']}")
+        for scenario, stats in r["scenario_summary"].items():
+            lines.append(f"  {scenario}: mean diff vs B {stats['mean_diff_vs_model_b']:+.2f}, end diff {stats['end_diff_vs_model_b']:+.2f}")
         lines.append("")
 
-    with open(f"{out_dir}/results.txt", "w", encoding="utf-8") as f:
+    with open(f"{out_dir}/results{suffix}.txt", "w", encoding="utf-8") as f:
         f.write("\n".join(lines))
 
     print("\n".join(lines))
 
 
 if __name__ == "__main__":
-    run_experiment()
+    parser = argparse.ArgumentParser(description="Daily LSTM comparison by period")
+    parser.add_argument(
+        "--mode",
+        choices=["scratch", "finetune", "fast"],
+        default="scratch",
+        help="scratch: tune and train per period; finetune: pretrain once, fine-tune per period; "
+        "fast: scratch with large batches, cosine LR schedule and gradient clipping",
+    )
+    parser.add_argument("--finetune-scope", choices=FINETUNE_SCOPES, default="head")
+    parser.add_argument("--workers", type=int, default=1, help="parallel (period, feature set) jobs; more than 1 needs --seed-per-job")
+    parser.add_argument(
+        "--seed-per-job",
+        action="store_true",
+        help="reseed every job from its (period, model) key, so results do not depend on --workers",
+    )
+    args = parser.parse_args()
+    if args.workers > 1 and not args.seed_per_job:
+        parser.error("--workers > 1 needs --seed-per-job")
+    run_experiment(mode=args.mode, finetune_scope=args.finetune_scope, workers=args.workers, seed_per_job=args.seed_per_job)
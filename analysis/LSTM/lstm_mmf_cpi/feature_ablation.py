@@ -0,0 +1,173 @@
+"""
+Feature-set ablation for the CPI-integrated daily LSTM.
+
+The full column set is scaled and windowed once per period; every feature subset is a channel
+selection on that shared (windows, seq_len, features) array. StandardScaler works column by
+column, so the selected channels are identical to scaling the subset on its own.
+"""
+import argparse
+import json
+import sys
+import time
+from itertools import combinations
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import torch
+import torch.nn as nn
+from sklearn.metrics import mean_absolute_error, mean_squared_error
+from torch.utils.data import DataLoader, TensorDataset
+
+sys.path.append("/Applications/dollar_price")
+from analysis.LSTM.job_runner import DEFAULT_WORKERS, run_jobs, seed_job
+from analysis.LSTM.lstm_mmf_cpi.train_eval_cpi_integrated import (
+    ExRateLSTM,
+    build_shared_windows,
+    inverse_target,
+    select_features,
+    train_model,
+    tune_hyperparams,
+)
+
+
+BASE_DIR = Path("/Applications/dollar_price")
+OUT_DIR = BASE_DIR / "analysis" / "LSTM" / "lstm_mmf_cpi"
+DATA_PATH = OUT_DIR / "daily_dataset_cpi_integrated.csv"
+
+BASE_FEATURES = ["USD_KRW", "RATE_SPREAD_KOR_USA"]
+OPTIONAL_FEATURES = ["MMF_total", "Energy_YoY_lag2", "Food_YoY", "Shelter_YoY_lag2", "Durables_YoY_lag3", "Headline_MoM_lag1"]
+ALL_FEATURES = BASE_FEATURES + OPTIONAL_FEATURES
+
+# Same fixed parameters as train_eval_fixed_params.py, used when tuning is off.
+FIXED_PARAMS = {
+    "full": {"hidden_dim": 32, "num_layers": 1, "lr": 0.001, "num_epochs": 30, "batch_size": 32},
+    "anomaly": {"hidden_dim": 32, "num_layers": 1, "lr": 0.001, "num_epochs": 50, "batch_size": 32},
+}
+
+# Period names as passed to tune_hyperparams by train_eval_cpi_integrated.py (selects the grid).
+TUNING_NAMES = {"full": "full_all", "anomaly": "anomaly_period"}
+
+_SHARED = {}
+
+
+def feature_subsets(base: list = BASE_FEATURES, optional: list = OPTIONAL_FEATURES):
+    """Base features plus every combination of the optional ones (2^k subsets)."""
+    for r in range(len(optional) + 1):
+        for combo in combinations(optional, r):
+            yield base + list(combo)
+
+
+def split_periods(df: pd.DataFrame, test_ratio: float = 0.2) -> dict:
+    # Same periods and 80/20 splits as train_eval_cpi_integrated.py
+    df_anom = df[(df["observation_date"] >= "2024-11-01") & (df["observation_date"] <= "2026-03-16")].reset_index(drop=True)
+    periods = {}
+    for name, frame in [("full", df), ("anomaly", df_anom)]:
+        split_idx = int(len(frame) * (1 - test_ratio))
+        periods[name] = (frame[:split_idx].reset_index(drop=True), frame[split_idx:].reset_index(drop=True))
+    return periods
+
+
+def _init_shared(shared: dict):
+    _SHARED.clear()
+    _SHARED.update(shared)
+
+
+def run_subset(period: str, features: list, enable_tuning: bool = False) -> dict:
+    """Train and evaluate one feature subset on the worker's shared windows."""
+    shared = _SHARED[period]
+    seed_job(period, "+".join(features))
+    start = time.perf_counter()
+    x_train, x_test = select_features(shared, features)
+    y_train, y_test = shared["y_train"], shared["y_test"]
+
+    if enable_tuning:
+        params = tune_hyperparams(x_train, y_train, len(features), TUNING_NAMES[period], "+".join(features))
+    else:
+        params = FIXED_PARAMS[period]
+    model = ExRateLSTM(len(features), params["hidden_dim"], params["num_layers"])
+    optimizer = torch.optim.Adam(model.parameters(), lr=params["lr"])
+    loader = DataLoader(TensorDataset(torch.FloatTensor(x_train), torch.FloatTensor(y_train)), batch_size=params["batch_size"], shuffle=False)
+    train_model(model, loader, nn.MSELoss(), optimizer, params["num_epochs"])
+
+    model.eval()
+    with torch.no_grad():
+        y_pred = model(torch.FloatTensor(x_test)).numpy()
+    n_cols = len(shared["columns"])
+    y_test_inv = inverse_target(shared["scaler"], y_test, n_cols)
+    y_pred_inv = inverse_target(shared["scaler"], y_pred, n_cols)
+
+    return {
+        "period": period,
+        "features": "+".join(features),
+        "n_features": len(features),
+        "rmse": float(np.sqrt(mean_squared_error(y_test_inv, y_pred_inv))),
+        "mae": float(mean_absolute_error(y_test_inv, y_pred_inv)),
+        "params": params,
+        "seconds": time.perf_counter() - start,
+    }
+
+
+def feature_effects(results: pd.DataFrame, optional: list = OPTIONAL_FEATURES) -> pd.DataFrame:
+    """Mean RMSE with vs without each optional feature, over all subsets of a period."""
+    rows = []
+    for period, grp in results.groupby("period"):
+        has = {f: grp["features"].str.split("+").apply(lambda fs: f in fs) for f in optional}
+        for f in optional:
+            rows.append(
+                {
+                    "period": period,
+                    "feature": f,
+                    "mean_rmse_with": float(grp.loc[has[f], "rmse"].mean()),
+                    "mean_rmse_without": float(grp.loc[~has[f], "rmse"].mean()),
+                }
+            )
+    effects = pd.DataFrame(rows)
+    effects["rmse_delta"] = effects["mean_rmse_with"] - effects["mean_rmse_without"]
+    return effects
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Feature-set ablation sweep for the CPI-integrated LSTM")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS)
+    parser.add_argument("--tune", action="store_true", help="run tune_hyperparams per subset (default: fixed params)")
+    parser.add_argument("--periods", nargs="+", choices=["full", "anomaly"], default=["full", "anomaly"])
+    parser.add_argument("--max-subsets", type=int, default=None, help="only the first N subsets (smoke runs)")
+    args = parser.parse_args()
+
+    seq_length, pred_step = 30, 5
+    df = pd.read_csv(DATA_PATH)
+    df["observation_date"] = pd.to_datetime(df["observation_date"])
+
+    periods = split_periods(df)
+    shared = {name: build_shared_windows(*periods[name], ALL_FEATURES, seq_length, pred_step) for name in args.periods}
+    subsets = list(feature_subsets())[: args.max_subsets]
+
+    # Full-period subsets are the expensive ones, so they are submitted first.
+    jobs = {
+        (name, "+".join(features)): {"period": name, "features": features, "enable_tuning": args.tune}
+        for name in args.periods
+        for features in subsets
+    }
+    print(f"Ablation: {len(subsets)} subsets x {len(args.periods)} periods = {len(jobs)} jobs, workers={args.workers}")
+    start = time.perf_counter()
+    out = run_jobs(run_subset, jobs, args.workers, initializer=_init_shared, initargs=(shared,))
+    elapsed = time.perf_counter() - start
+
+    results = pd.DataFrame(list(out.values())).sort_values(["period", "rmse"]).reset_index(drop=True)
+    effects = feature_effects(results)
+
+    ablation_dir = OUT_DIR / "ablation"
+    ablation_dir.mkdir(parents=True, exist_ok=True)
+    results.drop(columns=["params"]).to_csv(ablation_dir / "ablation_results.csv", index=False)
+    effects.to_csv(ablation_dir / "feature_effects.csv", index=False)
+    with open(ablation_dir / "ablation_results.json", "w", encoding="utf-8") as f:
+        json.dump({"elapsed_seconds": elapsed, "results": results.to_dict(orient="records")}, f, ensure_ascii=False, indent=2)
+
+    print(results.drop(columns=["params"]).groupby("period").head(5).to_string(index=False))
+    print(effects.to_string(index=False))
+    print(f"Saved {ablation_dir / 'ablation_results.csv'} ({elapsed:.1f}s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,15 @@
+import argparse
 import os
+import sys
 import pandas as pd
 from pathlib import Path
 
+sys.path.append("/Applications/dollar_price")
+from data.process_scripts.daily_align import AlignSpec, align
+from data.process_scripts.vintage_store import load_vintage_store
 
-def prep_cpi_integrated_data() -> None:
+
+def prep_cpi_integrated_data(point_in_time: bool = False) -> None:
     out_dir = "analysis/lstm_cpi_integration"
     os.makedirs(out_dir, exist_ok=True)
 
@@ -24,23 +30,22 @@ def prep_cpi_integrated_data() -> None:
     ]
     
     # Extract top 5 CPI features, fill NaN in case
-    cpi_subset = cpi_monthly[top_5_cpi_features].fillna(method="ffill").fillna(method="bfill")
+    cpi_subset = cpi_monthly[top_5_cpi_features].ffill().bfill()
     cpi_subset = cpi_subset.reset_index()
     cpi_subset.columns = ["observation_date"] + top_5_cpi_features
     
-    # Merge daily data with monthly CPI data by date (left join on daily business dates)
-    # Interpolate CPI linearly to daily frequency
-    cpi_subset["observation_date"] = pd.to_datetime(cpi_subset["observation_date"])
-    
-    # Create daily date range
-    date_range = pd.date_range(start=daily_liq["observation_date"].min(), 
-                                end=daily_liq["observation_date"].max(), 
-                                freq="D")
-    cpi_daily = cpi_subset.set_index("observation_date").reindex(date_range)
-    cpi_daily = cpi_daily.interpolate(method="linear", limit_direction="both")
-    cpi_daily = cpi_daily.reset_index()
-    cpi_daily.columns = ["observation_date"] + top_5_cpi_features
-    
+    if point_in_time:
+        # CPI features as published by each date (BLS release calendar), no look-ahead
+        cpi_daily = load_vintage_store().features_as_of(daily_liq["observation_date"], "us_cpi_components", top_5_cpi_features)
+        cpi_daily = cpi_daily.rename_axis("observation_date").reset_index()
+    else:
+        # Interpolate CPI linearly (in time) onto the daily business dates
+        cpi_subset["observation_date"] = pd.to_datetime(cpi_subset["observation_date"])
+        cpi_daily = align(
+            [AlignSpec.from_frame(cpi_subset, col, freq="M", fill="linear", extend=True) for col in top_5_cpi_features],
+            daily_liq["observation_date"],
+        )
+
     # Merge with daily data
     df = pd.merge(daily_liq, cpi_daily, on="observation_date", how="left")
     df = df.sort_values("observation_date").reset_index(drop=True)
@@ -54,4 +59,7 @@ def prep_cpi_integrated_data() -> None:
 
 
 if __name__ == "__main__":
-    prep_cpi_integrated_data()
+    parser = argparse.ArgumentParser(description="Build the daily LSTM dataset with the top CPI features.")
+    parser.add_argument("--point-in-time", action="store_true", help="Use CPI features as released by each date (vintage store).")
+    args = parser.parse_args()
+    prep_cpi_integrated_data(point_in_time=args.point_in_time)
@@ -52,6 +52,33 @@ def inverse_target(scaler: StandardScaler, y_scaled: np.ndarray, n_features: int
     return scaler.inverse_transform(dummy)[:, 0]
 
 
+def build_shared_windows(df_train: pd.DataFrame, df_test: pd.DataFrame, columns: list, seq_length: int, pred_step: int) -> dict:
+    """Scale (fit on train) and window all `columns` once; the target must be the first column."""
+    if columns[0] != "USD_KRW":
+        raise ValueError("USD_KRW must be the first column (target channel 0)")
+    scaler = StandardScaler().fit(df_train[columns].values)
+    x_train, y_train = create_sequences(scaler.transform(df_train[columns].values), seq_length, pred_step)
+    x_test, y_test = create_sequences(scaler.transform(df_test[columns].values), seq_length, pred_step)
+    return {
+        "columns": list(columns),
+        "scaler": scaler,
+        "x_train": x_train,
+        "y_train": y_train,
+        "x_test": x_test,
+        "y_test": y_test,
+    }
+
+
+def channel_index(shared: dict, features: list) -> list:
+    return [shared["columns"].index(f) for f in features]
+
+
+def select_features(shared: dict, features: list):
+    """(x_train, x_test) for a feature subset, gathered from the shared windows by channel index."""
+    idx = channel_index(shared, features)
+    return np.ascontiguousarray(shared["x_train"][:, :, idx]), np.ascontiguousarray(shared["x_test"][:, :, idx])
+
+
 def split_train_val(x_train: np.ndarray, y_train: np.ndarray, val_ratio: float = 0.2):
     n = len(x_train)
     val_n = max(20, int(n * val_ratio))
@@ -151,6 +178,10 @@ def train_eval_cpi_integrated():
     print(f"Train size: {len(df_train)}, Test size: {len(df_test)}")
 
     seq_length, pred_step = 30, 5
+    all_features = ["USD_KRW", "RATE_SPREAD_KOR_USA", "MMF_total", "Energy_YoY_lag2", "Food_YoY", "Shelter_YoY_lag2", "Durables_YoY_lag3", "Headline_MoM_lag1"]
+
+    # Scale and window the full column set once; each model selects its channels.
+    shared = build_shared_windows(df_train, df_test, all_features, seq_length, pred_step)
 
     for model_idx, (features, model_name) in enumerate([
         (["USD_KRW", "RATE_SPREAD_KOR_USA"], "Model A (Spread only)"),
@@ -159,16 +190,8 @@ def train_eval_cpi_integrated():
     ]):
         print(f"\n{model_name}")
         
-        # Train data
-        data_train = df_train[features].values
-        scaler = StandardScaler()
-        data_train_scaled = scaler.fit_transform(data_train)
-        x_train, y_train = create_sequences(data_train_scaled, seq_length, pred_step)
-
-        # Test data
-        data_test = df_test[features].values
-        data_test_scaled = scaler.transform(data_test)
-        x_test, y_test = create_sequences(data_test_scaled, seq_length, pred_step)
+        x_train, x_test = select_features(shared, features)
+        y_train, y_test = shared["y_train"], shared["y_test"]
 
         print(f"Train sequences: {len(x_train)}, Test sequences: {len(x_test)}")
 
@@ -190,8 +213,8 @@ def train_eval_cpi_integrated():
         with torch.no_grad():
             y_pred = model(torch.FloatTensor(x_test)).numpy()
 
-        y_test_inv = inverse_target(scaler, y_test, len(features))
-        y_pred_inv = inverse_target(scaler, y_pred, len(features))
+        y_test_inv = inverse_target(shared["scaler"], y_test, len(all_features))
+        y_pred_inv = inverse_target(shared["scaler"], y_pred, len(all_features))
 
         rmse = np.sqrt(mean_squared_error(y_test_inv, y_pred_inv))
         mae = mean_absolute_error(y_test_inv, y_pred_inv)
@@ -218,6 +241,8 @@ def train_eval_cpi_integrated():
 
     print(f"Train size: {len(df_train_anom)}, Test size: {len(df_test_anom)}")
 
+    shared_anom = build_shared_windows(df_train_anom, df_test_anom, all_features, seq_length, pred_step)
+
     for model_idx, (features, model_name) in enumerate([
         (["USD_KRW", "RATE_SPREAD_KOR_USA"], "Model A (Spread only)"),
         (["USD_KRW", "RATE_SPREAD_KOR_USA", "MMF_total"], "Model B (Spread + MMF)"),
@@ -225,16 +250,8 @@ def train_eval_cpi_integrated():
     ]):
         print(f"\n{model_name}")
         
-        # Train data
-        data_train_anom = df_train_anom[features].values
-        scaler_anom = StandardScaler()
-        data_train_anom_scaled = scaler_anom.fit_transform(data_train_anom)
-        x_train_anom, y_train_anom = create_sequences(data_train_anom_scaled, seq_length, pred_step)
-
-        # Test data
-        data_test_anom = df_test_anom[features].values
-        data_test_anom_scaled = scaler_anom.transform(data_test_anom)
-        x_test_anom, y_test_anom = create_sequences(data_test_anom_scaled, seq_length, pred_step)
+        x_train_anom, x_test_anom = select_features(shared_anom, features)
+        y_train_anom, y_test_anom = shared_anom["y_train"], shared_anom["y_test"]
 
         print(f"Train sequences: {len(x_train_anom)}, Test sequences: {len(x_test_anom)}")
 
@@ -256,8 +273,8 @@ def train_eval_cpi_integrated():
         with torch.no_grad():
             y_pred_anom = model_anom(torch.FloatTensor(x_test_anom)).numpy()
 
-        y_test_anom_inv = inverse_target(scaler_anom, y_test_anom, len(features))
-        y_pred_anom_inv = inverse_target(scaler_anom, y_pred_anom, len(features))
+        y_test_anom_inv = inverse_target(shared_anom["scaler"], y_test_anom, len(all_features))
+        y_pred_anom_inv = inverse_target(shared_anom["scaler"], y_pred_anom, len(all_features))
 
         rmse_anom = np.sqrt(mean_squared_error(y_test_anom_inv, y_pred_anom_inv))
         mae_anom = mean_absolute_error(y_test_anom_inv, y_pred_anom_inv)
@@ -0,0 +1,109 @@
+import copy
+import time
+from pathlib import Path
+
+import numpy as np
+import torch
+import torch.nn as nn
+from sklearn.preprocessing import StandardScaler
+
+from analysis.LSTM.shared_dataset import window_loader
+
+
+BASE_CONFIG = {
+    "hidden_dim": 32,
+    "num_layers": 2,
+    "lr": 0.001,
+    "num_epochs": 30,
+    "batch_size": 64,
+}
+
+FINETUNE_CONFIG = {
+    "lr": 0.003,
+    "num_epochs": 20,
+    "batch_size": 32,
+}
+
+FINETUNE_SCOPES = ("head", "last_layer")
+
+
+def scaler_state(scaler: StandardScaler) -> dict:
+    return {"mean": scaler.mean_.tolist(), "scale": scaler.scale_.tolist()}
+
+
+def scaler_from_state(state: dict) -> StandardScaler:
+    scaler = StandardScaler()
+    scaler.mean_ = np.asarray(state["mean"], dtype=np.float64)
+    scaler.scale_ = np.asarray(state["scale"], dtype=np.float64)
+    scaler.var_ = scaler.scale_ ** 2
+    scaler.n_features_in_ = len(scaler.mean_)
+    return scaler
+
+
+def load_or_pretrain(model_cls, train_fn, x_train, y_train, scaler: StandardScaler, meta: dict, path: Path):
+    """Return (base model, scaler, seconds spent training) for one feature set.
+
+    The base model is trained once on the pretraining history and saved to `path`. Later runs
+    reuse it as long as `meta` (features, pretrain window, rows) is unchanged, in which case the
+    training time is 0.
+    """
+    path = Path(path)
+    if path.exists():
+        artifact = torch.load(path, map_location="cpu", weights_only=True)
+        if artifact["meta"] == meta:
+            model = model_cls(**artifact["model_config"])
+            model.load_state_dict(artifact["state_dict"])
+            return model, scaler_from_state(artifact["scaler"]), 0.0
+
+    start = time.perf_counter()
+    model_config = {
+        "input_dim": int(x_train.shape[2]),
+        "hidden_dim": BASE_CONFIG["hidden_dim"],
+        "num_layers": BASE_CONFIG["num_layers"],
+    }
+    model = model_cls(**model_config)
+    loader = window_loader(x_train, y_train, BASE_CONFIG["batch_size"], shuffle=True)
+    optimizer = torch.optim.Adam(model.parameters(), lr=BASE_CONFIG["lr"])
+    train_fn(model, loader, nn.MSELoss(), optimizer, num_epochs=BASE_CONFIG["num_epochs"])
+    seconds = time.perf_counter() - start
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    torch.save(
+        {
+            "meta": meta,
+            "model_config": model_config,
+            "state_dict": model.state_dict(),
+            "scaler": scaler_state(scaler),
+        },
+        path,
+    )
+    return model, scaler, seconds
+
+
+def finetune_copy(base_model, train_fn, x_train, y_train, scope: str = "head"):
+    """Copy the base model and train only the output head (or the last LSTM layer + head)."""
+    if scope not in FINETUNE_SCOPES:
+        raise ValueError(f"Unknown fine-tune scope: {scope}")
+    model = copy.deepcopy(base_model)
+    for p in model.parameters():
+        p.requires_grad = False
+    trainable = list(model.fc.parameters())
+    if scope == "last_layer":
+        last = model.lstm.num_layers - 1
+        trainable += [p for name, p in model.lstm.named_parameters() if name.endswith(f"_l{last}")]
+    for p in trainable:
+        p.requires_grad = True
+
+    optimizer = torch.optim.Adam(trainable, lr=FINETUNE_CONFIG["lr"])
+    if scope == "head":
+        # The frozen LSTM is evaluated once; epochs only pass the cached last hidden states through fc.
+        model.eval()
+        with torch.no_grad():
+            out, _ = model.lstm(torch.FloatTensor(x_train))
+        inputs, target = out[:, -1, :].numpy(), model.fc
+    else:
+        inputs, target = x_train, model
+    loader = window_loader(inputs, y_train, FINETUNE_CONFIG["batch_size"], shuffle=True)
+    train_fn(target, loader, nn.MSELoss(), optimizer, num_epochs=FINETUNE_CONFIG["num_epochs"])
+    model.eval()
+    return model
@@ -0,0 +1,155 @@
+import argparse
+import copy
+import json
+import sys
+import time
+import warnings
+from pathlib import Path
+
+import numpy as np
+import torch
+import torch.nn as nn
+
+sys.path.append("/Applications/dollar_price")
+
+
+BACKENDS = ("eager", "script", "int8")
+# Max |compiled - fp32| on scaled outputs (targets are standardized, so 0.05 is 5% of one std).
+PARITY_TOL = 0.05
+PARITY_WINDOWS = 512
+
+
+def quantize_int8(model: nn.Module) -> nn.Module:
+    """Dynamic int8 quantization of the LSTM/Linear layers (weights int8, activations fp32) for CPU."""
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", category=DeprecationWarning)
+        warnings.simplefilter("ignore", category=UserWarning)
+        return torch.ao.quantization.quantize_dynamic(copy.deepcopy(model).eval(), {nn.LSTM, nn.Linear}, dtype=torch.qint8)
+
+
+def compile_model(model: nn.Module, backend: str = "script"):
+    """TorchScript-compile `model` (optionally int8-quantized first). "eager" returns the model as is."""
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown backend: {backend}")
+    model = model.eval()
+    if backend == "eager":
+        return model
+    if backend == "int8":
+        model = quantize_int8(model)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", category=FutureWarning)
+        return torch.jit.script(model)
+
+
+def parity_check(reference: nn.Module, candidate, x: torch.Tensor, tol: float = PARITY_TOL) -> dict:
+    reference.eval()
+    with torch.no_grad():
+        ref = reference(x)
+        out = candidate(x)
+    err = (out - ref).abs()
+    return {
+        "max_abs_err": float(err.max()),
+        "mean_abs_err": float(err.mean()),
+        "tol": tol,
+        "passed": bool(err.max() <= tol),
+    }
+
+
+def time_forward(model, x: torch.Tensor, repeats: int = 3) -> float:
+    with torch.no_grad():
+        model(x)
+        start = time.perf_counter()
+        for _ in range(repeats):
+            model(x)
+    return (time.perf_counter() - start) / repeats
+
+
+def example_windows(n: int, seq_length: int, input_dim: int, seed: int = 0) -> torch.Tensor:
+    # Inputs are StandardScaler outputs, so N(0, 1) windows cover the range seen in practice.
+    g = torch.Generator().manual_seed(seed)
+    return torch.randn(n, seq_length, input_dim, generator=g)
+
+
+def compile_with_parity(model: nn.Module, backend: str, x: torch.Tensor, tol: float = PARITY_TOL):
+    """Compile and verify against the fp32 eager model; raises if the parity check fails."""
+    compiled = compile_model(copy.deepcopy(model), backend)
+    report = parity_check(model, compiled, x, tol)
+    if not report["passed"]:
+        raise ValueError(f"{backend} parity check failed: max_abs_err={report['max_abs_err']:.4g} > {tol}")
+    return compiled, report
+
+
+def model_from_artifact(artifact: dict):
+    """Rebuild (fp32 model, seq_length) from a hybrid_service artifact or an lstm_pretrain base model."""
+    if "model_type" in artifact:
+        from analysis.LSTM.Hybrid.hybrid_service import MODEL_BUILDERS
+
+        model = MODEL_BUILDERS[artifact["model_type"]](**artifact["model_config"])
+        seq_length = artifact["seq_length"]
+    else:
+        from analysis.LSTM.lstm_mmf.train_eval_periods import ExRateLSTM
+
+        model = ExRateLSTM(**artifact["model_config"])
+        seq_length = 30
+    model.load_state_dict(artifact["state_dict"])
+    return model.eval(), seq_length
+
+
+def export_model(model: nn.Module, out_path, x: torch.Tensor, backend: str = "script", tol: float = PARITY_TOL) -> dict:
+    """Save a TorchScript artifact (load with torch.jit.load) after a parity check against fp32."""
+    out_path = Path(out_path)
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    compiled, report = compile_with_parity(model, backend, x, tol)
+    fp32_path = out_path.with_suffix(".fp32.tmp")
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", category=FutureWarning)
+        torch.jit.save(compiled, str(out_path))
+        torch.jit.save(compile_model(copy.deepcopy(model), "script"), str(fp32_path))
+    report.update(
+        {
+            "backend": backend,
+            "path": str(out_path),
+            "size_bytes": out_path.stat().st_size,
+            "fp32_size_bytes": fp32_path.stat().st_size,
+            "latency_fp32_s": time_forward(model, x),
+            "latency_s": time_forward(compiled, x),
+            "windows": int(x.shape[0]),
+        }
+    )
+    fp32_path.unlink()
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export LSTM / hybrid predictors to TorchScript (optionally int8)")
+    parser.add_argument("artifacts", nargs="+", type=Path, help="hybrid_*/models/*.pt or lstm_*/models/base_model_*.pt")
+    parser.add_argument("--backend", choices=["script", "int8"], default="int8")
+    parser.add_argument("--windows", type=Path, default=None, help=".npy (n, seq_len, features) scaled windows for the parity check")
+    parser.add_argument("--tol", type=float, default=PARITY_TOL)
+    parser.add_argument("--out-dir", type=Path, default=None, help="default: next to each artifact")
+    args = parser.parse_args()
+
+    reports = []
+    for path in args.artifacts:
+        artifact = torch.load(path, map_location="cpu", weights_only=True)
+        model, seq_length = model_from_artifact(artifact)
+        input_dim = artifact["model_config"]["input_dim"]
+        if args.windows is not None:
+            x = torch.FloatTensor(np.load(args.windows))
+        else:
+            x = example_windows(PARITY_WINDOWS, seq_length, input_dim)
+        out_dir = args.out_dir or path.parent
+        out_path = out_dir / f"{path.stem}.{args.backend}.ts"
+        report = export_model(model, out_path, x, backend=args.backend, tol=args.tol)
+        report["source"] = str(path)
+        reports.append(report)
+        print(
+            f"{path.name} -> {out_path.name}: max_abs_err={report['max_abs_err']:.4g}, "
+            f"size {report['fp32_size_bytes']} -> {report['size_bytes']} bytes, "
+            f"latency {report['latency_fp32_s'] * 1000:.1f} -> {report['latency_s'] * 1000:.1f} ms"
+        )
+    print(json.dumps(reports, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,293 @@
+"""
+Memory-mapped training datasets shared by the LSTM / Hybrid worker processes.
+
+An export holds one scaled daily dataset as plain .npy files under analysis/LSTM/cache/shared/:
+
+    X.npy               (rows, features) float64 scaled feature matrix
+    y.npy               (rows, targets) float64 scaled target column(s)
+    starts_<split>.npy  int64 window start rows per split ("train", "all", ...)
+    meta.json           key (seq_length, target_offset, horizon, split sizes) and caller metadata
+
+Window s covers X[s : s + seq_length] and predicts y[s + target_offset : s + target_offset + horizon, 0].
+The export directory is named by a hash of the key (by default the hash of the scaled arrays
+and window starts), so an unchanged dataset is written once and every later process, including
+separate HPO workers sharing a trial store, reuses it.
+
+`open_dataset` memory-maps the arrays: workers share one page-cached copy and start without
+parsing a CSV or rescaling. The maps are copy-on-write (mmap_mode="c") rather than read-only,
+because torch refuses to wrap non-writable arrays without a warning; pages stay shared unless a
+process writes to them, and writes never reach the files. Windows over contiguous starts are
+strided views (no copy); other start sets (block windows) come back as `GatheredWindows`, which
+indexes the same view and copies only the windows asked for.
+
+The trainers feed windows through `window_loader`, which gathers and converts one batch at a
+time. A process therefore never holds a dense (windows, seq_length, features) tensor, which would
+be seq_length times the size of the shared matrix.
+
+    path = export_dataset("lstm_mmf/full_period/b", X, y, {"train": starts}, seq_length=30, target_offset=34)
+    x_train, y_train = open_dataset(path).windows("train")
+    loader = window_loader(x_train, y_train, batch_size=32, shuffle=True)
+
+    python analysis/LSTM/shared_dataset.py            # list exports
+    python analysis/LSTM/shared_dataset.py --clear
+"""
+import argparse
+import hashlib
+import json
+import os
+import shutil
+from functools import lru_cache
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import torch
+from numpy.lib.stride_tricks import sliding_window_view
+from torch.utils.data import BatchSampler, DataLoader, Dataset, RandomSampler, SequentialSampler
+
+
+BASE_DIR = Path("/Applications/dollar_price")
+SHARED_DIR = BASE_DIR / "analysis" / "LSTM" / "cache" / "shared"
+META_FILE = "meta.json"
+
+
+def array_hash(*arrays) -> str:
+    h = hashlib.sha256()
+    for values in arrays:
+        values = np.asarray(values)
+        if values.dtype.kind == "M":
+            values = values.astype("datetime64[ns]").view(np.int64)
+        h.update(np.ascontiguousarray(values, dtype=np.float64 if values.dtype.kind == "f" else values.dtype).tobytes())
+    return h.hexdigest()
+
+
+def _export_path(name: str, key: dict) -> Path:
+    digest = hashlib.sha256(json.dumps(key, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+    return SHARED_DIR / f"{name.replace('/', '__')}-{digest}"
+
+
+def _read_meta(path: Path) -> dict | None:
+    meta_path = Path(path) / META_FILE
+    if not meta_path.exists():
+        return None
+    return json.loads(meta_path.read_text(encoding="utf-8"))
+
+
+def export_dataset(
+    name: str,
+    X: np.ndarray,
+    y: np.ndarray,
+    splits: dict,
+    seq_length: int,
+    target_offset: int,
+    horizon: int = 1,
+    key: dict | None = None,
+    meta: dict | None = None,
+) -> Path:
+    """Write X / y / window starts as .npy (skipped when an export with the same key exists).
+
+    `key` identifies the source data and preprocessing; by default it is the hash of the arrays
+    themselves. `meta` is stored alongside for reference (e.g. features, period bounds).
+    """
+    X = np.ascontiguousarray(X, dtype=np.float64)
+    y = np.ascontiguousarray(np.asarray(y, dtype=np.float64).reshape(len(X), -1))
+    splits = {split: np.ascontiguousarray(starts, dtype=np.int64) for split, starts in splits.items()}
+    key = {
+        "name": name,
+        "data": key if key is not None else array_hash(X, y, *splits.values()),
+        "seq_length": int(seq_length),
+        "target_offset": int(target_offset),
+        "horizon": int(horizon),
+        "splits": {split: int(len(starts)) for split, starts in splits.items()},
+    }
+    path = _export_path(name, key)
+    existing = _read_meta(path)
+    if existing is not None and existing["key"] == key:
+        return path
+    if path.exists():
+        # Incomplete or written by an older layout.
+        shutil.rmtree(path, ignore_errors=True)
+
+    for split, starts in splits.items():
+        if len(starts) and (starts.min() < 0 or starts.max() + max(seq_length, target_offset + horizon) > len(X)):
+            raise ValueError(f"{name}: '{split}' windows run past the {len(X)} exported rows")
+
+    SHARED_DIR.mkdir(parents=True, exist_ok=True)
+    tmp_dir = path.with_name(f".tmp-{path.name}-{os.getpid()}")
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    tmp_dir.mkdir()
+    np.save(tmp_dir / "X.npy", X)
+    np.save(tmp_dir / "y.npy", y)
+    for split, starts in splits.items():
+        np.save(tmp_dir / f"starts_{split}.npy", starts)
+    info = {**(meta or {}), "key": key, "rows": int(len(X)), "n_features": int(X.shape[1]), "n_targets": int(y.shape[1])}
+    (tmp_dir / META_FILE).write_text(json.dumps(info, indent=2, ensure_ascii=False), encoding="utf-8")
+
+    try:
+        os.replace(tmp_dir, path)
+    except OSError:
+        # Another process finished the same export first; its copy is identical.
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+    return path
+
+
+class SharedDataset:
+    """One export; arrays are memory-mapped (copy-on-write), not loaded."""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.meta = _read_meta(self.path)
+        if self.meta is None:
+            raise FileNotFoundError(f"No shared dataset export at {self.path}")
+        key = self.meta["key"]
+        self.seq_length = key["seq_length"]
+        self.target_offset = key["target_offset"]
+        self.horizon = key["horizon"]
+        self.X = np.load(self.path / "X.npy", mmap_mode="c")
+        self.y = np.load(self.path / "y.npy", mmap_mode="c")
+        self.splits = {split: np.load(self.path / f"starts_{split}.npy", mmap_mode="c") for split in key["splits"]}
+
+    def windows(self, split: str = "train"):
+        """(x, y) for every window of `split`: x (n, seq_length, features), y (n, horizon)."""
+        starts = np.asarray(self.splits[split])
+        if len(starts) == 0:
+            return np.empty((0, self.seq_length, self.X.shape[1])), np.empty((0, self.horizon))
+        # (rows - seq_length + 1, seq_length, features) view over the mapped matrix; flagged
+        # writeable only so torch accepts it (the trainers never write their inputs).
+        view = sliding_window_view(self.X, self.seq_length, axis=0, writeable=True).transpose(0, 2, 1)
+        if starts[-1] - starts[0] + 1 == len(starts) and np.all(np.diff(starts) == 1):
+            xs = view[starts[0] : starts[-1] + 1]
+        else:
+            xs = GatheredWindows(view, starts)
+        ys = self.y[starts[:, None] + self.target_offset + np.arange(self.horizon)[None, :], 0]
+        return xs, ys
+
+
+class GatheredWindows:
+    """Windows at non-contiguous starts (e.g. block windows) over a strided view, not yet copied.
+
+    Slicing returns another GatheredWindows; an index array (what `WindowDataset` passes per batch)
+    returns just those windows as an array. np.asarray(...) gathers all of them.
+    """
+
+    def __init__(self, view: np.ndarray, starts: np.ndarray):
+        self.view = view
+        self.starts = starts
+
+    @property
+    def shape(self):
+        return (len(self.starts),) + self.view.shape[1:]
+
+    @property
+    def dtype(self):
+        return self.view.dtype
+
+    def __len__(self):
+        return len(self.starts)
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            return GatheredWindows(self.view, self.starts[key])
+        return self.view[self.starts[key]]
+
+    def __array__(self, dtype=None, copy=None):
+        return np.asarray(self.view[self.starts], dtype=dtype)
+
+
+def window_hash(x, y, chunk: int = 1024) -> str:
+    """arima_cache.dataset_hash(np.concatenate([x.ravel(), y.ravel()])) computed chunk by chunk.
+
+    Gives the same key as hashing the flattened windows without building them all at once.
+    """
+    h = hashlib.sha256()
+    for i in range(0, len(x), chunk):
+        h.update(np.ascontiguousarray(x[i : i + chunk], dtype=np.float64).tobytes())
+    h.update(np.ascontiguousarray(y, dtype=np.float64).tobytes())
+    return h.hexdigest()
+
+
+class WindowDataset(Dataset):
+    """(x, y) window arrays (e.g. strided views over a mapped export) indexed a batch at a time.
+
+    __getitem__ takes a list of window indices and returns float32 tensors for just those windows,
+    so memory use is one batch rather than every window.
+    """
+
+    def __init__(self, x, y):
+        self.x = x
+        self.y = y
+
+    def __len__(self):
+        return len(self.x)
+
+    def __getitem__(self, idx):
+        idx = np.asarray(idx)
+        return (
+            torch.from_numpy(np.asarray(self.x[idx], dtype=np.float32)),
+            torch.from_numpy(np.asarray(self.y[idx], dtype=np.float32)),
+        )
+
+
+def window_loader(x, y, batch_size: int, shuffle: bool = False) -> DataLoader:
+    """DataLoader over window arrays that builds each batch on demand.
+
+    Draws the same batches as DataLoader(TensorDataset(FloatTensor(x), FloatTensor(y)), batch_size,
+    shuffle) from the same torch seed, without the up-front copy of every window.
+    """
+    dataset = WindowDataset(x, y)
+    sampler = RandomSampler(dataset) if shuffle else SequentialSampler(dataset)
+    return DataLoader(dataset, sampler=BatchSampler(sampler, batch_size, drop_last=False), batch_size=None)
+
+
+@lru_cache(maxsize=32)
+def _open(path: str) -> SharedDataset:
+    return SharedDataset(Path(path))
+
+
+def open_dataset(path) -> SharedDataset:
+    """Open an export once per process (workers reuse the same mappings across jobs)."""
+    return _open(str(path))
+
+
+def train_on_shared(fn, dataset, split: str = "train", **kwargs):
+    """fn(x_train, y_train, **kwargs) on the windows of an export; a picklable job for run_jobs.
+
+    Jobs carry only the export path, so worker processes map the data instead of receiving a
+    pickled copy of the windows.
+    """
+    x, y = open_dataset(dataset).windows(split)
+    return fn(x, y, **kwargs)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="List or clear the memory-mapped training dataset exports")
+    parser.add_argument("--clear", action="store_true", help=f"delete every export under {SHARED_DIR}")
+    args = parser.parse_args()
+
+    exports = sorted(p for p in SHARED_DIR.glob("*") if p.is_dir() and not p.name.startswith(".")) if SHARED_DIR.exists() else []
+    if args.clear:
+        shutil.rmtree(SHARED_DIR, ignore_errors=True)
+        print(f"Removed {len(exports)} export(s) from {SHARED_DIR}")
+        return
+    rows = []
+    for path in exports:
+        meta = _read_meta(path) or {"key": {}}
+        size = sum(f.stat().st_size for f in path.glob("*.npy"))
+        rows.append(
+            {
+                "export": path.name,
+                "rows": meta.get("rows"),
+                "features": meta.get("n_features"),
+                "windows": ", ".join(f"{k}={v}" for k, v in meta["key"].get("splits", {}).items()),
+                "MB": round(size / 2**20, 2),
+                "modified": pd.Timestamp(path.stat().st_mtime, unit="s").strftime("%Y-%m-%d %H:%M"),
+            }
+        )
+    if not rows:
+        print(f"No exports under {SHARED_DIR}")
+        return
+    print(pd.DataFrame(rows).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
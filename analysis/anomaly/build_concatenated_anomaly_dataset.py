@@ -1,17 +1,19 @@
 import json
+import sys
 from pathlib import Path
 
 import pandas as pd
 
+sys.path.append("/Applications/dollar_price")
+from data.process_scripts.series_lake import load_series
+
 BASE_DIR = Path("/Applications/dollar_price")
-DATA_PATH = BASE_DIR / "data" / "processed_daily_1995_2026_integrated.csv"
 PERIOD_PATH = BASE_DIR / "analysis" / "anomaly" / "period_definition.json"
 OUT_PATH = BASE_DIR / "analysis" / "anomaly" / "anomaly_concatenated_dataset.csv"
 
 
 def main() -> None:
-    df = pd.read_csv(DATA_PATH)
-    df["date"] = pd.to_datetime(df["date"], errors="coerce")
+    df = load_series("processed_daily_integrated").reset_index()
     df = df.dropna(subset=["date"]).sort_values("date").reset_index(drop=True)
 
     with open(PERIOD_PATH, "r", encoding="utf-8") as f:
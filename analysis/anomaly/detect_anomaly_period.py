@@ -1,10 +1,13 @@
 import json
+import sys
 from pathlib import Path
 
 import pandas as pd
 
+sys.path.append("/Applications/dollar_price")
+from data.process_scripts.series_lake import load_series
+
 BASE_DIR = Path("/Applications/dollar_price")
-INPUT_PATH = BASE_DIR / "data" / "processed_daily_1995_2026_integrated.csv"
 OUTPUT_PATH = BASE_DIR / "analysis" / "anomaly" / "period_definition.json"
 
 ROLLING_WINDOW = 30
@@ -36,8 +39,7 @@ def _find_contiguous_blocks(flag_df: pd.DataFrame) -> list[dict]:
 
 
 def main() -> None:
-    df = pd.read_csv(INPUT_PATH)
-    df["date"] = pd.to_datetime(df["date"], errors="coerce")
+    df = load_series("processed_daily_integrated").reset_index()
     df = df.dropna(subset=["date", "FX_rate", "policy_spread"]).sort_values("date").reset_index(drop=True)
 
     df["rolling_corr"] = df["FX_rate"].rolling(ROLLING_WINDOW).corr(df["policy_spread"])
@@ -3,9 +3,12 @@ import numpy as np
 import matplotlib.pyplot as plt
 import seaborn as sns
 from sklearn.ensemble import RandomForestRegressor
-from functools import reduce
 from matplotlib import font_manager, rc
 import platform
+import sys
+
+sys.path.append("/Applications/dollar_price")
+from data.process_scripts.series_catalog import MACRO_PANEL, load_panel
 
 # 운영체제에 따른 한글 폰트 설정
 if platform.system() == 'Darwin': # Mac 환경
@@ -15,42 +18,8 @@ elif platform.system() == 'Windows':
 plt.rcParams['axes.unicode_minus'] = False
 
 def load_data():
-    base_path = '/Applications/dollar_price'
-    files = {
-        'USD_KRW': 'exchange_rate/exchange_rate_processed.csv',
-        'SPREAD_POLICY': 'policy_rate/spread_KOR_USA_processed.csv',
-        'BOND_KOR': '10y_bond/KOR/10y_bond_KOR_processed.csv',
-        'BOND_USA': '10y_bond/USA/GS10.csv',
-        'M2_KOR': 'm2/KOR/M2_KOR_processed.csv',
-        'M2_USA': 'm2/USA/M2SL.csv',
-        'CPI_KOR': 'CPI/KOR/CPI_KOR_processed.csv',
-        'CPI_USA': 'CPI/USA/CPIAUCSL.csv',
-        'IPI_KOR': 'production_index/KOR/IPI_KOR_processed.csv',
-        'IPI_USA': 'production_index/USA/INDPRO.csv',
-        'THEORETICAL_FWD': 'exchange_rate/theoretical_fwd_rate_processed.csv'
-    }
-
-    dfs = []
-    for name, path in files.items():
-        try:
-            full_path = f"{base_path}/{path}"
-            df = pd.read_csv(full_path)
-            
-            # 날짜 컬럼 형식 통일
-            if 'observation_date' in df.columns:
-                df['observation_date'] = pd.to_datetime(df['observation_date'])
-            
-            # 값 컬럼 이름 변경 (날짜 제외)
-            val_col = [c for c in df.columns if c != 'observation_date'][0]
-            df = df.rename(columns={val_col: name})
-            
-            dfs.append(df[['observation_date', name]])
-        except Exception as e:
-            print(f"Warning: Failed to load {path} - {e}")
-
-    # 데이터 병합 (Inner Join)
-    df_merged = reduce(lambda left, right: pd.merge(left, right, on='observation_date', how='inner'), dfs)
-    return df_merged.sort_values('observation_date')
+    # 공통 series catalog에서 로드 (Inner Join, 프로세스/세션 내 캐시)
+    return load_panel(MACRO_PANEL + ("THEORETICAL_FWD",))
 
 def analyze(df):
     # 1. 파생 변수 생성: 시장 금리차 (10년물 국채 스프레드)
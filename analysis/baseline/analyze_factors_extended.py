@@ -1,4 +1,5 @@
 import json
+import sys
 from pathlib import Path
 
 import numpy as np
@@ -7,8 +8,10 @@ from sklearn.ensemble import RandomForestRegressor
 from sklearn.linear_model import LinearRegression
 from sklearn.metrics import r2_score
 
+sys.path.append("/Applications/dollar_price")
+from data.process_scripts.series_lake import load_series
+
 BASE_DIR = Path("/Applications/dollar_price")
-DATA_PATH = BASE_DIR / "data" / "processed_daily_1995_2026_integrated.csv"
 PERIOD_PATH = BASE_DIR / "analysis" / "anomaly" / "period_definition.json"
 OUT_DIR = BASE_DIR / "analysis" / "baseline" / "extended_results"
 
@@ -75,8 +78,7 @@ def fit_period(df_period: pd.DataFrame, name: str) -> dict:
 
 
 def main() -> None:
-    df = pd.read_csv(DATA_PATH)
-    df["date"] = pd.to_datetime(df["date"], errors="coerce")
+    df = load_series("processed_daily_integrated").reset_index()
 
     with open(PERIOD_PATH, "r", encoding="utf-8") as f:
         period_info = json.load(f)
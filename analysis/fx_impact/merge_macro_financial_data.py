@@ -1,5 +1,9 @@
 import pandas as pd
 import os
+import sys
+
+sys.path.append("/Applications/dollar_price")
+from data.process_scripts.series_lake import write_series
 
 def main():
     # Set base directory relative to the script
@@ -26,6 +30,7 @@ def main():
 
     output_path = os.path.join(base_dir, 'data/integrated_macro_targets.csv')
     integrated_df.to_csv(output_path, index=False)
+    write_series('integrated_macro_targets', integrated_df, date_col='Date', source=output_path)
     print(f"Data merged successfully. Output saved to {output_path}")
     print(f"Integrated dataset shape: {integrated_df.shape}")
 
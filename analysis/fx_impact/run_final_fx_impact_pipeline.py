@@ -3,6 +3,8 @@ from __future__ import annotations
 import argparse
 import json
 import math
+import re
+import sys
 import warnings
 from dataclasses import dataclass
 from pathlib import Path
@@ -28,6 +30,10 @@ from statsmodels.tsa.api import VAR
 from statsmodels.tsa.stattools import grangercausalitytests
 from statsmodels.tsa.statespace.sarimax import SARIMAX
 
+sys.path.append("/Applications/dollar_price")
+from data.process_scripts.series_lake import load_series
+from data.process_scripts.vintage_store import point_in_time_panel
+
 
 warnings.filterwarnings("ignore")
 
@@ -38,6 +44,8 @@ MIN_TARGET_OBS = 48
 FINAL_TARGET_LIMIT = 8
 LP_HORIZONS = tuple(range(1, 7))
 LP_TEST_FRACTION = 0.25
+# MC-dropout interval columns written by analysis/LSTM/Hybrid/hybrid_service.py --mc-samples.
+SHOCK_BAND_COLUMNS = {"scenario_lower": "pred_fx_lower", "scenario_upper": "pred_fx_upper"}
 
 SCRIPT_PATH = Path(__file__).resolve()
 FX_IMPACT_DIR = SCRIPT_PATH.parent
@@ -117,15 +125,53 @@ def safe_filename(name: str) -> str:
     return "".join(ch if ch.isalnum() or ch in "._-" else "_" for ch in name)
 
 
-def load_macro_dataset(path: Path = MACRO_PATH) -> pd.DataFrame:
-    df = pd.read_csv(path)
+def load_macro_dataset(path: Path = MACRO_PATH, point_in_time: bool = False) -> pd.DataFrame:
+    # The default panel comes from the Parquet lake (typed, dates already parsed); --macro-path overrides read CSV.
+    df = load_series("integrated_macro_targets").reset_index() if path == MACRO_PATH else pd.read_csv(path)
     if "Date" not in df.columns:
         raise ValueError(f"{path} does not contain Date column")
     df["Date"] = pd.to_datetime(df["Date"]) + pd.offsets.MonthEnd(0)
     df = df.sort_values("Date").drop_duplicates("Date").reset_index(drop=True)
+    if point_in_time:
+        df = to_point_in_time(df)
     return df
 
 
+def to_point_in_time(df: pd.DataFrame) -> pd.DataFrame:
+    """Regressor columns as known at each month end (vintage store release lags).
+
+    The targets (THEORY_TARGETS) and USD_KRW stay on their observation month: the models explain the
+    month's outcome, only the inputs have to be the values published by then. The `_MoM` / `_YoY` / `_lag`
+    columns of each release-lagged series are recomputed from its point-in-time levels, so they carry the
+    same lag instead of reintroducing the unpublished data.
+    """
+    regressors = [c for c in df.columns if c not in THEORY_TARGETS | EXCLUDED_LEVEL_COLUMNS and not is_derived_column(c)]
+    pit = point_in_time_panel(df[["Date"] + regressors], "Date", "macro")
+    replaced = [c for c in regressors if not pit[c].equals(df[c])]
+    out = df.copy()
+    out[replaced] = pit[replaced]
+    derived = [c for c in df.columns if is_derived_column(c) and derived_base(c) in replaced]
+    for column in derived:
+        out[column] = derive_column(out[derived_base(column)], column)
+    print(f"Point-in-time panel: {len(replaced)} release-lagged regressors, {len(derived)} derived columns recomputed")
+    return out
+
+
+def derived_base(column: str) -> str:
+    return re.sub(r"_(MoM|YoY)(_lag\d+)?$", "", column)
+
+
+def derive_column(level: pd.Series, column: str) -> pd.Series:
+    """`<base>_MoM` / `_YoY` (difference for rate-like series, else pct change) and their `_lagk` shifts."""
+    match = re.search(r"_(MoM|YoY)(?:_lag(\d+))?$", column)
+    periods = 1 if match.group(1) == "MoM" else 12
+    if any(keyword in column for keyword in DIFF_KEYWORDS):
+        change = level.diff(periods)
+    else:
+        change = level.pct_change(periods, fill_method=None)
+    return change.shift(int(match.group(2) or 0))
+
+
 def load_period_definition(path: Path = PERIOD_DEF_PATH) -> dict[str, Any]:
     with path.open("r", encoding="utf-8") as f:
         return json.load(f)
@@ -978,6 +1024,7 @@ def build_fx_level_path(
     scenario_shock_pct: float = 0.05,
     scenario_start: pd.Timestamp | None = None,
     custom_shock_path: Path | None = None,
+    custom_value_col: str | None = None,
 ) -> pd.Series:
     dates = pd.to_datetime(macro_df["Date"])
     actual = macro_df.set_index("Date")["USD_KRW"].copy()
@@ -993,7 +1040,7 @@ def build_fx_level_path(
     if custom_shock_path is not None and custom_shock_path.exists():
         custom = pd.read_csv(custom_shock_path)
         date_col = "date" if "date" in custom.columns else "Date"
-        value_col = "fx" if "fx" in custom.columns else "pred_fx" if "pred_fx" in custom.columns else "USD_KRW"
+        value_col = custom_value_col or ("fx" if "fx" in custom.columns else "pred_fx" if "pred_fx" in custom.columns else "USD_KRW")
         custom[date_col] = pd.to_datetime(custom[date_col]) + pd.offsets.MonthEnd(0)
         custom_monthly = custom.set_index(date_col)[value_col].resample("ME").mean()
         custom_monthly.index = custom_monthly.index + pd.offsets.MonthEnd(0)
@@ -1322,9 +1369,17 @@ def run_varx_model(
     return records
 
 
-def build_scenario_forecasts(forecast_df: pd.DataFrame) -> pd.DataFrame:
+def custom_shock_bands(custom_shock_path: Path | None) -> dict[str, str]:
+    """FX modes for the interval columns present in a --shock-path CSV (empty for point paths)."""
+    if custom_shock_path is None or not custom_shock_path.exists():
+        return {}
+    columns = pd.read_csv(custom_shock_path, nrows=0).columns
+    return {mode: col for mode, col in SHOCK_BAND_COLUMNS.items() if col in columns}
+
+
+def build_scenario_forecasts(forecast_df: pd.DataFrame, scenario_mode: str = "scenario") -> pd.DataFrame:
     baseline = forecast_df[forecast_df["fx_mode"].eq("predicted")].copy()
-    scenario = forecast_df[forecast_df["fx_mode"].eq("scenario")].copy()
+    scenario = forecast_df[forecast_df["fx_mode"].eq(scenario_mode)].copy()
     if baseline.empty or scenario.empty:
         return pd.DataFrame()
     key_cols = ["date", "horizon", "target", "model", "transform", "unit_label"]
@@ -1360,6 +1415,27 @@ def build_scenario_forecasts(forecast_df: pd.DataFrame) -> pd.DataFrame:
     ]
 
 
+def build_scenario_interval_forecasts(
+    forecast_df: pd.DataFrame, scenario_df: pd.DataFrame, band_modes: list[str]
+) -> pd.DataFrame:
+    """Point scenario impact with the impact under each FX interval bound alongside."""
+    key_cols = ["date", "horizon", "target", "model", "transform", "unit_label"]
+    out = scenario_df.copy()
+    for mode in band_modes:
+        band = build_scenario_forecasts(forecast_df, scenario_mode=mode)
+        if band.empty:
+            continue
+        suffix = mode.removeprefix("scenario_")
+        band = band[key_cols + ["forecast_level_scenario", "impact_level_delta"]].rename(
+            columns={
+                "forecast_level_scenario": f"forecast_level_{suffix}",
+                "impact_level_delta": f"impact_level_delta_{suffix}",
+            }
+        )
+        out = out.merge(band, on=key_cols, how="left")
+    return out
+
+
 def build_lag_effect_summary(
     ranking: pd.DataFrame,
     selected_targets: list[str],
@@ -2495,6 +2571,16 @@ def run_final_impact_models(
             custom_shock_path=custom_shock_path,
         ),
     }
+    # Interval bounds from an MC-dropout shock file run through the same models as extra FX modes.
+    shock_bands = custom_shock_bands(custom_shock_path)
+    for mode, value_col in shock_bands.items():
+        fx_paths[mode] = build_fx_level_path(
+            macro_df,
+            selected_predictions,
+            "scenario",
+            custom_shock_path=custom_shock_path,
+            custom_value_col=value_col,
+        )
 
     records = []
     records.extend(run_arimax_models(macro_df, selected_targets, lag_map, fx_paths, test_obs=test_obs))
@@ -2512,6 +2598,10 @@ def run_final_impact_models(
 
     scenario_df = build_scenario_forecasts(forecast_df)
     scenario_df.to_csv(FINAL_REPORT_DIR / "scenario_forecasts.csv", index=False)
+    if shock_bands and not scenario_df.empty:
+        build_scenario_interval_forecasts(forecast_df, scenario_df, list(shock_bands)).to_csv(
+            FINAL_REPORT_DIR / "scenario_interval_forecasts.csv", index=False
+        )
 
     lag_summary = build_lag_effect_summary(ranking, selected_targets, scenario_df)
     lag_summary.to_csv(FINAL_REPORT_DIR / "lag_effect_summary.csv", index=False)
@@ -2876,15 +2966,25 @@ def parse_args() -> argparse.Namespace:
     parser.add_argument("--macro-path", type=Path, default=MACRO_PATH)
     parser.add_argument("--period-definition", type=Path, default=PERIOD_DEF_PATH)
     parser.add_argument("--scenario-shock-pct", type=float, default=0.05)
-    parser.add_argument("--shock-path", type=Path, default=None, help="Optional CSV with date and fx/pred_fx/USD_KRW columns.")
+    parser.add_argument(
+        "--shock-path",
+        type=Path,
+        default=None,
+        help="Optional CSV with date and fx/pred_fx/USD_KRW columns; pred_fx_lower/pred_fx_upper interval columns add band scenarios.",
+    )
     parser.add_argument("--test-obs", type=int, default=TEST_OBS)
+    parser.add_argument(
+        "--point-in-time",
+        action="store_true",
+        help="Use macro values as known at each month end (release-lagged via the vintage store) instead of by observation month.",
+    )
     return parser.parse_args()
 
 
 def main() -> None:
     args = parse_args()
     ensure_dirs()
-    macro_df = load_macro_dataset(args.macro_path)
+    macro_df = load_macro_dataset(args.macro_path, point_in_time=args.point_in_time)
     _ = load_period_definition(args.period_definition)
 
     print("[1/4] Selecting FX-sensitive macro/financial targets...")
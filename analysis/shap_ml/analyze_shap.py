@@ -4,11 +4,14 @@ import matplotlib.pyplot as plt
 import shap
 import seaborn as sns
 from sklearn.ensemble import RandomForestRegressor
-from functools import reduce
 from matplotlib import font_manager, rc
 import platform
 import json
 from pathlib import Path
+import sys
+
+sys.path.append("/Applications/dollar_price")
+from data.process_scripts.series_catalog import MACRO_PANEL, load_panel
 
 # 운영체제에 따른 한글 폰트 설정
 if platform.system() == 'Darwin': # Mac 환경
@@ -18,45 +21,14 @@ elif platform.system() == 'Windows':
 plt.rcParams['axes.unicode_minus'] = False
 
 def load_data():
-    base_path = '/Applications/dollar_price'
-    files = {
-        'USD_KRW': 'data/exchange_rate/exchange_rate_processed.csv',
-        'SPREAD_POLICY': 'data/policy_rate/spread_KOR_USA_processed.csv',
-        'BOND_KOR': 'data/10y_bond/KOR/10y_bond_KOR_processed.csv',
-        'BOND_USA': 'data/10y_bond/USA/GS10.csv',
-        'M2_KOR': 'data/m2/KOR/M2_KOR_processed.csv',
-        'M2_USA': 'data/m2/USA/M2SL.csv',
-        'CPI_KOR': 'data/CPI/KOR/CPI_KOR_processed.csv',
-        'CPI_USA': 'data/CPI/USA/CPIAUCSL.csv',
-        'IPI_KOR': 'data/production_index/KOR/IPI_KOR_processed.csv',
-        'IPI_USA': 'data/production_index/USA/INDPRO.csv'
-    }
-
-    dfs = []
-    for name, path in files.items():
-        try:
-            full_path = f"{base_path}/{path}"
-            df = pd.read_csv(full_path)
-            
-            if 'observation_date' not in df.columns:
-                continue
-            df['observation_date'] = pd.to_datetime(df['observation_date'])
-            
-            val_col = [c for c in df.columns if c != 'observation_date'][0]
-            df = df.rename(columns={val_col: name})
-            
-            dfs.append(df[['observation_date', name]])
-        except Exception as e:
-            print(f"Warning: Failed to load {path} - {e}")
-
-    # 데이터 병합 (Inner Join)
-    df_merged = reduce(lambda left, right: pd.merge(left, right, on='observation_date', how='inner'), dfs)
+    # 공통 series catalog에서 로드 (Inner Join, 프로세스/세션 내 캐시)
+    df_merged = load_panel(MACRO_PANEL)
 
     # 10Y Spread 계산
     if 'BOND_KOR' in df_merged.columns and 'BOND_USA' in df_merged.columns:
         df_merged['SPREAD_10Y'] = df_merged['BOND_KOR'] - df_merged['BOND_USA']
 
-    return df_merged.sort_values('observation_date')
+    return df_merged
 
 def analyze_shap_drivers(df):
     target_col = 'USD_KRW'
@@ -1,4 +1,5 @@
 import json
+import sys
 from pathlib import Path
 
 import matplotlib.pyplot as plt
@@ -7,8 +8,10 @@ import pandas as pd
 import shap
 from sklearn.ensemble import RandomForestRegressor
 
+sys.path.append("/Applications/dollar_price")
+from data.process_scripts.series_lake import load_series
+
 BASE_DIR = Path("/Applications/dollar_price")
-DATA_PATH = BASE_DIR / "data" / "processed_daily_1995_2026_integrated.csv"
 PERIOD_PATH = BASE_DIR / "analysis" / "anomaly" / "period_definition.json"
 
 FEATURES = ["policy_spread", "M2_KOR", "M2_USA"]
@@ -70,8 +73,7 @@ def _run_one_period(df: pd.DataFrame, period_name: str, out_dir: Path) -> None:
 
 
 def main() -> None:
-    df = pd.read_csv(DATA_PATH)
-    df["date"] = pd.to_datetime(df["date"], errors="coerce")
+    df = load_series("processed_daily_integrated").reset_index()
 
     with open(PERIOD_PATH, "r", encoding="utf-8") as f:
         period_info = json.load(f)
@@ -1,102 +1,106 @@
+import argparse
 import os
+import sys
 import pandas as pd
-import requests
 from dotenv import load_dotenv
 from datetime import datetime
 
+sys.path.append("/Applications/dollar_price")
+from data.process_scripts.ecos_client import EcosClient, EcosError, SeriesRequest, parse_time
+from data.process_scripts.incremental import delta_start, describe_delta, ecos_period, load_stored, upsert, watermarks
+
 # .env 파일에서 API 키 로드
 load_dotenv()
 API_KEY = os.getenv("ECOS_API_KEY")
 
-def fetch_ecos_data(stat_code, start_date, end_date, cycle, item_code1, item_code2=None, item_code3=None):
+def _to_frame(rows, request):
+    """ECOS row 목록을 Date / DATA_VALUE 데이터프레임으로 변환합니다 (데이터가 없으면 None)."""
+    if isinstance(rows, EcosError):
+        print(f"ECOS Error for {request.stat_code}/{request.items[0]}: {rows}")
+        return None
+    if not rows:
+        print(f"No data for {request.stat_code}/{request.items[0]}")
+        return None
+    df = pd.DataFrame(rows)[['TIME', 'DATA_VALUE']]
+    # TIME 형식 변환 (D/M 외 주기는 그대로 유지)
+    df['Date'] = parse_time(df['TIME'], request.cycle if request.cycle in ('D', 'M') else None)
+    df['DATA_VALUE'] = pd.to_numeric(df['DATA_VALUE'])
+    return df[['Date', 'DATA_VALUE']]
+
+def fetch_ecos_data(stat_code, start_date, end_date, cycle, item_code1, item_code2=None, item_code3=None, client=None):
     """
     한국은행 ECOS API를 통해 통계 데이터를 가져옵니다.
     """
-    url = f"http://ecos.bok.or.kr/api/StatisticSearch/{API_KEY}/json/kr/1/50000/{stat_code}/{cycle}/{start_date}/{end_date}/{item_code1}/"
-    if item_code2:
-        url += f"{item_code2}/"
-    if item_code3:
-        url += f"{item_code3}/"
-        
+    request = SeriesRequest(stat_code, cycle, start_date, end_date, tuple(c for c in (item_code1, item_code2, item_code3) if c))
     print(f"Fetching: {stat_code} ({item_code1}) {cycle} from {start_date} to {end_date}...")
-    response = requests.get(url)
-    
-    if response.status_code == 200:
-        data = response.json()
-        if "StatisticSearch" in data:
-            rows = data["StatisticSearch"]["row"]
-            df = pd.DataFrame(rows)
-            # 필요한 컬럼만 선택 및 정제
-            df = df[['TIME', 'DATA_VALUE']]
-            # TIME 형식 변환
-            if cycle == 'D':
-                df['Date'] = pd.to_datetime(df['TIME'], format='%Y%m%d')
-            elif cycle == 'M':
-                df['Date'] = pd.to_datetime(df['TIME'], format='%Y%m')
-            else:
-                df['Date'] = df['TIME'] # Fallback
-                
-            df['DATA_VALUE'] = pd.to_numeric(df['DATA_VALUE'])
-            return df[['Date', 'DATA_VALUE']]
-        else:
-            msg = data.get('RESULT', {}).get('MESSAGE', 'Unknown error')
-            print(f"No data or API Error for {stat_code}/{item_code1}: {msg}")
-            return None
-    else:
-        print(f"HTTP Error: {response.status_code}")
-        return None
+    try:
+        rows = (client or EcosClient(API_KEY)).search(request.stat_code, cycle, start_date, end_date, *request.items)
+    except EcosError as e:
+        rows = e
+    return _to_frame(rows, request)
+
+# 출력 컬럼 -> (통계표, 요청 주기, 항목코드). KOSPI는 일간으로 받아 월평균으로 저장
+SERIES = {
+    # 1. 외국인 증권투자 (BOP) - 월간
+    'Foreign_Stock_Investment': ("301Y013", "M", ("BOPF22100000",)),
+    'Foreign_Bond_Investment': ("301Y013", "M", ("BOPF22200000",)),
+    # 2. KOSPI 주가지수 - 일간 가져와서 월평균 계산
+    'KOSPI': ("802Y001", "D", ("0001000",)),
+    # 3. 기업경기실사지수 (BSI) - 월간 (전산업 업황실적)
+    'BSI_All_Industry': ("512Y001", "M", ("AA", "99988")),
+    # 4. 소비자동향지수 (CSI) - 월간 (소비자심리지수 CCSI)
+    'CSI_CCSI': ("511Y002", "M", ("FME", "99988")),
+}
+START_DATE = "1995-01-01"
+OUTPUT_PATH = 'data/financial_indicators_monthly_1995_2026.csv'
 
 def main():
+    parser = argparse.ArgumentParser(description="Collect monthly ECOS financial indicators")
+    parser.add_argument("--incremental", action="store_true",
+                        help="fetch only periods after each series' last stored observation (plus a revision window) and upsert")
+    args = parser.parse_args()
+
     if not API_KEY:
         print("Error: ECOS_API_KEY not found in .env file.")
         return
 
-    start_date_m = "199501"
-    start_date_d = "19950101"
-    end_date_m = datetime.now().strftime("%Y%m")
-    end_date_d = datetime.now().strftime("%Y%m%d")
-    
-    results = {}
-
-    # 1. 외국인 증권투자 (BOP) - 월간
-    print("\n--- 1. 외국인 증권투자 (BOP) ---")
-    stock_df = fetch_ecos_data("301Y013", start_date_m, end_date_m, "M", "BOPF22100000")
-    bond_df = fetch_ecos_data("301Y013", start_date_m, end_date_m, "M", "BOPF22200000")
-    if stock_df is not None:
-        results['Foreign_Stock_Investment'] = stock_df.set_index('Date')['DATA_VALUE']
-    if bond_df is not None:
-        results['Foreign_Bond_Investment'] = bond_df.set_index('Date')['DATA_VALUE']
+    now = datetime.now()
+    stored = load_stored(OUTPUT_PATH, 'Date') if args.incremental else None
+    marks = watermarks(stored)
 
-    # 2. KOSPI 주가지수 - 일간 가져와서 월평균 계산
-    print("\n--- 2. KOSPI 주가지수 ---")
-    kospi_df = fetch_ecos_data("802Y001", start_date_d, end_date_d, "D", "0001000")
-    if kospi_df is not None:
-        kospi_monthly = kospi_df.set_index('Date').resample('MS')['DATA_VALUE'].mean()
-        results['KOSPI'] = kospi_monthly
+    # 모든 시리즈를 한 번에 병렬 요청 (세션 재사용, 요청 속도 제한, 응답 캐시)
+    # 저장된 값은 월 단위이므로 revision window도 월 기준으로 계산
+    series = {
+        name: SeriesRequest(stat_code, cycle, ecos_period(delta_start(marks.get(name), "M", START_DATE), cycle), ecos_period(now, cycle), items)
+        for name, (stat_code, cycle, items) in SERIES.items()
+    }
+    print(f"Fetching {len(series)} ECOS series...")
+    with EcosClient(API_KEY) as client:
+        fetched = client.fetch_many(series)
 
-    # 3. 기업경기실사지수 (BSI) - 월간 (전산업 업황실적)
-    print("\n--- 3. 기업경기실사지수 (BSI) ---")
-    bsi_df = fetch_ecos_data("512Y001", start_date_m, end_date_m, "M", "AA", "99988")
-    if bsi_df is not None:
-        results['BSI_All_Industry'] = bsi_df.set_index('Date')['DATA_VALUE']
-
-    # 4. 소비자동향지수 (CSI) - 월간 (소비자심리지수 CCSI)
-    print("\n--- 4. 소비자동향지수 (CSI) ---")
-    csi_df = fetch_ecos_data("511Y002", start_date_m, end_date_m, "M", "FME", "99988")
-    if csi_df is not None:
-        results['CSI_CCSI'] = csi_df.set_index('Date')['DATA_VALUE']
+    results = {}
+    for name, request in series.items():
+        df = _to_frame(fetched[name], request)
+        if df is None:
+            continue
+        if name == 'KOSPI':
+            results[name] = df.set_index('Date').resample('MS')['DATA_VALUE'].mean()
+        else:
+            results[name] = df.set_index('Date')['DATA_VALUE']
+        print(f"  {name}: {len(df)} rows from {request.start}")
 
     # 모든 결과 합치기
     if results:
-        final_df = pd.DataFrame(results)
-        final_df.index.name = 'Date'
+        fresh = pd.DataFrame(results)
+        fresh.index.name = 'Date'
+        final_df = upsert(stored, fresh)
+        print(describe_delta(stored, fresh, final_df))
         
         # data 폴더 생성
         os.makedirs('data', exist_ok=True)
-        output_path = 'data/financial_indicators_monthly_1995_2026.csv'
-        final_df.to_csv(output_path)
+        final_df.to_csv(OUTPUT_PATH)
         
-        print(f"\nSuccessfully saved all data to {output_path}")
+        print(f"\nSuccessfully saved all data to {OUTPUT_PATH}")
         print(f"Data range: {final_df.index.min().date()} to {final_df.index.max().date()}")
         print(f"Columns: {list(final_df.columns)}")
         print("\nLast 5 rows:")
@@ -1,43 +1,52 @@
+import argparse
 import os
+import sys
 import pandas as pd
-import requests
 from dotenv import load_dotenv
 from datetime import datetime
 
+sys.path.append("/Applications/dollar_price")
+from data.process_scripts.ecos_client import EcosClient, EcosError, SeriesRequest, parse_time
+from data.process_scripts.incremental import delta_start, describe_delta, ecos_period, load_stored, upsert, watermarks
+
 # .env 파일에서 API 키 로드
 load_dotenv()
 API_KEY = os.getenv("ECOS_API_KEY")
 
-def fetch_ecos_data(stat_code, item_code, start_date, end_date, cycle='M'):
+def _to_frame(rows, item_code, cycle='M'):
+    if isinstance(rows, EcosError):
+        print(f"API Error for {item_code}: {rows}")
+        return None
+    if not rows:
+        print(f"No data for {item_code}")
+        return None
+    df = pd.DataFrame(rows)
+    # 필요한 컬럼만 선택 및 데이터 정제
+    df = df[['TIME', 'DATA_VALUE']]
+    df.columns = ['Date', item_code]
+    df['Date'] = parse_time(df['Date'], 'M' if cycle == 'M' else 'D')
+    df[item_code] = pd.to_numeric(df[item_code])
+    return df
+
+def fetch_ecos_data(stat_code, item_code, start_date, end_date, cycle='M', client=None):
     """
     한국은행 ECOS API를 통해 통계 데이터를 가져옵니다.
     """
-    # URL Format: /StatisticSearch/Key/Type/Language/Start/End/StatCode/Cycle/StartDay/EndDay/ItemCode1/ItemCode2/ItemCode3/
-    url = f"http://ecos.bok.or.kr/api/StatisticSearch/{API_KEY}/json/kr/1/1000/{stat_code}/{cycle}/{start_date}/{end_date}/{item_code}/"
-    
     print(f"Fetching: {stat_code} ({item_code}) from {start_date} to {end_date}...")
-    response = requests.get(url)
-    
-    if response.status_code == 200:
-        data = response.json()
-        if "StatisticSearch" in data:
-            rows = data["StatisticSearch"]["row"]
-            df = pd.DataFrame(rows)
-            # 필요한 컬럼만 선택 및 데이터 정제
-            df = df[['TIME', 'DATA_VALUE']]
-            df.columns = ['Date', item_code]
-            df['Date'] = pd.to_datetime(df['Date'], format='%Y%m' if cycle == 'M' else '%Y%m%d')
-            df[item_code] = pd.to_numeric(df[item_code])
-            return df
-        else:
-            msg = data.get('RESULT', {}).get('MESSAGE', 'Unknown error')
-            print(f"No data or API Error for {item_code}: {msg}")
-            return None
-    else:
-        print(f"HTTP Error: {response.status_code}")
-        return None
+    try:
+        rows = (client or EcosClient(API_KEY)).search(stat_code, cycle, start_date, end_date, item_code)
+    except EcosError as e:
+        rows = e
+    return _to_frame(rows, item_code, cycle)
+
+OUTPUT_PATH = 'data/foreign_investment_monthly.csv'
 
 def main():
+    parser = argparse.ArgumentParser(description="Collect monthly foreign portfolio investment (BOP) from ECOS")
+    parser.add_argument("--incremental", action="store_true",
+                        help="fetch only periods after each series' last stored observation (plus a revision window) and upsert")
+    args = parser.parse_args()
+
     if not API_KEY:
         print("Error: ECOS_API_KEY not found in .env file.")
         return
@@ -57,27 +66,39 @@ def main():
     start_date = "199501"
     end_date = datetime.now().strftime("%Y%m")
     
+    stored = load_stored(OUTPUT_PATH, 'Date') if args.incremental else None
+    marks = watermarks(stored)
+    series = {
+        item_code: SeriesRequest(stat_code, 'M', ecos_period(delta_start(marks.get(col_name), 'M', pd.to_datetime(start_date, format='%Y%m')), 'M'), end_date, (item_code,))
+        for item_code, col_name in items.items()
+    }
+
+    print(f"Fetching {len(items)} items of {stat_code} up to {end_date}...")
+    with EcosClient(API_KEY) as client:
+        fetched = client.fetch_many(series)
+
     dfs = []
     for item_code, col_name in items.items():
-        df = fetch_ecos_data(stat_code, item_code, start_date, end_date)
+        df = _to_frame(fetched[item_code], item_code)
         if df is not None:
             df = df.rename(columns={item_code: col_name})
             df = df.set_index('Date')
             dfs.append(df)
             
     if dfs:
-        final_df = pd.concat(dfs, axis=1)
+        fresh = pd.concat(dfs, axis=1)
+        final_df = upsert(stored, fresh)
+        print(describe_delta(stored, fresh, final_df))
         
-        # 합계 계산 (총 증권투자)
-        final_df['Total_Foreign_Investment'] = final_df.sum(axis=1)
+        # 합계 계산 (총 증권투자) - upsert 후 구성 항목으로 다시 계산
+        final_df['Total_Foreign_Investment'] = final_df[[c for c in items.values() if c in final_df.columns]].sum(axis=1)
         
         # data 폴더 생성
         os.makedirs('data', exist_ok=True)
         
         # CSV 저장
-        output_path = 'data/foreign_investment_monthly.csv'
-        final_df.to_csv(output_path)
-        print(f"\nSuccessfully saved data to {output_path}")
+        final_df.to_csv(OUTPUT_PATH)
+        print(f"\nSuccessfully saved data to {OUTPUT_PATH}")
         print(f"Data range: {final_df.index.min().date()} to {final_df.index.max().date()}")
         print(f"Total entries: {len(final_df)}")
         print("\nFirst 5 rows:")
@@ -1,7 +1,12 @@
+import sys
 from pathlib import Path
 
 import pandas as pd
 
+sys.path.append("/Applications/dollar_price")
+from data.process_scripts.daily_align import AlignSpec, align, calendar_for
+from data.process_scripts.series_lake import write_series
+
 BASE_DIR = Path("/Applications/dollar_price")
 OUTPUT_PATH = BASE_DIR / "data" / "processed_daily_1995_2026_integrated.csv"
 
@@ -25,45 +30,18 @@ def main() -> None:
     m2_kor = _load_series(BASE_DIR / "data" / "m2" / "KOR" / "M2_KOR_processed.csv", "M2_KOR")
     m2_usa = _load_series(BASE_DIR / "data" / "m2" / "USA" / "M2SL.csv", "M2SL")
 
-    start_date = min(
-        fx["observation_date"].min(),
-        spread["observation_date"].min(),
-        m2_kor["observation_date"].min(),
-        m2_usa["observation_date"].min(),
-    )
-    end_date = max(
-        fx["observation_date"].max(),
-        spread["observation_date"].max(),
-        m2_kor["observation_date"].max(),
-        m2_usa["observation_date"].max(),
-    )
-
-    daily_index = pd.DataFrame({"date": pd.date_range(start=start_date, end=end_date, freq="D")})
-
-    merged = daily_index.merge(fx.rename(columns={"observation_date": "date", "USD_KRW": "FX_rate"}), on="date", how="left")
-    merged = merged.merge(
-        spread.rename(columns={"observation_date": "date", "RATE_SPREAD_KOR_USA": "policy_spread"}),
-        on="date",
-        how="left",
-    )
-
-    merged["FX_rate"] = merged["FX_rate"].ffill().bfill()
-    merged["policy_spread"] = merged["policy_spread"].ffill().bfill()
-
-    m2_kor_daily = m2_kor.rename(columns={"observation_date": "date"}).set_index("date").reindex(merged["date"])
-    m2_kor_daily["M2_KOR"] = m2_kor_daily["M2_KOR"].interpolate(method="linear", limit_direction="both")
-
-    m2_usa_daily = m2_usa.rename(columns={"observation_date": "date", "M2SL": "M2_USA"}).set_index("date").reindex(merged["date"])
-    m2_usa_daily["M2_USA"] = m2_usa_daily["M2_USA"].interpolate(method="linear", limit_direction="both")
-
-    merged["M2_KOR"] = m2_kor_daily["M2_KOR"].values
-    merged["M2_USA"] = m2_usa_daily["M2_USA"].values
-
-    merged = merged.dropna(subset=["FX_rate", "policy_spread", "M2_KOR", "M2_USA"])
-    merged = merged.sort_values("date").reset_index(drop=True)
+    # Daily market series carry forward (and back over the leading gap); monthly M2 is interpolated in time.
+    specs = [
+        AlignSpec.from_frame(fx, "USD_KRW", column="FX_rate", fill="ffill", extend=True),
+        AlignSpec.from_frame(spread, "RATE_SPREAD_KOR_USA", column="policy_spread", fill="ffill", extend=True),
+        AlignSpec.from_frame(m2_kor, "M2_KOR", freq="M", fill="linear", extend=True),
+        AlignSpec.from_frame(m2_usa, "M2SL", column="M2_USA", freq="M", fill="linear", extend=True),
+    ]
+    merged = align(specs, calendar_for(specs, freq="D"), date_col="date", dropna=True)
 
     OUTPUT_PATH.parent.mkdir(parents=True, exist_ok=True)
     merged.to_csv(OUTPUT_PATH, index=False)
+    write_series("processed_daily_integrated", merged, date_col="date", source=OUTPUT_PATH)
 
     print(f"Saved {OUTPUT_PATH}")
     print(f"Rows: {len(merged):,}")
@@ -0,0 +1,140 @@
+"""
+Daily calendar alignment shared by the daily dataset builders.
+
+Each input is declared once as an `AlignSpec`: a date-indexed series, its native frequency and
+a fill policy. `align(specs, calendar)` places every series on the calendar with one vectorized
+searchsorted / np.interp pass per series (no chained merges or per-series reindexing):
+
+    exact   value only on dates observed in the series (a left merge)
+    ffill   observations falling on calendar dates, carried forward (left merge + ffill)
+    asof    last observation at or before each calendar date, even if it fell off the
+            calendar (merge_asof backward); `tolerance` caps the age of the carried value
+    step    the observation of the calendar date's native period (e.g. a monthly value for
+            every day of that month)
+    linear  time-weighted linear interpolation between observations
+
+`extend=True` also fills calendar dates before the first observation with the first value
+(the old `.bfill()` / `limit_direction="both"`); for `linear` it holds the last value after
+the last observation as well.
+
+    from data.process_scripts.daily_align import AlignSpec, align, calendar_for
+    specs = [AlignSpec.from_frame(fx, "USD_KRW", fill="ffill", extend=True),
+             AlignSpec.from_frame(m2, "M2_KOR", freq="M", fill="linear", extend=True)]
+    panel = align(specs, calendar_for(specs, freq="D"))
+"""
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+
+FILL_POLICIES = ("exact", "ffill", "asof", "step", "linear")
+NS_PER_DAY = 86_400 * 10**9
+
+
+@dataclass(eq=False)
+class AlignSpec:
+    column: str  # output column name
+    data: pd.Series  # values indexed by observation date
+    freq: str = "D"  # native frequency (pandas period alias), used by the step policy
+    fill: str = "ffill"
+    extend: bool = False
+    tolerance: pd.Timedelta | None = None  # asof only
+
+    def __post_init__(self):
+        if self.fill not in FILL_POLICIES:
+            raise ValueError(f"Unknown fill policy '{self.fill}' for {self.column} (expected one of {FILL_POLICIES})")
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, value_col: str, column: str | None = None,
+                   date_col: str = "observation_date", **kwargs) -> "AlignSpec":
+        dates = df[date_col]
+        if not pd.api.types.is_datetime64_any_dtype(dates):
+            dates = pd.to_datetime(dates, errors="coerce")
+        data = pd.Series(df[value_col].to_numpy(), index=pd.DatetimeIndex(dates), name=value_col)
+        return cls(column or value_col, data, **kwargs)
+
+
+def _observations(spec: AlignSpec) -> tuple[np.ndarray, np.ndarray]:
+    """Sorted, de-duplicated (last wins) observation dates as int64 ns plus float values."""
+    data = pd.to_numeric(spec.data, errors="coerce")
+    data = data[data.notna() & data.index.notna()]
+    data = data[~data.index.duplicated(keep="last")].sort_index(kind="stable")
+    return data.index.as_unit("ns").asi8, data.to_numpy(dtype=np.float64)
+
+
+def _lookup_exact(keys: np.ndarray, values: np.ndarray, targets: np.ndarray) -> np.ndarray:
+    out = np.full(len(targets), np.nan)
+    pos = np.searchsorted(keys, targets)
+    hit = pos < len(keys)
+    hit[hit] = keys[pos[hit]] == targets[hit]
+    out[hit] = values[pos[hit]]
+    return out
+
+
+def _align_one(spec: AlignSpec, calendar: pd.DatetimeIndex, cal_ns: np.ndarray) -> np.ndarray:
+    obs, values = _observations(spec)
+    if len(obs) == 0:
+        return np.full(len(calendar), np.nan)
+
+    if spec.fill == "exact":
+        return _lookup_exact(obs, values, cal_ns)
+
+    if spec.fill == "step":
+        obs_periods = pd.DatetimeIndex(obs).to_period(spec.freq).asi8
+        # Several observations in one period: the last one stands for the period.
+        last_in_period = np.r_[obs_periods[1:] != obs_periods[:-1], True]
+        obs_periods, period_values = obs_periods[last_in_period], values[last_in_period]
+        cal_periods = calendar.to_period(spec.freq).asi8
+        out = _lookup_exact(obs_periods, period_values, cal_periods)
+        if spec.extend:
+            out[cal_periods < obs_periods[0]] = period_values[0]
+        return out
+
+    if spec.fill == "linear":
+        # Whole days relative to the first observation keep the weights exact.
+        x = (cal_ns - obs[0]) / NS_PER_DAY
+        xp = (obs - obs[0]) / NS_PER_DAY
+        out = np.interp(x, xp, values)
+        if not spec.extend:
+            out[(cal_ns < obs[0]) | (cal_ns > obs[-1])] = np.nan
+        return out
+
+    # ffill / asof
+    if spec.fill == "ffill":
+        pos = np.searchsorted(cal_ns, obs)
+        on_calendar = pos < len(cal_ns)
+        on_calendar[on_calendar] = cal_ns[pos[on_calendar]] == obs[on_calendar]
+        obs, values = obs[on_calendar], values[on_calendar]
+        if len(obs) == 0:
+            return np.full(len(calendar), np.nan)
+    pos = np.searchsorted(obs, cal_ns, side="right") - 1
+    valid = pos >= 0
+    if spec.tolerance is not None:
+        valid &= cal_ns - obs[pos.clip(0)] <= pd.Timedelta(spec.tolerance).value
+    out = np.full(len(calendar), np.nan)
+    out[valid] = values[pos[valid]]
+    if spec.extend:
+        out[cal_ns < obs[0]] = values[0]
+    return out
+
+
+def calendar_for(specs: list[AlignSpec], freq: str = "D") -> pd.DatetimeIndex:
+    """Calendar (daily "D" or business-day "B") spanning the earliest to the latest observation of `specs`."""
+    dates = [spec.data.index[spec.data.notna()] for spec in specs]
+    start = min(d.min() for d in dates if len(d))
+    end = max(d.max() for d in dates if len(d))
+    return pd.date_range(start=start, end=end, freq=freq)
+
+
+def align(specs: list[AlignSpec], calendar, date_col: str = "observation_date", dropna: bool = False) -> pd.DataFrame:
+    """Panel with `date_col` (the sorted calendar) and one float column per spec, in spec order."""
+    calendar = pd.DatetimeIndex(calendar).unique().sort_values()
+    cal_ns = calendar.as_unit("ns").asi8
+    columns = {date_col: calendar}
+    for spec in specs:
+        columns[spec.column] = _align_one(spec, calendar, cal_ns)
+    if dropna:
+        keep = np.logical_and.reduce([~np.isnan(columns[spec.column]) for spec in specs]) if specs else slice(None)
+        columns = {name: values[keep] for name, values in columns.items()}
+    return pd.DataFrame(columns)
@@ -2,6 +2,11 @@ import pandas as pd # 데이터처리
 import requests # 웹에서 데이터 가져오기
 import io # 메모리에서 데이터를 파일처럼 다루기
 import os # 운영체제 기능 사용
+import sys
+import argparse # 명령행 옵션 (--incremental)
+
+sys.path.append("/Applications/dollar_price")
+from data.process_scripts.incremental import delta_start, describe_delta, load_stored, upsert, watermarks
 
 os.makedirs('../../data', exist_ok=True) # data 폴더 생성, 이미 있으면 무시 (exist_ok=True)
 
@@ -19,8 +24,23 @@ series_dict = {
     'KRWUSD': 'DEXKOUS' # 원/달러 환율
 }
 
-def download_fred_csv(series_id): # FRED에서 데이터 다운로드
+DAILY_PATH = '../../data/krwusd_daily.csv'
+MONTHLY_PATH = '../../data/us_cpi_monthly.csv'
+
+parser = argparse.ArgumentParser(description="Download FRED CPI components and KRW/USD")
+parser.add_argument("--incremental", action="store_true",
+                    help="fetch only observations after each series' last stored value (plus a revision window) and upsert")
+args = parser.parse_args()
+
+# 증분 모드: 저장된 파일에서 시리즈별 마지막 관측일(watermark)을 읽음
+stored_daily = load_stored(DAILY_PATH, 'observation_date') if args.incremental else None
+stored_monthly = load_stored(MONTHLY_PATH, 'observation_date') if args.incremental else None
+marks = {**watermarks(stored_monthly), **watermarks(stored_daily)}
+
+def download_fred_csv(series_id, start=None): # FRED에서 데이터 다운로드 (start: 관측 시작일, None이면 전체)
     url = f"https://fred.stlouisfed.org/graph/fredgraph.csv?id={series_id}"
+    if start is not None:
+        url += f"&cosd={start:%Y-%m-%d}"
     print(f"Downloading {series_id}...") # 다운로드 URL 생성
     response = requests.get(url) 
     if response.status_code == 200: # 성공 여부 확인 (200 = 성공)
@@ -31,7 +51,8 @@ def download_fred_csv(series_id): # FRED에서 데이터 다운로드
 
 all_dfs = [] # 다운로드된 데이터들을 담을 리스트
 for name, series_id in series_dict.items(): # series_dict의 각 항목을 순회
-    df = download_fred_csv(series_id) # FRED에서 데이터 다운로드
+    start = delta_start(marks.get(name), 'D' if name == 'KRWUSD' else 'M') # watermark - revision window (없으면 전체)
+    df = download_fred_csv(series_id, start) # FRED에서 데이터 다운로드
     if df is not None: # 데이터가 성공적으로 다운로드되었는지 확인
         df.columns = [name] # 데이터프레임의 컬럼 이름을 시리즈 이름으로 변경
         all_dfs.append(df) # 다운로드된 데이터프레임을 all_dfs 리스트에 추가
@@ -40,13 +61,17 @@ if all_dfs: # all_dfs 리스트에 데이터가 하나라도 있으면
     final_df = pd.concat(all_dfs, axis=1) # all_dfs 리스트의 데이터프레임들을 가로로 합침
     
     # Save daily KRWUSD
-    krwusd_daily = final_df[['KRWUSD']].copy().dropna() # KRWUSD 컬럼만 선택하고 결측치 제거
-    krwusd_daily.to_csv('../../data/krwusd_daily.csv') # CSV 파일로 저장
+    krwusd_fresh = final_df[['KRWUSD']].copy().dropna() # KRWUSD 컬럼만 선택하고 결측치 제거
+    krwusd_daily = upsert(stored_daily, krwusd_fresh) # 저장된 데이터에 병합 (전체 수집이면 그대로)
+    print(f"KRWUSD {describe_delta(stored_daily, krwusd_fresh, krwusd_daily)}")
+    krwusd_daily.to_csv(DAILY_PATH) # CSV 파일로 저장
     
     # Save monthly CPI (resampled to Month Start) # 월별 CPI 저장 (월초 기준으로 리샘플링)
     cpi_cols = [c for c in final_df.columns if c != 'KRWUSD'] # KRWUSD를 제외한 나머지 컬럼 선택
-    cpi_monthly = final_df[cpi_cols].resample('MS').first().dropna(how='all') # 월초 기준으로 리샘플링하고 결측치 제거
-    cpi_monthly.to_csv('../../data/us_cpi_monthly.csv') # CSV 파일로 저장
+    cpi_fresh = final_df[cpi_cols].resample('MS').first().dropna(how='all') # 월초 기준으로 리샘플링하고 결측치 제거
+    cpi_monthly = upsert(stored_monthly, cpi_fresh) # 저장된 데이터에 병합 (전체 수집이면 그대로)
+    print(f"CPI {describe_delta(stored_monthly, cpi_fresh, cpi_monthly)}")
+    cpi_monthly.to_csv(MONTHLY_PATH) # CSV 파일로 저장
     
     print("Data collection completed successfully via direct download.")
     print(f"Files saved in data/ directory. CPI rows: {len(cpi_monthly)}")
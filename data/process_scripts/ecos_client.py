@@ -0,0 +1,235 @@
+"""
+Client for the Bank of Korea ECOS Open API (StatisticSearch) shared by the collectors.
+
+One pooled `requests.Session` serves every call; a token bucket caps the request rate across
+threads, `fetch_many` runs several series concurrently on a bounded thread pool, and each
+series is paged automatically from `list_total_count` (ECOS caps the rows returned per call).
+Transient failures (connection errors, HTTP 429/5xx, ECOS throttling codes) are retried with
+exponential backoff. Successful pages are cached on disk under data/.ecos_cache/, keyed by the
+sha256 of the request (the API key is not part of the key and is never written), so re-running
+a full refresh within `cache_ttl` issues no network calls.
+
+    from data.process_scripts.ecos_client import EcosClient, SeriesRequest
+    client = EcosClient()                                    # ECOS_API_KEY / ECOS_BASE_URL from env
+    rows = client.search("802Y001", "D", "19950101", "20260131", "0001000")
+    by_key = client.fetch_many({"kospi": SeriesRequest("802Y001", "D", "19950101", "20260131", ("0001000",))})
+
+Point `base_url` (or ECOS_BASE_URL) at a local stub server to exercise the client offline.
+"""
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+
+import pandas as pd
+import requests
+from requests.adapters import HTTPAdapter
+
+
+BASE_DIR = Path("/Applications/dollar_price")
+DEFAULT_BASE_URL = "http://ecos.bok.or.kr/api"
+DEFAULT_CACHE_DIR = BASE_DIR / "data" / ".ecos_cache"
+
+# Smallest per-call row cap the collectors have used; larger series are paged.
+PAGE_SIZE = 1000
+RETRY_STATUS = {429, 500, 502, 503, 504}
+# ECOS result codes for server-side / throttling failures (worth retrying).
+RETRY_RESULT_CODES = {"ERROR-500", "ERROR-600", "ERROR-601", "ERROR-602"}
+NO_DATA_CODE = "INFO-200"
+TIME_FORMATS = {"D": "%Y%m%d", "M": "%Y%m", "A": "%Y"}
+
+
+class EcosError(RuntimeError):
+    """ECOS request failed (HTTP error, API error code, or retries exhausted)."""
+
+
+class TokenBucket:
+    """Thread-safe token bucket: `rate` requests per second with bursts up to `capacity`."""
+
+    def __init__(self, rate: float, capacity: int | None = None):
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity is not None else max(1, int(rate)))
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+@dataclass(frozen=True)
+class SeriesRequest:
+    stat_code: str
+    cycle: str | None = None
+    start: str | None = None
+    end: str | None = None
+    items: tuple[str, ...] = ()
+
+
+class EcosClient:
+    def __init__(
+        self,
+        api_key: str | None = None,
+        base_url: str | None = None,
+        max_workers: int = 4,
+        rate: float = 5.0,
+        page_size: int = PAGE_SIZE,
+        max_retries: int = 4,
+        backoff: float = 0.5,
+        timeout: float = 30.0,
+        cache_dir: Path | None = DEFAULT_CACHE_DIR,
+        cache_ttl: float | None = 6 * 3600,
+    ):
+        self.api_key = api_key or os.getenv("ECOS_API_KEY")
+        if not self.api_key:
+            raise EcosError("ECOS_API_KEY is not set")
+        self.base_url = (base_url or os.getenv("ECOS_BASE_URL") or DEFAULT_BASE_URL).rstrip("/")
+        self.max_workers = max_workers
+        self.page_size = page_size
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.cache_dir = Path(cache_dir) if cache_dir is not None else None
+        self.cache_ttl = cache_ttl
+        self.bucket = TokenBucket(rate)
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_workers)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def close(self) -> None:
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # -- cache -------------------------------------------------------------------------------
+
+    def _cache_path(self, path: str) -> Path | None:
+        if self.cache_dir is None:
+            return None
+        digest = hashlib.sha256(f"{self.base_url}/{path}".encode("utf-8")).hexdigest()
+        return self.cache_dir / digest[:2] / f"{digest}.json"
+
+    def _cache_read(self, cache_path: Path | None):
+        if cache_path is None or not cache_path.exists():
+            return None
+        entry = json.loads(cache_path.read_text(encoding="utf-8"))
+        if self.cache_ttl is not None and time.time() - entry["fetched_at"] > self.cache_ttl:
+            return None
+        return entry["body"]
+
+    def _cache_write(self, cache_path: Path | None, path: str, body: dict) -> None:
+        if cache_path is None:
+            return
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = cache_path.with_name(f"{cache_path.stem}.{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp_path.write_text(json.dumps({"fetched_at": time.time(), "request": path, "body": body}, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp_path, cache_path)
+
+    # -- requests ----------------------------------------------------------------------------
+
+    def _get(self, path: str, refresh: bool = False) -> dict:
+        """GET `{base_url}/StatisticSearch/{key}/{path}` with cache, rate limit and retries."""
+        cache_path = self._cache_path(path)
+        if not refresh:
+            body = self._cache_read(cache_path)
+            if body is not None:
+                return body
+
+        url = f"{self.base_url}/StatisticSearch/{self.api_key}/{path}"
+        last_error = None
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                time.sleep(self.backoff * 2 ** (attempt - 1) + random.uniform(0, self.backoff))
+            self.bucket.acquire()
+            try:
+                response = self.session.get(url, timeout=self.timeout)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                last_error = f"{type(e).__name__}: {e}".replace(self.api_key, "***")
+                continue
+            if response.status_code in RETRY_STATUS:
+                last_error = f"HTTP {response.status_code}"
+                retry_after = response.headers.get("Retry-After")
+                if retry_after and retry_after.isdigit():
+                    time.sleep(int(retry_after))
+                continue
+            if response.status_code != 200:
+                raise EcosError(f"HTTP {response.status_code} for {path}")
+
+            body = response.json()
+            result = body.get("RESULT") or body.get("StatisticSearch", {}).get("RESULT") or {}
+            code = result.get("CODE", "")
+            if "StatisticSearch" not in body and code in RETRY_RESULT_CODES:
+                last_error = f"{code}: {result.get('MESSAGE', '')}"
+                continue
+            if "StatisticSearch" not in body and code != NO_DATA_CODE:
+                raise EcosError(f"{code or 'Unknown error'}: {result.get('MESSAGE', 'Unknown error')} ({path})")
+            self._cache_write(cache_path, path, body)
+            return body
+        raise EcosError(f"Giving up on {path} after {self.max_retries + 1} attempts ({last_error})")
+
+    def search(self, stat_code: str, cycle: str | None = None, start: str | None = None, end: str | None = None,
+               *items: str, refresh: bool = False) -> list[dict]:
+        """All StatisticSearch rows for one series, paging through `list_total_count`.
+
+        Trailing path segments may be omitted (as the API allows); returns [] when ECOS reports
+        no data for the request.
+        """
+        suffix = "/".join(str(p) for p in (stat_code, cycle, start, end, *items) if p)
+        rows = []
+        first = 1
+        total = None
+        while total is None or first <= total:
+            last = first + self.page_size - 1
+            body = self._get(f"json/kr/{first}/{last}/{suffix}/", refresh=refresh)
+            if "StatisticSearch" not in body:
+                return []
+            page = body["StatisticSearch"]
+            total = int(page.get("list_total_count", 0))
+            rows.extend(page.get("row", []))
+            first = last + 1
+        return rows
+
+    def fetch_many(self, series: dict, refresh: bool = False) -> dict:
+        """Fetch several `SeriesRequest`s ({key: request}) concurrently.
+
+        Returns {key: rows} in the order of `series`; a series that fails maps to its
+        `EcosError` instead of aborting the others.
+        """
+        def run(request: SeriesRequest):
+            try:
+                return self.search(request.stat_code, request.cycle, request.start, request.end, *request.items, refresh=refresh)
+            except EcosError as e:
+                return e
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            results = list(pool.map(run, series.values()))
+        return dict(zip(series.keys(), results))
+
+
+def parse_time(values: pd.Series, cycle: str | None) -> pd.Series:
+    """ECOS TIME labels -> datetime (D: YYYYMMDD, M: YYYYMM, Q: YYYYQn, A: YYYY)."""
+    if cycle == "Q":
+        return pd.PeriodIndex(values.astype(str), freq="Q").to_timestamp().to_series(index=values.index)
+    if cycle in TIME_FORMATS:
+        return pd.to_datetime(values, format=TIME_FORMATS[cycle])
+    return values
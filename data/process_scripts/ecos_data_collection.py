@@ -1,39 +1,50 @@
+import argparse
 import os
+import sys
 import pandas as pd
-import requests
 from dotenv import load_dotenv
 
+sys.path.append("/Applications/dollar_price")
+from data.process_scripts.ecos_client import EcosClient, EcosError, SeriesRequest, parse_time
+from data.process_scripts.incremental import delta_start, describe_delta, ecos_period, load_stored, upsert, watermarks
+
 # .env 파일에서 API 키 로드
 load_dotenv()
 API_KEY = os.getenv("ECOS_API_KEY")
 
-def fetch_ecos_data(stat_code, item_code1, start_date, end_date):
+def _to_frame(rows, item_code1):
+    if isinstance(rows, EcosError):
+        print(f"API Error for {item_code1}: {rows}")
+        return None
+    if not rows:
+        print(f"No data found for {item_code1}")
+        return None
+    df = pd.DataFrame(rows)
+    # 필요한 컬럼만 선택 및 이름 변경
+    df = df[['TIME', 'DATA_VALUE', 'ITEM_NAME1']]
+    df['TIME'] = parse_time(df['TIME'], 'M')
+    df['DATA_VALUE'] = pd.to_numeric(df['DATA_VALUE'])
+    return df
+
+def fetch_ecos_data(stat_code, item_code1, start_date, end_date, client=None):
     """
     한국은행 ECOS API를 통해 통계 데이터를 가져옵니다.
     """
-    url = f"http://ecos.bok.or.kr/api/StatisticSearch/{API_KEY}/json/kr/1/1000/{stat_code}/M/{start_date}/{end_date}/{item_code1}/"
-    
     print(f"Fetching data from ECOS: {stat_code} ({item_code1}) from {start_date} to {end_date}...")
-    response = requests.get(url)
-    
-    if response.status_code == 200:
-        data = response.json()
-        if "StatisticSearch" in data:
-            rows = data["StatisticSearch"]["row"]
-            df = pd.DataFrame(rows)
-            # 필요한 컬럼만 선택 및 이름 변경
-            df = df[['TIME', 'DATA_VALUE', 'ITEM_NAME1']]
-            df['TIME'] = pd.to_datetime(df['TIME'], format='%Y%m')
-            df['DATA_VALUE'] = pd.to_numeric(df['DATA_VALUE'])
-            return df
-        else:
-            print(f"No data found or API Error: {data.get('RESULT', {}).get('MESSAGE', 'Unknown error')}")
-            return None
-    else:
-        print(f"HTTP Error: {response.status_code}")
-        return None
+    try:
+        rows = (client or EcosClient(API_KEY)).search(stat_code, 'M', start_date, end_date, item_code1)
+    except EcosError as e:
+        rows = e
+    return _to_frame(rows, item_code1)
+
+OUTPUT_PATH = 'data/ecos_bop_monthly.csv'
 
 def main():
+    parser = argparse.ArgumentParser(description="Collect monthly BOP series from ECOS")
+    parser.add_argument("--incremental", action="store_true",
+                        help="fetch only periods after each series' last stored observation (plus a revision window) and upsert")
+    args = parser.parse_args()
+
     if not API_KEY:
         print("Error: ECOS_API_KEY not found in .env file.")
         return
@@ -52,25 +63,37 @@ def main():
     start_date = "196001"
     end_date = "202612"  # 현재 시점까지 최대한 가져오기 위해 넉넉히 설정
     
+    stored = load_stored(OUTPUT_PATH, 'TIME') if args.incremental else None
+    marks = watermarks(stored)
+    series = {
+        item_code: SeriesRequest(stat_code, 'M', ecos_period(delta_start(marks.get(item_name), 'M', pd.to_datetime(start_date, format='%Y%m')), 'M'), end_date, (item_code,))
+        for item_code, item_name in items.items()
+    }
+
+    print(f"Fetching {len(items)} items of {stat_code} up to {end_date}...")
+    with EcosClient(API_KEY) as client:
+        fetched = client.fetch_many(series)
+
     all_series = []
     
     for item_code, item_name in items.items():
-        df = fetch_ecos_data(stat_code, item_code, start_date, end_date)
+        df = _to_frame(fetched[item_code], item_code)
         if df is not None:
             df = df.rename(columns={'DATA_VALUE': item_name})
             df = df.set_index('TIME')[[item_name]]
             all_series.append(df)
     
     if all_series:
-        final_df = pd.concat(all_series, axis=1)
+        fresh = pd.concat(all_series, axis=1)
+        final_df = upsert(stored, fresh)
+        print(describe_delta(stored, fresh, final_df))
         
         # data 폴더 생성
         os.makedirs('data', exist_ok=True)
         
         # CSV 저장
-        output_path = 'data/ecos_bop_monthly.csv'
-        final_df.to_csv(output_path)
-        print(f"Successfully saved BOP data to {output_path}")
+        final_df.to_csv(OUTPUT_PATH)
+        print(f"Successfully saved BOP data to {OUTPUT_PATH}")
         print(f"Data range: {final_df.index.min()} to {final_df.index.max()}")
         print(f"Total rows: {len(final_df)}")
     else:
@@ -0,0 +1,114 @@
+"""
+Vectorized reader for ECOS wide exports: metadata columns (통계표, 계정항목, ...) followed by
+one column per period labelled 'YYYY/MM' or 'YYYY/MM/DD'.
+
+The date header is parsed once per distinct label set (cached, one format-specific
+`to_datetime` call per label length), and the whole numeric block is melted (one
+transpose + ravel) and cleaned with a single str.replace / to_numeric pass instead of row by row.
+"""
+import re
+from functools import lru_cache
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+
+DATE_COL_PATTERN = re.compile(r"^\d{4}/\d{2}(/\d{2})?$")
+LABEL_FORMATS = {7: "%Y/%m", 10: "%Y/%m/%d"}
+MISSING_TOKENS = {"": pd.NA, "-": pd.NA, "nan": pd.NA, "None": pd.NA}
+
+
+def clean_numeric(series: pd.Series, errors: str = "coerce") -> pd.Series:
+    """Strip thousands separators and map ECOS missing markers ('-', '') to NaN.
+
+    Any other unparseable value becomes NaN with errors="coerce"; errors="raise" reports them
+    instead, so a malformed export fails loudly rather than turning into silent gaps.
+    """
+    cleaned = (
+        series.astype(str)
+        .str.replace(",", "", regex=False)
+        .str.strip()
+        .replace(MISSING_TOKENS)
+    )
+    values = pd.to_numeric(cleaned, errors="coerce")
+    if errors == "raise":
+        bad = values.isna() & cleaned.notna()
+        if bad.any():
+            samples = ", ".join(repr(v) for v in cleaned[bad].unique()[:5])
+            raise ValueError(f"{int(bad.sum())} unparseable numeric value(s): {samples}")
+    return values
+
+
+def date_columns(df: pd.DataFrame) -> list[str]:
+    return [c for c in df.columns if DATE_COL_PATTERN.match(str(c))]
+
+
+@lru_cache(maxsize=64)
+def _parse_labels(labels: tuple[str, ...]) -> pd.DatetimeIndex:
+    index = pd.Index(labels, dtype=object)
+    lengths = index.str.len()
+    parsed = pd.Series(pd.NaT, index=range(len(index)), dtype="datetime64[ns]")
+    handled = np.zeros(len(index), dtype=bool)
+    for length, fmt in LABEL_FORMATS.items():
+        mask = np.asarray(lengths == length)
+        if mask.any():
+            parsed[mask] = pd.to_datetime(index[mask], format=fmt, errors="coerce")
+            handled |= mask
+    if not handled.all():
+        parsed[~handled] = pd.to_datetime(index[~handled], errors="coerce", format="mixed")
+    return pd.DatetimeIndex(parsed)
+
+
+def parse_date_labels(labels) -> pd.Series:
+    return pd.Series(_parse_labels(tuple(str(label) for label in labels)))
+
+
+def filter_rows(df: pd.DataFrame, filters: dict[str, str], source) -> pd.DataFrame:
+    target = df
+    for col, val in filters.items():
+        if col not in target.columns:
+            raise ValueError(f"Column '{col}' not found in {source}")
+        target = target[target[col] == val]
+    if target.empty:
+        raise ValueError(f"No rows matched {filters} in {source}")
+    return target
+
+
+def wide_to_long(df: pd.DataFrame, id_cols: list[str], errors: str = "coerce") -> pd.DataFrame:
+    """Melt every date column at once.
+
+    Returns `row` (position in `df`), `id_cols`, `observation_date` and a float `value`; rows are
+    ordered date-major, and missing values stay NaN so callers decide what to drop (other
+    unparseable values too, unless errors="raise"; see `clean_numeric`).
+    """
+    date_cols = date_columns(df)
+    n_rows = len(df)
+    block = df[date_cols].to_numpy(dtype=object).T.ravel()
+    long_df = pd.DataFrame({"row": np.tile(np.arange(n_rows), len(date_cols))})
+    for col in id_cols:
+        long_df[col] = np.tile(df[col].to_numpy(dtype=object), len(date_cols))
+    long_df["observation_date"] = np.repeat(parse_date_labels(date_cols).to_numpy(), n_rows)
+    long_df["value"] = clean_numeric(pd.Series(block, dtype=object), errors=errors).to_numpy(dtype=np.float64, na_value=np.nan)
+    return long_df
+
+
+def read_ecos_wide(file_path: Path, id_cols=("계정항목",), filters: dict[str, str] | None = None, errors: str = "coerce") -> pd.DataFrame:
+    """Read an ECOS wide export into long form (see `wide_to_long`), optionally keeping only rows matching `filters`."""
+    df = pd.read_csv(file_path, dtype=object)
+    for col in id_cols:
+        if col not in df.columns:
+            raise ValueError(f"Column '{col}' not found in {file_path}")
+    if filters:
+        df = filter_rows(df, filters, file_path)
+    return wide_to_long(df.reset_index(drop=True), list(id_cols), errors=errors)
+
+
+def read_ecos_series(file_path: Path, filters: dict[str, str], value_name: str, dropna: bool = True, errors: str = "coerce") -> pd.DataFrame:
+    """First row matching `filters` as an (observation_date, value_name) frame sorted by date."""
+    df = pd.read_csv(file_path, dtype=object)
+    row = filter_rows(df, filters, file_path).iloc[[0]]
+    long_df = wide_to_long(row, [], errors=errors)
+    out = long_df[["observation_date", "value"]].rename(columns={"value": value_name})
+    out = out.dropna(subset=["observation_date", value_name] if dropna else ["observation_date"])
+    return out.sort_values("observation_date").reset_index(drop=True)
@@ -0,0 +1,82 @@
+"""
+Watermark-based incremental refresh for the ECOS / FRED collectors.
+
+The watermark of a series is its last non-missing observation in the stored output. An
+incremental run requests only periods from (watermark - revision window) onwards, so recent
+revisions are picked up too, then upserts them into the stored table: fetched values replace
+overlapping periods, everything older is kept as stored, and series that were not refetched
+(or failed) keep their stored values.
+"""
+from pathlib import Path
+
+import pandas as pd
+
+
+# How far behind the watermark to refetch, per ECOS cycle code, to catch revisions.
+REVISION_WINDOW = {
+    "D": pd.DateOffset(days=14),
+    "M": pd.DateOffset(months=3),
+    "Q": pd.DateOffset(months=6),
+    "A": pd.DateOffset(years=1),
+}
+ECOS_PERIOD_FORMATS = {"D": "%Y%m%d", "M": "%Y%m", "A": "%Y"}
+
+
+def load_stored(path, index_col: str) -> pd.DataFrame | None:
+    """Stored output indexed by its (datetime) date column, or None if it does not exist yet."""
+    path = Path(path)
+    if not path.exists():
+        return None
+    # round_trip keeps untouched stored values bit-identical when the table is written back.
+    df = pd.read_csv(path, float_precision="round_trip")
+    df[index_col] = pd.to_datetime(df[index_col])
+    return df.set_index(index_col).sort_index()
+
+
+def watermarks(stored: pd.DataFrame | None) -> dict:
+    """{column: last non-missing date or None}; empty when nothing is stored."""
+    if stored is None:
+        return {}
+    return {col: stored[col].last_valid_index() for col in stored.columns}
+
+
+def delta_start(watermark, cycle: str, default=None) -> pd.Timestamp | None:
+    """First period to request: watermark minus the revision window, never before `default`.
+
+    Without a watermark this is `default` (None = the source's full history). Monthly and coarser
+    windows start on a month boundary so aggregated periods (e.g. a monthly mean of daily
+    values) are always rebuilt from complete data.
+    """
+    default = pd.Timestamp(default) if default is not None else None
+    if watermark is None or pd.isna(watermark):
+        return default
+    start = pd.Timestamp(watermark) - REVISION_WINDOW[cycle]
+    if cycle != "D":
+        start = start.to_period("M").to_timestamp()
+    return max(start, default) if default is not None else start
+
+
+def ecos_period(ts, cycle: str) -> str:
+    """Timestamp -> ECOS period label for `cycle` (YYYYMMDD / YYYYMM / YYYYQn / YYYY)."""
+    ts = pd.Timestamp(ts)
+    if cycle == "Q":
+        return f"{ts.year}Q{ts.quarter}"
+    return ts.strftime(ECOS_PERIOD_FORMATS[cycle])
+
+
+def upsert(stored: pd.DataFrame | None, fresh: pd.DataFrame) -> pd.DataFrame:
+    """Merge `fresh` into `stored` (both date-indexed); fresh non-missing values win on overlap."""
+    if stored is None:
+        return fresh.sort_index()
+    merged = fresh.combine_first(stored)
+    columns = list(stored.columns) + [c for c in fresh.columns if c not in stored.columns]
+    merged = merged[columns].sort_index()
+    merged.index.name = stored.index.name
+    return merged
+
+
+def describe_delta(stored: pd.DataFrame | None, fresh: pd.DataFrame, merged: pd.DataFrame) -> str:
+    if stored is None:
+        return f"full fetch: {len(merged)} rows"
+    new_rows = len(merged.index.difference(stored.index))
+    return f"incremental: fetched {len(fresh)} rows ({new_rows} new periods), stored {len(stored)} -> {len(merged)} rows"
@@ -1,5 +1,9 @@
 import pandas as pd
 import os
+import sys
+
+sys.path.append("/Applications/dollar_price")
+from data.process_scripts.ecos_wide import read_ecos_series
 
 base_dir = '/Applications/dollar_price'
 
@@ -42,58 +46,36 @@ def process_file(task):
         return
 
     try:
-        df = pd.read_csv(source_path)
+        header = pd.read_csv(source_path, nrows=0)
     except Exception as e:
         print(f"Error reading CSV: {e}")
         return
 
     # 필터링 적용
     # filters 딕셔너리에 있는 모든 조건(AND 조건)을 만족하는 행을 찾음
-    target_row = df.copy()
+    filters = {}
     for col, val in task['filters'].items():
-        if col in target_row.columns:
-            target_row = target_row[target_row[col] == val]
+        if col in header.columns:
+            filters[col] = val
         else:
             print(f"Warning: Column '{col}' not found in {task['source']}")
-    
-    if target_row.empty:
-        print(f"Error: No matching row found in {task['source']} with filters {task['filters']}")
-        # 디버깅을 위해 가능한 유니크 값 출력 (첫번째 필터 기준)
-        first_filter_col = list(task['filters'].keys())[0]
-        if first_filter_col in df.columns:
-            print(f"Available values in '{first_filter_col}': {df[first_filter_col].unique()}")
-        return
-    
-    # 첫 번째 매칭되는 행만 사용
-    target_row = target_row.iloc[[0]]
 
-    # 메타데이터 컬럼 식별 (날짜가 아닌 컬럼들)
-    # 날짜 컬럼은 보통 'YYYY/MM' 형태이거나 특정 포맷을 따름
-    # 여기서는 고정된 메타데이터 컬럼 목록 + '통계표', '계정항목' 등 일반적인 메타데이터 컬럼명을 제외하는 방식을 사용
-    potential_metadata = ['통계표', '계정항목', '단위', '변환', '구분코드', '가중치', '측정항목']
-    metadata_cols = [c for c in target_row.columns if c in potential_metadata]
-    
-    date_cols = [c for c in target_row.columns if c not in metadata_cols]
-    
-    # Melt 수행
-    melted_df = target_row.melt(id_vars=metadata_cols, 
-                                value_vars=date_cols, 
-                                var_name='original_date', 
-                                value_name=task['value_name'])
-
-    # 날짜 처리 (자동으로 포맷 인식하여 변환)
+    # 첫 번째 매칭되는 행을 날짜 헤더 기준으로 한 번에 long 형태로 변환 (쉼표 제거 및 숫자 변환 포함)
+    val_col = task['value_name']
     try:
-        melted_df['observation_date'] = pd.to_datetime(melted_df['original_date']).dt.strftime('%Y-%m-%d')
-    except Exception as e:
-        print(f"Error parsing dates: {e}")
+        melted_df = read_ecos_series(source_path, filters, val_col, dropna=False)
+    except ValueError as e:
+        print(f"Error: {e}")
+        # 디버깅을 위해 가능한 유니크 값 출력 (첫번째 필터 기준)
+        first_filter_col = next(iter(filters), None)
+        if first_filter_col is not None:
+            values = pd.read_csv(source_path, usecols=[first_filter_col])[first_filter_col].unique()
+            print(f"Available values in '{first_filter_col}': {values}")
         return
 
-    # 값 처리 (쉼표 제거 및 숫자 변환)
-    val_col = task['value_name']
-    melted_df[val_col] = melted_df[val_col].astype(str).str.replace(',', '').astype(float)
-
     # 결과 정리
-    final_df = melted_df[['observation_date', val_col]].sort_values('observation_date')
+    melted_df['observation_date'] = melted_df['observation_date'].dt.strftime('%Y-%m-%d')
+    final_df = melted_df[['observation_date', val_col]]
     
     # 저장
     os.makedirs(os.path.dirname(output_path), exist_ok=True)
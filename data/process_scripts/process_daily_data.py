@@ -1,15 +1,13 @@
 import pandas as pd
 import os
 import io
+import sys
 
-base_dir = '/Applications/dollar_price'
+sys.path.append('/Applications/dollar_price')
+from data.process_scripts.daily_align import AlignSpec, align
+from data.process_scripts.ecos_wide import clean_numeric
 
-def clean_numeric(series):
-    # Convert series to string, handle potential weird representations, remove commas
-    # Handle cases where value might be just '-' or something similar
-    s = series.astype(str).str.replace(',', '').str.strip()
-    s = pd.to_numeric(s, errors='coerce')
-    return s
+base_dir = '/Applications/dollar_price'
 
 def process_cma():
     path = os.path.join(base_dir, 'data/m2/KOR/CMA/운용대상별 CMA잔고 추이.csv')
@@ -126,9 +124,16 @@ if __name__ == "__main__":
     print(f"Successfully saved {er_out_path}")
     
     if not cma_df.empty and not mmf_df.empty and not er_df.empty:
-        # Merge datasets
-        merged = pd.merge(er_df, cma_df, on='observation_date', how='inner')
-        merged = pd.merge(merged, mmf_df, on='observation_date', how='inner')
+        # Align on the FX trading days that also have CMA and MMF balances
+        merged = align(
+            [
+                AlignSpec.from_frame(er_df, 'USD_KRW', fill='exact'),
+                AlignSpec.from_frame(cma_df, 'CMA_total', fill='exact'),
+                AlignSpec.from_frame(mmf_df, 'MMF_total', fill='exact'),
+            ],
+            er_df['observation_date'],
+            dropna=True,
+        )
         
         # Calculate M2 Proxy
         merged['M2_proxy'] = merged['CMA_total'] + merged['MMF_total']
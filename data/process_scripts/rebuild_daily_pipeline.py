@@ -1,39 +1,25 @@
+import argparse
+import hashlib
+import inspect
+import json
 import re
+import sys
+from dataclasses import dataclass
 from pathlib import Path
+from typing import Callable
 
+import numpy as np
 import pandas as pd
 
+sys.path.append("/Applications/dollar_price")
+from data.process_scripts.daily_align import AlignSpec, align
+from data.process_scripts.ecos_wide import clean_numeric, read_ecos_series, read_ecos_wide
+from data.process_scripts.series_lake import META_FILE, series_path, write_series
+from data.process_scripts.validation import ValidationError, check_series
+
 BASE_DIR = Path("/Applications/dollar_price")
 DATA_DIR = BASE_DIR / "data"
-
-DATE_COL_PATTERN = re.compile(r"^\d{4}/\d{2}(/\d{2})?$")
-
-
-def _clean_numeric(series: pd.Series) -> pd.Series:
-    cleaned = (
-        series.astype(str)
-        .str.replace(",", "", regex=False)
-        .str.strip()
-        .replace({"": pd.NA, "-": pd.NA, "nan": pd.NA, "None": pd.NA})
-    )
-    return pd.to_numeric(cleaned, errors="coerce")
-
-
-def _date_columns(df: pd.DataFrame) -> list[str]:
-    return [c for c in df.columns if DATE_COL_PATTERN.match(str(c))]
-
-
-def _parse_date_labels(labels: list[str]) -> pd.Series:
-    parsed = []
-    for label in labels:
-        s = str(label)
-        if len(s) == 7:
-            parsed.append(pd.to_datetime(s, format="%Y/%m", errors="coerce"))
-        elif len(s) == 10:
-            parsed.append(pd.to_datetime(s, format="%Y/%m/%d", errors="coerce"))
-        else:
-            parsed.append(pd.to_datetime(s, errors="coerce"))
-    return pd.Series(parsed)
+STATE_PATH = DATA_DIR / "process_scripts" / ".rebuild_state.json"
 
 
 def parse_wide_single_series(
@@ -41,27 +27,7 @@ def parse_wide_single_series(
     filters: dict[str, str],
     value_name: str,
 ) -> pd.DataFrame:
-    df = pd.read_csv(file_path, dtype=str)
-    date_cols = _date_columns(df)
-
-    target = df.copy()
-    for col, val in filters.items():
-        if col not in target.columns:
-            raise ValueError(f"Column '{col}' not found in {file_path}")
-        target = target[target[col] == val]
-
-    if target.empty:
-        raise ValueError(f"No rows matched {filters} in {file_path}")
-
-    row = target.iloc[0]
-    out = pd.DataFrame(
-        {
-            "observation_date": _parse_date_labels(date_cols),
-            value_name: _clean_numeric(row[date_cols]).values,
-        }
-    )
-    out = out.dropna(subset=["observation_date", value_name]).sort_values("observation_date")
-    return out.reset_index(drop=True)
+    return read_ecos_series(file_path, filters, value_name, errors="raise")
 
 
 def _sanitize_m2_name(raw_name: str) -> str:
@@ -73,90 +39,62 @@ def _sanitize_m2_name(raw_name: str) -> str:
 
 
 def parse_m2_details(files: list[Path]) -> pd.DataFrame:
-    frames = []
+    frames, column_order = [], []
 
     for file_path in files:
-        df = pd.read_csv(file_path, dtype=str)
-        date_cols = _date_columns(df)
-
-        if "계정항목" not in df.columns:
-            raise ValueError(f"Column '계정항목' not found in {file_path}")
-
-        long_rows = []
-        for _, row in df.iterrows():
-            raw_name = str(row.get("계정항목", "")).strip()
-            if not raw_name or raw_name.lower() == "nan":
-                continue
-
-            col_name = _sanitize_m2_name(raw_name)
-            vals = _clean_numeric(row[date_cols])
-
-            temp = pd.DataFrame(
-                {
-                    "observation_date": _parse_date_labels(date_cols),
-                    "variable": col_name,
-                    "value": vals.values,
-                }
-            )
-            long_rows.append(temp)
-
-        if not long_rows:
+        long_df = read_ecos_wide(file_path, errors="raise")
+        names = long_df["계정항목"].fillna("").astype(str).str.strip()
+        long_df = long_df[(names != "") & (names.str.lower() != "nan")]
+        if long_df.empty:
             continue
-
-        long_df = pd.concat(long_rows, ignore_index=True)
+        # Sanitize each distinct account name once, then map it over the long frame.
+        long_df = long_df.assign(variable=long_df["계정항목"].map({n: _sanitize_m2_name(n) for n in long_df["계정항목"].unique()}))
+        # Melted rows are date-major, so within each (date, variable) pair "last" is the last account row as before.
         long_df = long_df.dropna(subset=["observation_date", "value"])
-
-        wide_df = (
-            long_df.pivot_table(
-                index="observation_date",
-                columns="variable",
-                values="value",
-                aggfunc="last",
-            )
-            .reset_index()
-            .sort_values("observation_date")
-        )
-        frames.append(wide_df)
+        frames.append(long_df[["observation_date", "variable", "value"]])
+        column_order += [c for c in sorted(long_df["variable"].unique()) if c not in column_order]
 
     if not frames:
         raise ValueError("No M2 detail rows parsed")
 
-    merged = pd.concat(frames, ignore_index=True)
-    merged = merged.sort_values("observation_date")
-    merged = merged.groupby("observation_date", as_index=False).last()
-    return merged
+    # One pivot over every file: later files win per (date, variable), as the old per-file
+    # pivot followed by groupby().last() did.
+    merged = pd.concat(frames, ignore_index=True).pivot_table(
+        index="observation_date",
+        columns="variable",
+        values="value",
+        aggfunc="last",
+    )
+    merged.columns.name = None
+    merged = merged[column_order]
+    return merged.reset_index().sort_values("observation_date").reset_index(drop=True)
 
 
 def parse_m2_total(files: list[Path]) -> pd.DataFrame:
     totals = []
 
     for file_path in files:
-        df = pd.read_csv(file_path, dtype=str)
-        date_cols = _date_columns(df)
-
-        if "계정항목" not in df.columns:
-            raise ValueError(f"Column '계정항목' not found in {file_path}")
-
-        account = df["계정항목"].fillna("").astype(str)
+        long_df = read_ecos_wide(file_path, errors="raise")
+        account = long_df["계정항목"].fillna("").astype(str)
         total_mask = account.str.strip().str.startswith("M2(")
 
         if total_mask.any():
-            values = _clean_numeric(df.loc[total_mask].iloc[0][date_cols])
+            first_total = long_df.loc[total_mask, "row"].min()
+            temp = long_df.loc[long_df["row"] == first_total, ["observation_date", "value"]]
         else:
             # Legacy file has only component rows; reconstruct total by component sum.
             component_mask = account.str.startswith("  ")
             if not component_mask.any():
                 component_mask = ~total_mask
-            comp = df.loc[component_mask, date_cols].apply(_clean_numeric, axis=0)
-            values = comp.sum(axis=0, skipna=True)
-
-        temp = pd.DataFrame(
-            {
-                "observation_date": _parse_date_labels(date_cols),
-                "M2_KOR": values.values,
-            }
-        )
-        temp = temp.dropna(subset=["observation_date", "M2_KOR"])
+            # Sum each date's components as one contiguous vector, matching the old column-wise DataFrame.sum.
+            temp = (
+                long_df[component_mask]
+                .groupby("observation_date", sort=False)["value"]
+                .agg(lambda v: np.nansum(v.to_numpy()))
+                .reset_index()
+            )
+
+        temp = temp.rename(columns={"value": "M2_KOR"}).dropna(subset=["observation_date", "M2_KOR"])
         totals.append(temp)
 
     if not totals:
@@ -176,81 +114,126 @@ def parse_mmf_daily(file_path: Path) -> pd.DataFrame:
     date_col = df.columns[0]
     value_col = df.columns[1]
 
+    # Rows without a date are the sub-header (전체 / 개인 / 법인); every dated value must parse.
+    dates = pd.to_datetime(df[date_col], errors="coerce")
+    dated = dates.notna()
     out = pd.DataFrame(
         {
-            "observation_date": pd.to_datetime(df[date_col], errors="coerce"),
-            "MMF_total": _clean_numeric(df[value_col]),
+            "observation_date": dates[dated],
+            "MMF_total": clean_numeric(df.loc[dated, value_col], errors="raise"),
         }
     )
-    out = out.dropna(subset=["observation_date", "MMF_total"])
+    out = out.dropna(subset=["MMF_total"])
     out = out.sort_values("observation_date").reset_index(drop=True)
     return out
 
 
-def main() -> None:
-    # 1) Daily exchange rate
-    exchange_raw = DATA_DIR / "exchange_rate" / "주요국 통화의 대원화환율_24092601.csv"
+# --- Pipeline steps -------------------------------------------------------------
+# Each step reads only its declared inputs (raw exports or upstream processed CSVs) and writes
+# its declared outputs, so it can be rerun on its own.
+
+EXCHANGE_RAW = DATA_DIR / "exchange_rate" / "주요국 통화의 대원화환율_24092601.csv"
+EXCHANGE_OUT = DATA_DIR / "exchange_rate" / "exchange_rate_processed.csv"
+USD_KRW_OUT = DATA_DIR / "exchange_rate" / "USD_KRW_processed.csv"
+KOR_RATE_RAW = DATA_DIR / "policy_rate" / "KOR" / "한국은행 기준금리 및 여수신금리_24094328.csv"
+KOR_RATE_OUT = DATA_DIR / "policy_rate" / "KOR" / "base_rate_KOR_processed.csv"
+US_RATE_RAW = DATA_DIR / "policy_rate" / "USA" / "FEDFUNDS.csv"
+SPREAD_OUT = DATA_DIR / "policy_rate" / "spread_KOR_USA_processed.csv"
+FWD_OUT = DATA_DIR / "exchange_rate" / "theoretical_fwd_rate_processed.csv"
+M2_FILES = [
+    DATA_DIR / "m2" / "KOR" / "M2_1995_to_2004.csv",
+    DATA_DIR / "m2" / "KOR" / "M2_2004_to_2026.csv",
+]
+M2_DETAILS_OUT = DATA_DIR / "m2" / "KOR" / "M2_details_processed.csv"
+M2_TOTAL_OUT = DATA_DIR / "m2" / "KOR" / "M2_KOR_processed.csv"
+MMF_RAW = DATA_DIR / "m2" / "KOR" / "MMF" / "MMF_daily.csv"
+MERGED_LIQ_OUT = DATA_DIR / "m2" / "KOR" / "merged_daily_liquid.csv"
+
+
+def _lake(name: str) -> Path:
+    return series_path(name) / META_FILE
+
+
+def _read_processed(path: Path) -> pd.DataFrame:
+    return pd.read_csv(path, parse_dates=["observation_date"])
+
+
+def build_exchange() -> str:
     exchange = parse_wide_single_series(
-        exchange_raw,
+        EXCHANGE_RAW,
         filters={"계정항목": "원/미국달러(매매기준율)"},
         value_name="USD_KRW",
     )
+    check_series("usd_krw", exchange)
+    exchange.to_csv(EXCHANGE_OUT, index=False)
+    exchange.to_csv(USD_KRW_OUT, index=False)
+    write_series("usd_krw", exchange, source=EXCHANGE_OUT)
+    return f"exchange rows: {len(exchange):,}"
 
-    exchange_out_a = DATA_DIR / "exchange_rate" / "exchange_rate_processed.csv"
-    exchange_out_b = DATA_DIR / "exchange_rate" / "USD_KRW_processed.csv"
-    exchange.to_csv(exchange_out_a, index=False)
-    exchange.to_csv(exchange_out_b, index=False)
 
-    # 2) Daily Korea base rate
-    kor_rate_raw = DATA_DIR / "policy_rate" / "KOR" / "한국은행 기준금리 및 여수신금리_24094328.csv"
+def build_kor_rate() -> str:
     kor_rate = parse_wide_single_series(
-        kor_rate_raw,
+        KOR_RATE_RAW,
         filters={"계정항목": "한국은행 기준금리"},
         value_name="BASE_RATE_KOR",
     )
+    check_series("base_rate_kor", kor_rate)
+    kor_rate.to_csv(KOR_RATE_OUT, index=False)
+    write_series("base_rate_kor", kor_rate, source=KOR_RATE_OUT)
+    return f"base rate rows: {len(kor_rate):,}"
 
-    kor_rate_out = DATA_DIR / "policy_rate" / "KOR" / "base_rate_KOR_processed.csv"
-    kor_rate.to_csv(kor_rate_out, index=False)
 
-    # 3) Daily US policy rate
-    us_rate_path = DATA_DIR / "policy_rate" / "USA" / "FEDFUNDS.csv"
-    us_rate = pd.read_csv(us_rate_path)
+def build_spread_fwd() -> str:
+    us_rate = pd.read_csv(US_RATE_RAW)
     us_rate["observation_date"] = pd.to_datetime(us_rate["observation_date"], errors="coerce")
     us_rate = us_rate[["observation_date", "FEDFUNDS"]].dropna().sort_values("observation_date")
 
-    # 4) Daily spread and theoretical forward rate
-    merged = exchange.merge(kor_rate, on="observation_date", how="inner")
-    merged = merged.merge(us_rate, on="observation_date", how="inner")
+    exchange = _read_processed(EXCHANGE_OUT)
+    kor_rate = _read_processed(KOR_RATE_OUT)
+    # Dates quoted by all three sources.
+    specs = [
+        AlignSpec.from_frame(exchange, "USD_KRW", fill="exact"),
+        AlignSpec.from_frame(kor_rate, "BASE_RATE_KOR", fill="exact"),
+        AlignSpec.from_frame(us_rate, "FEDFUNDS", fill="exact"),
+    ]
+    merged = align(specs, exchange["observation_date"], dropna=True)
 
     spread = merged[["observation_date"]].copy()
     spread["RATE_SPREAD_KOR_USA"] = merged["BASE_RATE_KOR"] - merged["FEDFUNDS"]
-    spread_out = DATA_DIR / "policy_rate" / "spread_KOR_USA_processed.csv"
-    spread.to_csv(spread_out, index=False)
-
     fwd = merged[["observation_date"]].copy()
     r_kor = merged["BASE_RATE_KOR"] / 100.0
     r_usa = merged["FEDFUNDS"] / 100.0
     fwd["THEORETICAL_FWD_RATE"] = merged["USD_KRW"] * (1.0 + r_kor) / (1.0 + r_usa)
-    fwd_out = DATA_DIR / "exchange_rate" / "theoretical_fwd_rate_processed.csv"
-    fwd.to_csv(fwd_out, index=False)
 
-    # 5) M2 details (monthly)
-    m2_files = [
-        DATA_DIR / "m2" / "KOR" / "M2_1995_to_2004.csv",
-        DATA_DIR / "m2" / "KOR" / "M2_2004_to_2026.csv",
-    ]
-    m2_details = parse_m2_details(m2_files)
-    m2_out = DATA_DIR / "m2" / "KOR" / "M2_details_processed.csv"
-    m2_details.to_csv(m2_out, index=False)
+    check_series("spread_kor_usa", spread)
+    check_series("theoretical_fwd_rate", fwd)
+    spread.to_csv(SPREAD_OUT, index=False)
+    write_series("spread_kor_usa", spread, source=SPREAD_OUT)
+    fwd.to_csv(FWD_OUT, index=False)
+    write_series("theoretical_fwd_rate", fwd, source=FWD_OUT)
+    return f"spread rows: {len(spread):,}"
+
+
+def build_m2_details() -> str:
+    m2_details = parse_m2_details(M2_FILES)
+    check_series("m2_details", m2_details)
+    m2_details.to_csv(M2_DETAILS_OUT, index=False)
+    write_series("m2_details", m2_details, source=M2_DETAILS_OUT)
+    return f"m2 details rows: {len(m2_details):,}"
+
 
-    m2_total = parse_m2_total(m2_files)
+def build_m2_total() -> str:
+    m2_total = parse_m2_total(M2_FILES)
+    check_series("m2_kor", m2_total)
+    m2_total.to_csv(M2_TOTAL_OUT, index=False)
+    write_series("m2_kor", m2_total, source=M2_TOTAL_OUT)
+    return f"m2 total rows: {len(m2_total):,}"
 
-    m2_total_out = DATA_DIR / "m2" / "KOR" / "M2_KOR_processed.csv"
-    m2_total.to_csv(m2_total_out, index=False)
 
-    # 6) Daily liquidity merge for MMF LSTM
-    mmf_raw = DATA_DIR / "m2" / "KOR" / "MMF" / "MMF_daily.csv"
-    mmf_daily = parse_mmf_daily(mmf_raw)
+def build_liquidity() -> str:
+    exchange = _read_processed(EXCHANGE_OUT)
+    m2_details = _read_processed(M2_DETAILS_OUT)
+    mmf_daily = parse_mmf_daily(MMF_RAW)
 
     mmf_monthly_col = "M2_MMF"
     if mmf_monthly_col not in m2_details.columns:
@@ -259,27 +242,178 @@ def main() -> None:
             raise ValueError("Could not find MMF column in M2 details")
         mmf_monthly_col = mmf_like[0]
 
-    mmf_monthly = m2_details[["observation_date", mmf_monthly_col]].rename(
-        columns={mmf_monthly_col: "MMF_monthly"}
+    # On the FX trading calendar: daily MMF (the latest report within a week once the daily series
+    # starts), before that the monthly MMF interpolated in time.
+    merged_liq = align(
+        [
+            AlignSpec.from_frame(exchange, "USD_KRW", fill="exact"),
+            AlignSpec.from_frame(mmf_daily, "MMF_total", fill="asof", tolerance=pd.Timedelta(days=7)),
+            AlignSpec.from_frame(m2_details, mmf_monthly_col, column="MMF_monthly", freq="M", fill="linear", extend=True),
+        ],
+        exchange["observation_date"],
     )
-
-    merged_liq = exchange.merge(mmf_daily, on="observation_date", how="left")
-    merged_liq = merged_liq.merge(mmf_monthly, on="observation_date", how="left")
-    merged_liq["MMF_monthly"] = merged_liq["MMF_monthly"].interpolate(method="linear", limit_direction="both")
+    # Dates with neither stay missing and fail validation instead of becoming a zero balance.
     merged_liq["MMF_total"] = merged_liq["MMF_total"].fillna(merged_liq["MMF_monthly"])
-    merged_liq["MMF_total"] = merged_liq["MMF_total"].fillna(0.0)
     merged_liq = merged_liq.drop(columns=["MMF_monthly"])
     merged_liq = merged_liq.sort_values("observation_date").reset_index(drop=True)
 
-    merged_liq_out = DATA_DIR / "m2" / "KOR" / "merged_daily_liquid.csv"
-    merged_liq.to_csv(merged_liq_out, index=False)
+    check_series("merged_daily_liquid", merged_liq)
+    merged_liq.to_csv(MERGED_LIQ_OUT, index=False)
+    write_series("merged_daily_liquid", merged_liq, source=MERGED_LIQ_OUT)
+    return f"merged liquidity rows: {len(merged_liq):,}"
+
+
+@dataclass
+class Step:
+    name: str
+    inputs: list[Path]
+    outputs: list[Path]
+    run: Callable[[], str]
+
+
+# Declared in dependency order: a step only reads raw files or outputs of steps listed above it.
+STEPS = [
+    Step("exchange", [EXCHANGE_RAW], [EXCHANGE_OUT, USD_KRW_OUT, _lake("usd_krw")], build_exchange),
+    Step("kor_rate", [KOR_RATE_RAW], [KOR_RATE_OUT, _lake("base_rate_kor")], build_kor_rate),
+    Step(
+        "spread_fwd",
+        [EXCHANGE_OUT, KOR_RATE_OUT, US_RATE_RAW],
+        [SPREAD_OUT, FWD_OUT, _lake("spread_kor_usa"), _lake("theoretical_fwd_rate")],
+        build_spread_fwd,
+    ),
+    Step("m2_details", M2_FILES, [M2_DETAILS_OUT, _lake("m2_details")], build_m2_details),
+    Step("m2_total", M2_FILES, [M2_TOTAL_OUT, _lake("m2_kor")], build_m2_total),
+    Step("liquidity", [EXCHANGE_OUT, MMF_RAW, M2_DETAILS_OUT], [MERGED_LIQ_OUT, _lake("merged_daily_liquid")], build_liquidity),
+]
+
+
+# --- Change tracking ---------------------------------------------------------------
+
+# Code every step goes through: this module (the parse_* helpers and paths), the alignment, the
+# ECOS parser and the schemas. Editing any of them rebuilds and revalidates every output instead of
+# leaving processed files written by the old code.
+SHARED_MODULES = (sys.modules[__name__],) + tuple(inspect.getmodule(fn) for fn in (align, read_ecos_wide, check_series))
 
-    print("Rebuild completed.")
-    print(f"exchange rows: {len(exchange):,}")
-    print(f"spread rows: {len(spread):,}")
-    print(f"m2 details rows: {len(m2_details):,}")
-    print(f"m2 total rows: {len(m2_total):,}")
-    print(f"merged liquidity rows: {len(merged_liq):,}")
+
+def _code_hash(step: Step) -> str:
+    sources = [inspect.getsource(step.run)] + [inspect.getsource(module) for module in SHARED_MODULES]
+    return hashlib.sha256("\n".join(sources).encode("utf-8")).hexdigest()[:16]
+
+
+class FileHasher:
+    """sha256 of file contents, reusing the stored hash while (mtime_ns, size) are unchanged."""
+
+    def __init__(self, known: dict):
+        self.known = known
+        self.seen = {}
+
+    def __call__(self, path: Path) -> str | None:
+        if not path.exists():
+            return None
+        stat = path.stat()
+        key = str(path.relative_to(BASE_DIR))
+        prev = self.known.get(key)
+        if prev and prev["mtime_ns"] == stat.st_mtime_ns and prev["size"] == stat.st_size:
+            digest = prev["sha256"]
+        else:
+            digest = hashlib.sha256(path.read_bytes()).hexdigest()
+        self.seen[key] = {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size, "sha256": digest}
+        return digest
+
+
+def load_state(path: Path = STATE_PATH) -> dict:
+    if not path.exists():
+        return {"files": {}, "steps": {}}
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def save_state(state: dict, path: Path = STATE_PATH) -> None:
+    path.write_text(json.dumps(state, indent=2, ensure_ascii=False), encoding="utf-8")
+
+
+def _relpath(path: Path) -> str:
+    return str(path.relative_to(BASE_DIR))
+
+
+def rebuild_reason(step: Step, state: dict, file_hash: FileHasher) -> str | None:
+    """Why `step` must run, or None when its inputs, outputs and code match the last build."""
+    prev = state["steps"].get(step.name)
+    if prev is None:
+        return "never built"
+    if prev["code"] != _code_hash(step):
+        return "step code changed"
+    for path in step.inputs:
+        digest = file_hash(path)
+        if digest is None:
+            raise FileNotFoundError(f"Input for step '{step.name}' not found: {path}")
+        if prev["inputs"].get(_relpath(path)) != digest:
+            return f"input changed: {_relpath(path)}"
+    for path in step.outputs:
+        if prev["outputs"].get(_relpath(path)) != file_hash(path):
+            return f"output missing or modified: {_relpath(path)}"
+    return None
+
+
+def run_pipeline(dry_run: bool = False, force: bool = False) -> list[str]:
+    """Run the steps whose upstream changed since the last build; returns the names that (would) run."""
+    state = load_state()
+    file_hash = FileHasher(state["files"])
+    pending_outputs = set()
+    executed = []
+
+    for step in STEPS:
+        upstream = sorted(_relpath(p) for p in step.inputs if p in pending_outputs)
+        if force:
+            reason = "forced"
+        elif dry_run and upstream:
+            # Upstream outputs are not rewritten in a dry run, so assume they change.
+            reason = f"upstream rebuild: {', '.join(upstream)}"
+        else:
+            reason = rebuild_reason(step, state, file_hash)
+
+        if reason is None:
+            print(f"[skip]    {step.name}")
+            continue
+        executed.append(step.name)
+        pending_outputs.update(step.outputs)
+        if dry_run:
+            print(f"[rebuild] {step.name} ({reason})")
+            continue
+
+        summary = step.run()
+        print(f"[built]   {step.name} ({reason}) {summary}")
+        state["steps"][step.name] = {
+            "code": _code_hash(step),
+            "inputs": {_relpath(p): file_hash(p) for p in step.inputs},
+            "outputs": {_relpath(p): file_hash(p) for p in step.outputs},
+        }
+        state["files"].update(file_hash.seen)
+        save_state(state)
+
+    if not dry_run:
+        state["files"].update(file_hash.seen)
+        save_state(state)
+    return executed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Rebuild processed daily series from the raw ECOS / FRED exports")
+    parser.add_argument("--dry-run", action="store_true", help="print which steps would rebuild and why, without writing")
+    parser.add_argument("--force", action="store_true", help="rebuild every step regardless of recorded state")
+    args = parser.parse_args()
+
+    try:
+        executed = run_pipeline(dry_run=args.dry_run, force=args.force)
+    except ValidationError as e:
+        # Nothing was written for the failing step and it is not recorded, so the next run retries it.
+        print(f"Validation failed, rebuild stopped:\n{e}")
+        sys.exit(1)
+    if args.dry_run:
+        print(f"{len(executed)}/{len(STEPS)} step(s) would rebuild.")
+    elif executed:
+        print(f"Rebuild completed: {', '.join(executed)}")
+    else:
+        print("Everything up to date.")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,120 @@
+"""
+Catalog of the macro series shared by the factor, SHAP and correlation analyses, with a
+memoized panel loader.
+
+`load_panel(names)` joins the catalog series on their sorted date index in one inner `join`
+and keeps the result twice: in-process (lru_cache) and as Parquet under data/lake/_panels/,
+keyed by the series names and the stat of every source file, so a changed CSV rebuilds the
+panel and repeated analyses in one process or session read it once.
+"""
+import hashlib
+import json
+import os
+import sys
+from dataclasses import dataclass
+from functools import lru_cache
+
+import pandas as pd
+
+sys.path.append("/Applications/dollar_price")
+from data.process_scripts.series_lake import DATA_DIR, LAKE_DIR, LAKE_SOURCES, load_series, series_info
+
+
+PANEL_CACHE_DIR = LAKE_DIR / "_panels"
+DATE_COL = "observation_date"
+
+
+@dataclass(frozen=True)
+class SeriesSource:
+    path: str  # relative to data/
+    column: str | None = None  # value column; None = first non-date column
+    lake: str | None = None  # series_lake name when the CSV is registered there
+
+
+CATALOG = {
+    "USD_KRW": SeriesSource("exchange_rate/exchange_rate_processed.csv", lake="usd_krw"),
+    "SPREAD_POLICY": SeriesSource("policy_rate/spread_KOR_USA_processed.csv", lake="spread_kor_usa"),
+    "BOND_KOR": SeriesSource("10y_bond/KOR/10y_bond_KOR_processed.csv"),
+    "BOND_USA": SeriesSource("10y_bond/USA/GS10.csv"),
+    "M2_KOR": SeriesSource("m2/KOR/M2_KOR_processed.csv", lake="m2_kor"),
+    "M2_USA": SeriesSource("m2/USA/M2SL.csv"),
+    "CPI_KOR": SeriesSource("CPI/KOR/CPI_KOR_processed.csv"),
+    "CPI_USA": SeriesSource("CPI/USA/CPIAUCSL.csv"),
+    "IPI_KOR": SeriesSource("production_index/KOR/IPI_KOR_processed.csv"),
+    "IPI_USA": SeriesSource("production_index/USA/INDPRO.csv"),
+    "THEORETICAL_FWD": SeriesSource("exchange_rate/theoretical_fwd_rate_processed.csv", lake="theoretical_fwd_rate"),
+}
+for _name, _source in CATALOG.items():
+    if _source.lake is not None and LAKE_SOURCES[_source.lake][0] != _source.path:
+        raise ValueError(f"Catalog entry {_name} points at {_source.path}, lake series {_source.lake} at {LAKE_SOURCES[_source.lake][0]}")
+
+# Monthly macro panel used by analyze_factors / analyze_shap / analyze_correlation_change.
+MACRO_PANEL = (
+    "USD_KRW",
+    "SPREAD_POLICY",
+    "BOND_KOR",
+    "BOND_USA",
+    "M2_KOR",
+    "M2_USA",
+    "CPI_KOR",
+    "CPI_USA",
+    "IPI_KOR",
+    "IPI_USA",
+)
+
+
+def load_catalog_series(name: str) -> pd.Series:
+    """One catalog series as a float Series named `name`, indexed by observation_date."""
+    source = CATALOG[name]
+    if source.lake is not None:
+        column = source.column or next(c for c in series_info(source.lake)["columns"] if c != DATE_COL)
+        return load_series(source.lake, columns=[column])[column].rename(name)
+    df = pd.read_csv(DATA_DIR / source.path)
+    column = source.column or next(c for c in df.columns if c != DATE_COL)
+    df[DATE_COL] = pd.to_datetime(df[DATE_COL])
+    return df.set_index(DATE_COL)[column].rename(name).sort_index(kind="stable")
+
+
+def _source_stat(name: str):
+    path = DATA_DIR / CATALOG[name].path
+    if not path.exists():
+        return (name, None, None)
+    stat = path.stat()
+    return (name, stat.st_mtime_ns, stat.st_size)
+
+
+@lru_cache(maxsize=16)
+def _load_panel(key: tuple, use_cache: bool) -> pd.DataFrame:
+    digest = hashlib.sha256(json.dumps(key).encode("utf-8")).hexdigest()[:16]
+    cache_path = PANEL_CACHE_DIR / f"panel_{digest}.parquet"
+    if use_cache and cache_path.exists():
+        return pd.read_parquet(cache_path)
+
+    series = []
+    for name, *_ in key:
+        try:
+            series.append(load_catalog_series(name).to_frame())
+        except Exception as e:
+            print(f"Warning: Failed to load {CATALOG[name].path} - {e}")
+    if not series:
+        raise ValueError("No catalog series could be loaded")
+
+    panel = series[0].join(series[1:], how="inner") if len(series) > 1 else series[0]
+    panel = panel.sort_index(kind="stable").rename_axis(DATE_COL).reset_index()
+
+    if use_cache:
+        PANEL_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        tmp_path = cache_path.with_name(f"{cache_path.stem}.{os.getpid()}.tmp.parquet")
+        panel.to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, cache_path)
+    return panel
+
+
+def load_panel(names=MACRO_PANEL, use_cache: bool = True) -> pd.DataFrame:
+    """Inner-joined panel (observation_date + one column per name), sorted by date.
+
+    Series that fail to load are skipped with a warning, as the per-script loaders did. Returns
+    a copy, so callers may add derived columns freely.
+    """
+    key = tuple(_source_stat(name) for name in names)
+    return _load_panel(key, use_cache).copy()
@@ -0,0 +1,238 @@
+"""
+Columnar Parquet store ("lake") for the processed series under data/.
+
+Each series lives in data/lake/<name>/ as typed Parquet with a datetime64 date column: long
+daily series are hive-partitioned by decade, short / wide tables are a single file. A
+`_series.json` next to the data records the date column, dtypes, row count, date range and a
+content hash. The processed CSVs stay the compatibility export; when a registered CSV changes
+on disk (e.g. written by an older script), the next `load_series` re-imports it.
+
+Concurrent processes coordinate through advisory file locks under data/lake/: readers hold a
+shared lock on the series while reading, the directory swap of a write holds it exclusively,
+and a stale re-import runs in one process at a time (the others wait, then read the fresh copy).
+
+    from data.process_scripts.series_lake import load_series
+    fx = load_series("usd_krw", start="2020-01-01", columns=["USD_KRW"])
+
+    python data/process_scripts/series_lake.py             # import every registered CSV
+    python data/process_scripts/series_lake.py --list
+"""
+import argparse
+import fcntl
+import hashlib
+import json
+import os
+import shutil
+from contextlib import contextmanager
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+
+BASE_DIR = Path("/Applications/dollar_price")
+DATA_DIR = BASE_DIR / "data"
+LAKE_DIR = DATA_DIR / "lake"
+META_FILE = "_series.json"
+
+PARTITION_COL = "decade"
+# Below this many rows one file reads faster than several partitions (per-file overhead dominates).
+PARTITION_MIN_ROWS = 5000
+
+# Lake name -> (processed CSV relative to data/, date column in that CSV).
+LAKE_SOURCES = {
+    "usd_krw": ("exchange_rate/exchange_rate_processed.csv", "observation_date"),
+    "base_rate_kor": ("policy_rate/KOR/base_rate_KOR_processed.csv", "observation_date"),
+    "spread_kor_usa": ("policy_rate/spread_KOR_USA_processed.csv", "observation_date"),
+    "theoretical_fwd_rate": ("exchange_rate/theoretical_fwd_rate_processed.csv", "observation_date"),
+    "m2_details": ("m2/KOR/M2_details_processed.csv", "observation_date"),
+    "m2_kor": ("m2/KOR/M2_KOR_processed.csv", "observation_date"),
+    "merged_daily_liquid": ("m2/KOR/merged_daily_liquid.csv", "observation_date"),
+    "processed_daily_integrated": ("processed_daily_1995_2026_integrated.csv", "date"),
+    "integrated_macro_targets": ("integrated_macro_targets.csv", "Date"),
+}
+
+
+def series_path(name: str) -> Path:
+    return LAKE_DIR / name
+
+
+@contextmanager
+def _lock(lock_name: str, exclusive: bool):
+    LAKE_DIR.mkdir(parents=True, exist_ok=True)
+    with open(LAKE_DIR / f".lock-{lock_name}", "a") as f:
+        fcntl.flock(f, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def _file_stat(path: Path) -> dict:
+    path = Path(path).resolve()
+    stat = path.stat()
+    return {"path": str(path.relative_to(BASE_DIR.resolve())), "mtime_ns": stat.st_mtime_ns, "size": stat.st_size}
+
+
+def content_hash(df: pd.DataFrame) -> str:
+    return hashlib.sha256(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes()).hexdigest()[:16]
+
+
+def write_series(name: str, df: pd.DataFrame, date_col: str = "observation_date", source: Path | None = None) -> Path:
+    """Store `df` (date column + value columns) as series `name`, replacing any previous version.
+
+    `source` is the CSV exported alongside; its stat is recorded so a later out-of-band rewrite
+    of that CSV is picked up by `load_series`.
+    """
+    df = df.copy()
+    df[date_col] = pd.to_datetime(df[date_col], errors="coerce")
+    df = df.dropna(subset=[date_col]).sort_values(date_col, kind="stable").reset_index(drop=True)
+    partitioned = len(df) >= PARTITION_MIN_ROWS
+
+    LAKE_DIR.mkdir(parents=True, exist_ok=True)
+    tmp_dir = LAKE_DIR / f".tmp-{name}-{os.getpid()}"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    tmp_dir.mkdir()
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    if partitioned:
+        table = table.append_column(PARTITION_COL, pa.array((df[date_col].dt.year // 10 * 10).to_numpy(), pa.int16()))
+        pq.write_to_dataset(table, tmp_dir, partition_cols=[PARTITION_COL])
+    else:
+        pq.write_table(table, tmp_dir / "part-0.parquet")
+
+    meta = {
+        "name": name,
+        "date_col": date_col,
+        "columns": {c: str(t) for c, t in df.dtypes.items()},
+        "rows": len(df),
+        "start": str(df[date_col].min().date()) if len(df) else None,
+        "end": str(df[date_col].max().date()) if len(df) else None,
+        "partitioned_by": PARTITION_COL if partitioned else None,
+        "content_hash": content_hash(df),
+        "source": _file_stat(Path(source)) if source is not None else None,
+    }
+    (tmp_dir / META_FILE).write_text(json.dumps(meta, indent=2, ensure_ascii=False), encoding="utf-8")
+
+    # Swap directories so readers never see a half-written series.
+    path = series_path(name)
+    old_dir = LAKE_DIR / f".old-{name}-{os.getpid()}"
+    with _lock(name, exclusive=True):
+        if path.exists():
+            path.rename(old_dir)
+        tmp_dir.rename(path)
+    shutil.rmtree(old_dir, ignore_errors=True)
+    return path
+
+
+def series_info(name: str) -> dict:
+    return json.loads((series_path(name) / META_FILE).read_text(encoding="utf-8"))
+
+
+def list_series() -> list[str]:
+    if not LAKE_DIR.exists():
+        return []
+    return sorted(p.name for p in LAKE_DIR.iterdir() if (p / META_FILE).exists())
+
+
+def import_csv(name: str) -> Path:
+    """(Re)build series `name` from its registered processed CSV."""
+    rel_path, date_col = LAKE_SOURCES[name]
+    csv_path = DATA_DIR / rel_path
+    return write_series(name, pd.read_csv(csv_path), date_col=date_col, source=csv_path)
+
+
+def _is_stale(name: str) -> bool:
+    with _lock(name, exclusive=False):
+        if not (series_path(name) / META_FILE).exists():
+            return True
+        source = series_info(name).get("source")
+    if name not in LAKE_SOURCES or source is None:
+        return False
+    csv_path = BASE_DIR / source["path"]
+    if not csv_path.exists():
+        return False
+    current = _file_stat(csv_path)
+    return (current["mtime_ns"], current["size"]) != (source["mtime_ns"], source["size"])
+
+
+def load_series(name: str, start=None, end=None, columns: list[str] | None = None) -> pd.DataFrame:
+    """Series `name` indexed by its date column (DatetimeIndex), optionally limited to [start, end] and `columns`.
+
+    The date range is pushed down to Parquet (partition pruning by decade plus row-group
+    statistics) and only the requested columns are read.
+    """
+    if name in LAKE_SOURCES and _is_stale(name):
+        refresh_series(name)
+    with _lock(name, exclusive=False):
+        return _read_series(name, start, end, columns)
+
+
+def refresh_series(name: str) -> bool:
+    """Re-import series `name` from its CSV if stale; True if this call re-imported it.
+
+    Serialized across processes: concurrent readers that all find the series stale wait for
+    the first one's import instead of each rewriting the lake.
+    """
+    with _lock(f"refresh-{name}", exclusive=True):
+        if not _is_stale(name):
+            return False
+        import_csv(name)
+        return True
+
+
+def _read_series(name: str, start, end, columns: list[str] | None) -> pd.DataFrame:
+    info = series_info(name)
+    date_col = info["date_col"]
+    # `_series.json` is skipped by pyarrow's default ignore_prefixes ("_", ".").
+    dataset = ds.dataset(series_path(name), format="parquet", partitioning="hive")
+    ts_type = dataset.schema.field(date_col).type
+
+    conditions = []
+    if start is not None:
+        start = pd.Timestamp(start)
+        conditions.append(ds.field(date_col) >= pa.scalar(start, type=ts_type))
+        if info["partitioned_by"]:
+            conditions.append(ds.field(PARTITION_COL) >= start.year // 10 * 10)
+    if end is not None:
+        end = pd.Timestamp(end)
+        conditions.append(ds.field(date_col) <= pa.scalar(end, type=ts_type))
+        if info["partitioned_by"]:
+            conditions.append(ds.field(PARTITION_COL) <= end.year // 10 * 10)
+    condition = None
+    for cond in conditions:
+        condition = cond if condition is None else condition & cond
+
+    value_cols = list(columns) if columns is not None else [c for c in info["columns"] if c != date_col]
+    missing = [c for c in value_cols if c not in info["columns"]]
+    if missing:
+        raise KeyError(f"Columns {missing} not in series '{name}'")
+    table = dataset.to_table(columns=[date_col] + value_cols, filter=condition)
+    return table.to_pandas().set_index(date_col).sort_index(kind="stable")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import processed CSVs into the Parquet series lake")
+    parser.add_argument("names", nargs="*", help=f"series to import (default: all registered: {', '.join(LAKE_SOURCES)})")
+    parser.add_argument("--list", action="store_true", help="list stored series instead of importing")
+    args = parser.parse_args()
+
+    if args.list:
+        for name in list_series():
+            info = series_info(name)
+            print(f"{name:28s} rows={info['rows']:>6,}  {info['start']} ~ {info['end']}  cols={len(info['columns']) - 1}")
+        return
+    unknown = [n for n in args.names if n not in LAKE_SOURCES]
+    if unknown:
+        parser.error(f"unknown series: {', '.join(unknown)}")
+    for name in args.names or list(LAKE_SOURCES):
+        if not (DATA_DIR / LAKE_SOURCES[name][0]).exists():
+            print(f"[skip] {name}: {LAKE_SOURCES[name][0]} not found")
+            continue
+        path = import_csv(name)
+        print(f"[lake] {name} -> {path.relative_to(BASE_DIR)} ({series_info(name)['rows']:,} rows)")
+
+
+if __name__ == "__main__":
+    main()
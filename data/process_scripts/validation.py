@@ -0,0 +1,265 @@
+"""
+Schema and data-quality checks for the processed series.
+
+Every processed series registered in the lake declares a `SeriesSchema`: its date column, the
+largest allowed gap between consecutive dates and one `ColumnRule` per value column (numeric
+dtype, missing values, value range, largest move between consecutive observations). `validate`
+runs each check as one numpy pass over the column, so the whole set of processed files is checked
+in well under a second.
+
+rebuild_daily_pipeline validates every frame before writing it and stops on a violation, so a
+bad export never reaches the processed CSVs, the lake or the models downstream. This module is part
+of every rebuild step's code hash, so a schema change rebuilds and revalidates the outputs on the
+next run. The CLI checks the processed CSVs already on disk:
+
+    python data/process_scripts/validation.py                 # every registered series
+    python data/process_scripts/validation.py usd_krw m2_kor  # exit code 1 on any violation
+"""
+import argparse
+import sys
+from dataclasses import dataclass, field
+
+import numpy as np
+import pandas as pd
+
+sys.path.append("/Applications/dollar_price")
+from data.process_scripts.series_lake import DATA_DIR, LAKE_SOURCES
+
+
+@dataclass(frozen=True)
+class ColumnRule:
+    min: float | None = None
+    max: float | None = None
+    max_jump: float | None = None  # largest |x_t / x_prev - 1| between consecutive observations
+    max_step: float | None = None  # largest |x_t - x_prev|, for series that cross zero (rates, spreads)
+    nullable: bool = False
+    labels: tuple[str, ...] | None = None  # categorical column: allowed values (numeric checks do not apply)
+
+
+@dataclass(frozen=True)
+class SeriesSchema:
+    columns: dict[str, ColumnRule]
+    date_col: str = "observation_date"
+    max_gap_days: int = 14
+    default: ColumnRule | None = None  # rule for columns not listed; None = an unlisted column is a violation
+    breaks: dict[str, str] = field(default_factory=dict)  # {date: reason} level shifts exempt from jump checks
+
+
+@dataclass(frozen=True)
+class Violation:
+    column: str
+    check: str
+    count: int
+    examples: str = ""
+
+
+@dataclass
+class ValidationResult:
+    name: str
+    rows: int
+    violations: list[Violation]
+
+    @property
+    def ok(self) -> bool:
+        return not self.violations
+
+
+class ValidationError(ValueError):
+    def __init__(self, results: list[ValidationResult]):
+        self.results = results
+        super().__init__(format_report(results))
+
+
+FX = ColumnRule(min=500, max=3000, max_jump=0.25)
+POLICY_RATE = ColumnRule(min=0, max=25, max_step=1.5)
+RATE_SPREAD = ColumnRule(min=-10, max=10, max_step=1.5)
+
+SCHEMAS = {
+    "usd_krw": SeriesSchema({"USD_KRW": FX}),
+    "base_rate_kor": SeriesSchema({"BASE_RATE_KOR": POLICY_RATE}),
+    "spread_kor_usa": SeriesSchema({"RATE_SPREAD_KOR_USA": RATE_SPREAD}),
+    "theoretical_fwd_rate": SeriesSchema({"THEORETICAL_FWD_RATE": FX}),
+    "m2_details": SeriesSchema(
+        {
+            "M2_MMF": ColumnRule(min=0, nullable=True),  # tripled within months of its 1996 launch
+            "M2_만기2년미만정기예적금": ColumnRule(min=0, max_jump=0.2),
+            "M2_수시입출식저축성예금": ColumnRule(min=0, max_jump=0.2),
+            "M2_요구불예금": ColumnRule(min=0, max_jump=0.2),
+            "M2_현금통화": ColumnRule(min=0, max_jump=0.2),
+            "M2_M2평잔,계절조정계열": ColumnRule(min=0, max_jump=0.1, nullable=True),
+            "M2_MMF_지분": ColumnRule(min=0, max_jump=0.3, nullable=True),
+        },
+        max_gap_days=31,
+        default=ColumnRule(min=0, nullable=True),  # accounts added by a newer ECOS export
+    ),
+    "m2_kor": SeriesSchema(
+        {"M2_KOR": ColumnRule(min=0, max_jump=0.1)},
+        max_gap_days=31,
+        breaks={"2004-10-01": "legacy component sum -> published M2 total (M2_1995_to_2004 / M2_2004_to_2026 splice)"},
+    ),
+    "merged_daily_liquid": SeriesSchema(
+        {"USD_KRW": FX, "MMF_total": ColumnRule(min=1, max_jump=0.25)},
+        breaks={"2010-12-01": "monthly M2 MMF fallback -> daily MMF report"},
+    ),
+    "processed_daily_integrated": SeriesSchema(
+        {
+            "FX_rate": FX,
+            "policy_spread": RATE_SPREAD,
+            "M2_KOR": ColumnRule(min=0, max_jump=0.05),
+            "M2_USA": ColumnRule(min=0, max_jump=0.05),
+        },
+        date_col="date",
+        max_gap_days=1,
+    ),
+    # Wide monthly panel: level, growth and lag columns of ~40 indicators, most with short histories.
+    "integrated_macro_targets": SeriesSchema(
+        {"Period_Type": ColumnRule(labels=("Normal", "Abnormal"))},
+        date_col="Date",
+        max_gap_days=31,
+        default=ColumnRule(nullable=True),
+    ),
+}
+
+
+def _examples(dates: np.ndarray, detail: list[str], limit: int = 3) -> str:
+    shown = [f"{pd.Timestamp(d).date()} {text}".rstrip() for d, text in zip(dates[:limit], detail[:limit])]
+    return ", ".join(shown) + (", ..." if len(dates) > limit else "")
+
+
+def _check_column(column: str, values: np.ndarray, dates: np.ndarray, rule: ColumnRule, exempt: np.ndarray) -> list[Violation]:
+    out = []
+    missing = np.isnan(values)
+    if not rule.nullable and missing.any():
+        out.append(Violation(column, "missing", int(missing.sum()), _examples(dates[missing], [""] * int(missing.sum()))))
+    infinite = np.isinf(values)
+    if infinite.any():
+        out.append(Violation(column, "non-finite", int(infinite.sum()), _examples(dates[infinite], [str(v) for v in values[infinite]])))
+
+    with np.errstate(invalid="ignore"):
+        bad = np.zeros(len(values), dtype=bool)
+        if rule.min is not None:
+            bad |= values < rule.min
+        if rule.max is not None:
+            bad |= values > rule.max
+    if bad.any():
+        out.append(Violation(column, f"range [{rule.min}, {rule.max}]", int(bad.sum()), _examples(dates[bad], [f"{v:g}" for v in values[bad]])))
+
+    if rule.max_jump is None and rule.max_step is None:
+        return out
+    # Consecutive observations, skipping gaps of missing values.
+    valid = np.isfinite(values)
+    v, d, skip = values[valid], dates[valid], exempt[valid][1:]
+    if len(v) < 2:
+        return out
+    prev, cur = v[:-1], v[1:]
+    if rule.max_jump is not None:
+        with np.errstate(divide="ignore", invalid="ignore"):
+            move = cur / prev - 1.0
+        jump = (np.abs(move) > rule.max_jump) & (prev != 0) & ~skip
+        if jump.any():
+            out.append(Violation(column, f"jump > {rule.max_jump:.0%}", int(jump.sum()), _examples(d[1:][jump], [f"{m:+.1%}" for m in move[jump]])))
+    if rule.max_step is not None:
+        step = cur - prev
+        jump = (np.abs(step) > rule.max_step) & ~skip
+        if jump.any():
+            out.append(Violation(column, f"step > {rule.max_step:g}", int(jump.sum()), _examples(d[1:][jump], [f"{s:+g}" for s in step[jump]])))
+    return out
+
+
+def validate(name: str, df: pd.DataFrame, schema: SeriesSchema | None = None) -> ValidationResult:
+    """Check `df` against `schema` (default: SCHEMAS[name]); returns every violation found."""
+    schema = schema or SCHEMAS[name]
+    result = ValidationResult(name, len(df), [])
+    violations = result.violations
+    if schema.date_col not in df.columns:
+        violations.append(Violation(schema.date_col, "missing column", 1))
+        return result
+
+    raw_dates = df[schema.date_col]
+    parsed = raw_dates if pd.api.types.is_datetime64_any_dtype(raw_dates) else pd.to_datetime(raw_dates, errors="coerce")
+    unparsed = parsed.isna().to_numpy()
+    if unparsed.any():
+        samples = raw_dates[unparsed].astype(str).head(3).tolist()
+        violations.append(Violation(schema.date_col, "unparseable date", int(unparsed.sum()), ", ".join(samples)))
+    dates = pd.DatetimeIndex(parsed).as_unit("ns").asi8
+    dates = dates[~unparsed].view("datetime64[ns]")
+
+    step = np.diff(dates).astype("timedelta64[D]").astype(np.int64)
+    for check, bad in (("unsorted dates", step < 0), ("duplicate dates", step == 0), (f"gap > {schema.max_gap_days}d", step > schema.max_gap_days)):
+        if bad.any():
+            violations.append(Violation(schema.date_col, check, int(bad.sum()), _examples(dates[1:][bad], [f"({s}d)" for s in step[bad]])))
+
+    exempt = np.isin(dates, pd.DatetimeIndex(list(schema.breaks)).as_unit("ns").to_numpy())
+    for column in schema.columns:
+        if column not in df.columns:
+            violations.append(Violation(column, "missing column", 1))
+    for column in df.columns:
+        if column == schema.date_col:
+            continue
+        rule = schema.columns.get(column, schema.default)
+        if rule is None:
+            violations.append(Violation(column, "unexpected column", 1))
+            continue
+        series = df[column]
+        if rule.labels is not None:
+            labels = series[~unparsed]
+            bad = (~labels.isin(rule.labels) & (labels.notna() | (not rule.nullable))).to_numpy()
+            if bad.any():
+                violations.append(Violation(column, "label", int(bad.sum()), _examples(dates[bad], labels[bad].astype(str).tolist())))
+            continue
+        if not (pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series)):
+            violations.append(Violation(column, "dtype", 1, str(series.dtype)))
+            continue
+        values = series.to_numpy(dtype=np.float64, na_value=np.nan)[~unparsed]
+        violations.extend(_check_column(column, values, dates, rule, exempt))
+    return result
+
+
+def check_series(name: str, df: pd.DataFrame) -> ValidationResult:
+    """`validate`, raising ValidationError (with the report as message) on any violation."""
+    result = validate(name, df)
+    if not result.ok:
+        raise ValidationError([result])
+    return result
+
+
+def format_report(results: list[ValidationResult]) -> str:
+    lines = []
+    for result in results:
+        status = "ok" if result.ok else f"FAIL ({len(result.violations)})"
+        lines.append(f"{result.name:<28} {result.rows:>7,} rows  {status}")
+        for v in result.violations:
+            lines.append(f"    {v.column}: {v.check} x{v.count}" + (f"  {v.examples}" if v.examples else ""))
+    return "\n".join(lines)
+
+
+def validate_files(names=None) -> list[ValidationResult]:
+    """Validate the processed CSVs of the registered series (skipping ones not on disk)."""
+    results = []
+    for name in names or list(SCHEMAS):
+        path = DATA_DIR / LAKE_SOURCES[name][0]
+        if not path.exists():
+            print(f"[skip] {name}: {LAKE_SOURCES[name][0]} not found")
+            continue
+        results.append(validate(name, pd.read_csv(path, float_precision="round_trip")))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Validate the processed series against their declared schemas")
+    parser.add_argument("names", nargs="*", help=f"series to check (default: all: {', '.join(SCHEMAS)})")
+    args = parser.parse_args()
+
+    unknown = [n for n in args.names if n not in SCHEMAS]
+    if unknown:
+        parser.error(f"no schema for: {', '.join(unknown)}")
+    results = validate_files(args.names)
+    print(format_report(results))
+    failed = [r.name for r in results if not r.ok]
+    if failed:
+        print(f"{len(failed)} series failed validation: {', '.join(failed)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
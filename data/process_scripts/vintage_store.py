@@ -0,0 +1,284 @@
+"""
+Point-in-time (bitemporal) store for the monthly macro series.
+
+Every value is keyed by (series, observation_date, available_from): the period it describes and
+the first date it could have been known. Processed CSVs only hold the latest numbers labelled by
+observation month, so merging them on that month leaks data that was not yet published into
+daily / monthly models. The store derives first-release rows from per-series release rules (US
+CPI uses the actual release calendar in data/cpi_release_dates.csv) and answers "what was known
+on date t" queries:
+
+    store = load_vintage_store()
+    store.known_at("macro.CPI_KOR", dates)          # latest released value on each date (vectorized)
+    store.panel_as_of("2020-03-31", group="macro")  # full history as it was known on one date
+    store.features_as_of(dates, "us_cpi_components", ["Food_YoY"])
+
+Queries run on per-series numpy arrays (searchsorted over release dates plus a running
+"latest observation" index), so a walk-forward backtest can issue thousands of them. The
+Parquet file lives at data/lake/_vintages/vintages.parquet and is rebuilt when a source changes.
+
+    python data/process_scripts/vintage_store.py          # (re)build the store
+"""
+import argparse
+import json
+import os
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.append("/Applications/dollar_price")
+from data.process_scripts.series_lake import DATA_DIR, LAKE_DIR, LAKE_SOURCES, load_series
+
+
+VINTAGE_DIR = LAKE_DIR / "_vintages"
+VINTAGE_PATH = VINTAGE_DIR / "vintages.parquet"
+VINTAGE_META = VINTAGE_DIR / "_sources.json"
+CPI_RELEASE_CALENDAR = DATA_DIR / "cpi_release_dates.csv"
+
+
+# Release lag of each publication, measured from the first day of the observation month.
+RELEASE_RULES = {
+    "month_end": pd.DateOffset(months=1, days=-1),  # market averages / surveys: known when the month closes
+    "kor_trade": pd.DateOffset(months=1),  # customs trade flash, 1st of the next month
+    "kor_cpi": pd.DateOffset(months=1, days=2),  # KOSTAT CPI, first days of the next month
+    "kor_import_price": pd.DateOffset(months=1, days=14),
+    "kor_labor": pd.DateOffset(months=1, days=14),
+    "kor_production": pd.DateOffset(months=1, days=30),  # industrial activity, end of the next month
+    "kor_bop": pd.DateOffset(months=2, days=7),  # BOK balance of payments, early second month
+    "kor_money": pd.DateOffset(months=2, days=14),  # BOK monetary aggregates, mid second month
+    "us_cpi": pd.DateOffset(months=1, days=14),  # fallback when the month is not in the release calendar
+}
+
+
+@dataclass(frozen=True)
+class VintageSource:
+    group: str  # series are named "<group>.<column>"
+    lake: str | None  # series_lake name, or None for a CSV under data/
+    path: str | None  # CSV relative to data/ when lake is None
+    date_col: str
+    release: dict  # column -> RELEASE_RULES key or None to skip ("*" = every other numeric column)
+    calendar: Path | None = None  # release_date,reference_month CSV overriding the rule
+
+
+MACRO_RELEASES = {
+    "Exports": "kor_trade",
+    "Imports": "kor_trade",
+    "Trade_Balance": "kor_trade",
+    "Current_Account": "kor_bop",
+    "Foreign_Stock_Investment": "kor_bop",
+    "Foreign_Bond_Investment": "kor_bop",
+    "CPI_KOR": "kor_cpi",
+    "Import_Price_Index": "kor_import_price",
+    "Industrial_Production": "kor_production",
+    "Unemployment_KOR": "kor_labor",
+    "M2": "kor_money",
+    "MMF": "kor_money",
+    "Demand_Deposits": "kor_money",
+    "Policy_Rate_KOR": "month_end",
+    "Policy_Rate_USA": "month_end",
+    "DXY": "month_end",
+    "VIX": "month_end",
+    "WTI_Oil": "month_end",
+    "Rate_Spread_KOR_USA": "month_end",
+    "KOSPI": "month_end",
+    "BSI_All_Industry": "month_end",
+    "CSI_CCSI": "month_end",
+}
+
+VINTAGE_SOURCES = (
+    VintageSource("macro", "integrated_macro_targets", None, "Date", MACRO_RELEASES),
+    VintageSource("m2_details", "m2_details", None, "observation_date", {"*": "kor_money"}),
+    VintageSource(
+        "us_cpi_components", None, "CPI/USA/CPI_components/final_processed_data.csv", "observation_date",
+        # FX_Ret / Is_Spike are FX-side columns of the same table, not CPI releases.
+        {"FX_Ret": None, "Is_Spike": None, "*": "us_cpi"}, calendar=CPI_RELEASE_CALENDAR,
+    ),
+)
+
+
+def _source_path(source: VintageSource) -> Path:
+    return DATA_DIR / (LAKE_SOURCES[source.lake][0] if source.lake else source.path)
+
+
+def _source_stats() -> dict:
+    stats = {}
+    for source in VINTAGE_SOURCES + (None,):
+        path = _source_path(source) if source else CPI_RELEASE_CALENDAR
+        stat = path.stat() if path.exists() else None
+        stats[str(path.relative_to(DATA_DIR))] = [stat.st_mtime_ns, stat.st_size] if stat else None
+    return stats
+
+
+def _read_source(source: VintageSource) -> pd.DataFrame:
+    if source.lake:
+        return load_series(source.lake).reset_index()
+    df = pd.read_csv(_source_path(source))
+    df = df.rename(columns={df.columns[0]: source.date_col}) if source.date_col not in df.columns else df
+    df[source.date_col] = pd.to_datetime(df[source.date_col])
+    return df
+
+
+def _release_dates(months: pd.DatetimeIndex, rule: str, calendar: Path | None) -> np.ndarray:
+    available = months + RELEASE_RULES[rule]
+    if calendar is not None and calendar.exists():
+        cal = pd.read_csv(calendar)
+        by_month = pd.Series(
+            pd.to_datetime(cal["release_date"]).to_numpy(),
+            index=pd.PeriodIndex(cal["reference_month"], freq="M"),
+        )
+        by_month = by_month[~by_month.index.duplicated(keep="first")]
+        released = by_month.reindex(months.to_period("M")).to_numpy()
+        available = np.where(pd.isna(released), available.to_numpy(), released)
+    return np.asarray(available, dtype="datetime64[ns]")
+
+
+def first_release_rows(source: VintageSource) -> pd.DataFrame:
+    """Long (series, observation_date, available_from, value) rows for one source."""
+    df = _read_source(source)
+    months = pd.DatetimeIndex(df[source.date_col]).to_period("M").to_timestamp()
+    frames = []
+    for column in df.columns:
+        if column == source.date_col or not pd.api.types.is_numeric_dtype(df[column]):
+            continue
+        rule = source.release.get(column, source.release.get("*"))
+        if rule is None:
+            continue
+        values = df[column].to_numpy(dtype=np.float64)
+        keep = ~np.isnan(values)
+        frames.append(pd.DataFrame({
+            "series": f"{source.group}.{column}",
+            "observation_date": months[keep],
+            "available_from": _release_dates(months[keep], rule, source.calendar),
+            "value": values[keep],
+        }))
+    return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=["series", "observation_date", "available_from", "value"])
+
+
+def build_vintage_store(path: Path = VINTAGE_PATH) -> Path:
+    rows = pd.concat([first_release_rows(source) for source in VINTAGE_SOURCES], ignore_index=True)
+    rows = rows.sort_values(["series", "observation_date", "available_from"], kind="stable").reset_index(drop=True)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f"{path.stem}.{os.getpid()}.tmp.parquet")
+    rows.to_parquet(tmp_path, index=False)
+    os.replace(tmp_path, path)
+    VINTAGE_META.write_text(json.dumps(_source_stats(), indent=2), encoding="utf-8")
+    return path
+
+
+def _is_stale() -> bool:
+    if not VINTAGE_PATH.exists() or not VINTAGE_META.exists():
+        return True
+    return json.loads(VINTAGE_META.read_text(encoding="utf-8")) != _source_stats()
+
+
+class VintageStore:
+    def __init__(self, rows: pd.DataFrame):
+        self._series = {}
+        rows = rows.sort_values(["series", "observation_date", "available_from"], kind="stable")
+        for name, group in rows.groupby("series", sort=True):
+            obs = group["observation_date"].to_numpy(dtype="datetime64[ns]").view("i8")
+            avail = group["available_from"].to_numpy(dtype="datetime64[ns]").view("i8")
+            values = group["value"].to_numpy(dtype=np.float64)
+            # Rows are in (observation_date, available_from) order, so the position is the
+            # lexicographic rank; the running max over release order is the latest known row.
+            by_release = np.argsort(avail, kind="stable")
+            latest = np.maximum.accumulate(by_release)
+            self._series[name] = (obs, avail, values, avail[by_release], latest)
+
+    @classmethod
+    def load(cls, path: Path = VINTAGE_PATH) -> "VintageStore":
+        return cls(pd.read_parquet(path))
+
+    @property
+    def series(self) -> list[str]:
+        return list(self._series)
+
+    def _arrays(self, series: str):
+        if series not in self._series:
+            raise KeyError(f"Series '{series}' not in vintage store")
+        return self._series[series]
+
+    def known_at(self, series: str, dates, return_observation: bool = False):
+        """Value of the latest observation of `series` released on or before each date (NaN before the first release).
+
+        With `return_observation=True` also returns the observation date that value describes.
+        """
+        obs, _, values, release_sorted, latest = self._arrays(series)
+        query = pd.DatetimeIndex(dates).as_unit("ns").asi8
+        k = np.searchsorted(release_sorted, query, side="right") - 1
+        known = k >= 0
+        row = latest[k.clip(0)]
+        out = np.where(known, values[row], np.nan)
+        if not return_observation:
+            return out
+        obs_dates = np.where(known, obs[row], np.iinfo(np.int64).min).view("datetime64[ns]")
+        return out, obs_dates
+
+    def features_as_of(self, dates, group: str, columns=None) -> pd.DataFrame:
+        """Frame indexed by `dates`, one column per `<group>.<column>` series, as known on each date."""
+        prefix = f"{group}."
+        if columns is None:
+            columns = [s[len(prefix):] for s in self._series if s.startswith(prefix)]
+        index = pd.DatetimeIndex(dates)
+        return pd.DataFrame({column: self.known_at(prefix + column, index) for column in columns}, index=index)
+
+    def panel_as_of(self, t, group: str | None = None) -> pd.DataFrame:
+        """Every observation released on or before `t` (latest vintage each), wide by series."""
+        t_ns = pd.Timestamp(t).as_unit("ns").value
+        names, obs_parts, value_parts = [], [], []
+        for name, (obs, avail, values, _, _) in self._series.items():
+            if group is not None and not name.startswith(f"{group}."):
+                continue
+            mask = avail <= t_ns
+            obs_m, values_m = obs[mask], values[mask]
+            if len(obs_m) == 0:
+                continue
+            last_vintage = np.r_[obs_m[1:] != obs_m[:-1], True]
+            names.append(name)
+            obs_parts.append(obs_m[last_vintage])
+            value_parts.append(values_m[last_vintage])
+        # One matrix over the union of observation dates instead of aligning Series one by one.
+        all_obs = np.unique(np.concatenate(obs_parts)) if obs_parts else np.array([], dtype=np.int64)
+        matrix = np.full((len(all_obs), len(names)), np.nan)
+        for j, (obs_j, values_j) in enumerate(zip(obs_parts, value_parts)):
+            matrix[np.searchsorted(all_obs, obs_j), j] = values_j
+        index = pd.DatetimeIndex(all_obs.view("datetime64[ns]"), name="observation_date")
+        return pd.DataFrame(matrix, index=index, columns=names)
+
+
+def load_vintage_store(rebuild_if_stale: bool = True) -> VintageStore:
+    if rebuild_if_stale and _is_stale():
+        build_vintage_store()
+    return VintageStore.load()
+
+
+def point_in_time_panel(df: pd.DataFrame, date_col: str, group: str, store: VintageStore | None = None) -> pd.DataFrame:
+    """Replace every column of `df` that has a `<group>.<column>` vintage series by its value as known on `date_col`."""
+    store = store or load_vintage_store()
+    out = df.copy()
+    columns = [c for c in df.columns if f"{group}.{c}" in store.series]
+    known = store.features_as_of(out[date_col], group, columns)
+    for column in columns:
+        out[column] = known[column].to_numpy()
+    return out
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the point-in-time vintage store from the processed series")
+    parser.add_argument("--list", action="store_true", help="list stored series instead of rebuilding")
+    args = parser.parse_args()
+    if not args.list:
+        path = build_vintage_store()
+        print(f"[vintages] -> {path.relative_to(DATA_DIR.parent)}")
+    store = VintageStore.load()
+    for name in store.series:
+        obs, avail, *_ = store._series[name]
+        lag_days = np.median((avail - obs) / 86_400e9)
+        print(f"{name:48s} rows={len(obs):>5,}  median release lag={lag_days:5.0f}d")
+
+
+if __name__ == "__main__":
+    main()